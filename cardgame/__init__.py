@@ -1,3 +1,16 @@
-from .card import Card
-from .deck import Deck
-# from .game import Game
\ No newline at end of file
+from typing import TYPE_CHECKING
+
+from .lazy import lazy_exports
+
+__all__ = ['Card', 'Deck', 'GameState']
+__getattr__, __dir__ = lazy_exports(__name__, {
+    'Card': '.card',
+    'Deck': '.deck',
+    'GameState': '.game_state',
+})
+
+if TYPE_CHECKING:
+    from .card import Card
+    from .deck import Deck
+    from .game_state import GameState
+# from .game import Game
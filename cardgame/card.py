@@ -40,5 +40,8 @@ class Card:
     rank: Rank
     suit: Suit
 
+    def __hash__(self):
+        return hash((self.rank, self.suit))
+
     def __repr__(self):
         return f"{self.rank.value}{self.suit.value}"
@@ -3,10 +3,11 @@ from .card import Card
 
 class Deck(set):
     @classmethod
-    def make_deck(cls, ranks, suits):
-        pass
+    def make_deck(cls, ranks, suits, card_type=Card):
+        """A deck with one ``card_type`` card of every rank in every suit."""
+        return cls(card_type(rank, suit) for rank in ranks for suit in suits)
 
     def __add__(self, other):
         if not isinstance(other, Card):
             raise TypeError("Can only add Cards to a Deck")
-        return super.__add__(other)
+        return type(self)(self | {other})
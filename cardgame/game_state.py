@@ -1,2 +1,19 @@
-class GameState:
-    pass
+from abc import ABC, abstractmethod
+from typing import Hashable
+
+
+class GameState(ABC):
+    """A game position that moves are applied to and undone from in place."""
+
+    @abstractmethod
+    def apply_move(self, move):
+        raise NotImplementedError("apply_move must be implemented by a subclass")
+
+    @abstractmethod
+    def undo_move(self):
+        raise NotImplementedError("undo_move must be implemented by a subclass")
+
+    @abstractmethod
+    def key(self) -> Hashable:
+        """Compact, hashable encoding of the position."""
+        raise NotImplementedError("key must be implemented by a subclass")
@@ -0,0 +1,40 @@
+"""Package attributes imported from their submodules on first use.
+
+A package lists what it exports and where each name lives, and the
+submodule is only imported when the name is first looked up (PEP 562), so
+importing the package itself stays cheap however much it grows:
+
+    __getattr__, __dir__ = lazy_exports(__name__, {
+        'Card': '.card',
+    })
+"""
+import importlib
+import sys
+
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Tuple,
+)
+
+
+def lazy_exports(package: str, exports: Dict[str, str]) -> Tuple[Callable[[str], Any], Callable[[], List[str]]]:
+    """Module ``__getattr__`` and ``__dir__`` for ``package``.
+
+    :param exports: exported name -> module it is defined in, relative to ``package``
+    """
+    def __getattr__(name: str) -> Any:
+        module = exports.get(name)
+        if module is None:
+            raise AttributeError(f'module {package!r} has no attribute {name!r}')
+        value = getattr(importlib.import_module(module, package), name)
+        # Later lookups find the name without calling __getattr__ again
+        setattr(sys.modules[package], name, value)
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(vars(sys.modules[package])) | set(exports))
+
+    return __getattr__, __dir__
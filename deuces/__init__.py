@@ -1 +1,11 @@
-from .deuces_card import DeucesCard
+from typing import TYPE_CHECKING
+
+from cardgame.lazy import lazy_exports
+
+__all__ = ['DeucesCard']
+__getattr__, __dir__ = lazy_exports(__name__, {
+    'DeucesCard': '.deuces_card',
+})
+
+if TYPE_CHECKING:
+    from .deuces_card import DeucesCard
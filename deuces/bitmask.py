@@ -0,0 +1,84 @@
+"""Integer card and hand primitives for the deuces engine.
+
+A card is its ordinal in ``0..51``, ``rank_ix * NUM_SUITS + suit_ix`` with
+ranks and suits indexed by ``DeucesCard.RANK_ORDER`` and
+``DeucesCard.SUIT_ORDER``, so comparing ordinals compares cards. A hand is a
+52-bit integer with bit ``ordinal`` set for every card in it.
+"""
+from typing import (
+    Iterable,
+    List,
+    Tuple,
+)
+
+
+NUM_SUITS: int = 4
+NUM_RANKS: int = 13
+NUM_CARDS: int = NUM_SUITS * NUM_RANKS
+
+FULL_DECK_MASK: int = (1 << NUM_CARDS) - 1
+# Every card of a rank, e.g. RANK_MASKS[0] is 3♢ 3♣ 3♡ 3♠
+RANK_MASKS: Tuple[int, ...] = tuple(
+    ((1 << NUM_SUITS) - 1) << (r * NUM_SUITS) for r in range(NUM_RANKS))
+# Every card of a suit, e.g. SUIT_MASKS[0] is 3♢ 4♢ ... A♢ 2♢
+SUIT_MASKS: Tuple[int, ...] = tuple(
+    sum(1 << (r * NUM_SUITS + s) for r in range(NUM_RANKS)) for s in range(NUM_SUITS))
+
+if hasattr(int, 'bit_count'):
+    popcount = int.bit_count
+else:  # Python < 3.10
+    def popcount(mask: int) -> int:
+        return bin(mask).count('1')
+
+
+def rank_of(ordinal: int) -> int:
+    return ordinal // NUM_SUITS
+
+
+def suit_of(ordinal: int) -> int:
+    return ordinal % NUM_SUITS
+
+
+def ordinal_of(rank_ix: int, suit_ix: int) -> int:
+    return rank_ix * NUM_SUITS + suit_ix
+
+
+def to_mask(ordinals: Iterable[int]) -> int:
+    mask = 0
+    for o in ordinals:
+        mask |= 1 << o
+    return mask
+
+
+def ordinals(mask: int) -> List[int]:
+    """Card ordinals in ``mask``, lowest first."""
+    result = []
+    while mask:
+        low = mask & -mask
+        result.append(low.bit_length() - 1)
+        mask ^= low
+    return result
+
+
+def highest(mask: int) -> int:
+    """Ordinal of the highest card in a non-empty ``mask``."""
+    return mask.bit_length() - 1
+
+
+def lowest(mask: int) -> int:
+    """Ordinal of the lowest card in a non-empty ``mask``."""
+    return (mask & -mask).bit_length() - 1
+
+
+def rank_counts(mask: int) -> List[int]:
+    """Number of cards held of each rank, indexed by rank ix."""
+    return [popcount(mask & m) for m in RANK_MASKS]
+
+
+def rank_set(mask: int) -> int:
+    """13-bit integer with bit ``rank_ix`` set for every rank present."""
+    ranks = 0
+    for r, m in enumerate(RANK_MASKS):
+        if mask & m:
+            ranks |= 1 << r
+    return ranks
@@ -0,0 +1,315 @@
+"""Serves move decisions for game states over asyncio.
+
+Requests queue up and are decided in micro-batches: a batch closes once it
+holds ``max_batch_size`` requests or its oldest request has waited
+``max_latency`` seconds. Each batch is validated and decided with a few
+numpy calls over one shared MoveIndex, off the event loop, so the number of
+tables a process serves does not add per-request Python loops.
+
+The queue holds at most ``max_queue`` requests. ``BotService.decide``
+waits for room by default, or raises ServiceOverloaded with
+``block=False``; the TCP server rejects requests that find the queue full.
+
+Run ``python -m deuces.bot_service`` to serve JSON lines over TCP. Each
+request line is ``{"id": ..., "hands": [h0, h1, h2, h3], "table": t,
+"leader": l, "passes": p, "turn": t}`` with hand masks as ints, and each
+response line is ``{"id": ..., "move": m}`` or ``{"id": ..., "error": e}``.
+"""
+import argparse
+import asyncio
+import json
+
+from dataclasses import dataclass
+from typing import (
+    List,
+    Optional,
+    Tuple,
+)
+
+import numpy as np
+
+from deuces import (
+    bitmask,
+    instrumentation,
+)
+from deuces.game_state import (
+    OPENING_CARD_MASK,
+    PASS,
+    DeucesGameState,
+)
+from deuces.move_index import MoveIndex
+from deuces.moves import from_masks
+from deuces.rules import CompiledRules
+from deuces.validation import BatchValidator
+from deuces.validation.batch_validator import MAX_MOVE_SIZE
+from deuces.validation.combos.five_card_table import INVALID_STRENGTH
+
+DEFAULT_MAX_BATCH_SIZE: int = 64
+DEFAULT_MAX_LATENCY: float = 0.002
+DEFAULT_MAX_QUEUE: int = 4096
+DEFAULT_PORT: int = 8765
+
+
+class ServiceOverloaded(Exception):
+    pass
+
+
+@dataclass
+class ServiceStats:
+    requests: int = 0
+    batches: int = 0
+    rejected: int = 0
+
+    @property
+    def mean_batch_size(self) -> float:
+        return self.requests / self.batches if self.batches else 0.0
+
+
+class MoveChooser:
+    """Picks a move for each of a batch of states at once.
+
+    Leading, play the move whose lowest card is lowest, with as many cards as
+    possible (the opening lead must hold the 3♢). Replying, play the weakest
+    move that beats the table, or pass.
+    """
+
+    def __init__(self, index: MoveIndex, strength_table: Optional[np.ndarray] = None):
+        """
+        :param strength_table: five-card strengths on the scale of ``index``,
+            the standard game's by default
+        """
+        self.index = index
+        self.strength_table = strength_table
+        masks = np.concatenate([index.moves(s) for s in range(1, MAX_MOVE_SIZE + 1)])
+        sizes = np.concatenate([np.full(len(index.moves(s)), s) for s in range(1, MAX_MOVE_SIZE + 1)])
+        lowest = np.array([bitmask.lowest(int(m)) for m in masks])
+        # Best lead first, so a hand's lead is its first legal one
+        order = np.lexsort((-sizes, lowest))
+        self._leads = masks[order]
+        self._leads_open = (self._leads & np.uint64(OPENING_CARD_MASK)) != 0
+
+    def choose(self, hands: np.ndarray, tables: np.ndarray, openings: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Moves for the player to move of each state, and which states had no valid move.
+
+        A state has none when its table is not a valid move, or when the
+        player leads without a legal lead: an empty hand, or an opening lead
+        from a hand without the 3♢.
+
+        :param hands: hand masks of the players to move
+        :param tables: table masks, PASS when leading
+        :param openings: whether each state is the opening lead
+        """
+        hands = np.asarray(hands, dtype=np.uint64)
+        tables = np.asarray(tables, dtype=np.uint64)
+        missing = ~hands & np.uint64(bitmask.FULL_DECK_MASK)
+        sizes, strengths = BatchValidator.move_sizes_and_strengths(from_masks(tables), self.strength_table)
+        leading = tables == PASS
+        invalid = ~leading & (strengths == INVALID_STRENGTH)
+        moves = np.full(len(hands), PASS, dtype=np.uint64)
+
+        for move_size in range(1, MAX_MOVE_SIZE + 1):
+            rows = np.flatnonzero(~leading & ~invalid & (sizes == move_size))
+            if not rows.size:
+                continue
+            masks = self.index.moves(move_size)
+            legal = (
+                ((masks[None, :] & missing[rows, None]) == 0) &
+                (self.index.strengths(move_size)[None, :] > strengths[rows, None])
+            )
+            # Moves are sorted by strength, so the first legal one is the weakest
+            first = legal.argmax(axis=1)
+            can_play = legal[np.arange(len(rows)), first]
+            moves[rows[can_play]] = masks[first[can_play]]
+
+        rows = np.flatnonzero(leading)
+        if rows.size:
+            legal = (self._leads[None, :] & missing[rows, None]) == 0
+            legal &= ~np.asarray(openings, dtype=bool)[rows, None] | self._leads_open[None, :]
+            first = legal.argmax(axis=1)
+            can_lead = legal[np.arange(len(rows)), first]
+            moves[rows[can_lead]] = self._leads[first[can_lead]]
+            invalid[rows[~can_lead]] = True
+        return moves, invalid
+
+
+class BotService:
+    def __init__(
+            self,
+            index: Optional[MoveIndex] = None,
+            max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+            max_latency: float = DEFAULT_MAX_LATENCY,
+            max_queue: int = DEFAULT_MAX_QUEUE,
+            rules: Optional[CompiledRules] = None,
+    ):
+        """
+        :param max_batch_size: requests decided together at most
+        :param max_latency: seconds a request waits for its batch to fill
+        :param max_queue: requests queued at most before ``decide`` pushes back
+        :param rules: the variant to play, whose move index replaces ``index``;
+            the standard game by default
+        """
+        if rules is not None:
+            self.chooser = MoveChooser(rules.move_index, rules.strength_table)
+        else:
+            self.chooser = MoveChooser(index if index is not None else MoveIndex.load())
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+        self.max_queue = max_queue
+        self.stats = ServiceStats()
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    async def __aenter__(self) -> 'BotService':
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def start(self):
+        self._queue = asyncio.Queue(self.max_queue)
+        self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def close(self):
+        """Stop deciding; requests still queued fail with CancelledError."""
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        while not self._queue.empty():
+            self._queue.get_nowait()[-1].cancel()
+        self._worker = None
+
+    async def decide(self, state: DeucesGameState, block: bool = True) -> int:
+        """The move to make in ``state``; PASS when not leading and nothing beats the table."""
+        if self._worker is None:
+            raise RuntimeError('the service is not running')
+        if state.is_over:
+            raise ValueError('the game is over')
+        if bitmask.popcount(state.table) > MAX_MOVE_SIZE:
+            raise ValueError(f'invalid table move {state.table:#x}')
+        if state.is_opening and not state.hands[state.turn] & OPENING_CARD_MASK:
+            raise ValueError(f'player {state.turn} leads the opening without the 3♢')
+        started = instrumentation.start('bot_service.decide') if instrumentation.ENABLED else None
+        loop = asyncio.get_running_loop()
+        request = (loop.time(), state.hands[state.turn], state.table, state.is_opening, loop.create_future())
+        if block:
+            await self._queue.put(request)
+        else:
+            try:
+                self._queue.put_nowait(request)
+            except asyncio.QueueFull:
+                self.stats.rejected += 1
+                raise ServiceOverloaded(f'{self.max_queue} requests already queued') from None
+        move = await request[-1]
+        if started is not None:
+            instrumentation.stop('bot_service.decide', started)
+        return move
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = batch[0][0] + self.max_latency
+            while len(batch) < self.max_batch_size:
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            _, hands, tables, openings, futures = zip(*batch)
+            self.stats.requests += len(batch)
+            self.stats.batches += 1
+            try:
+                moves, invalid = await loop.run_in_executor(None, self.chooser.choose, hands, tables, openings)
+            except Exception as e:
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for future, move, table, is_invalid in zip(futures, moves.tolist(), tables, invalid.tolist()):
+                if future.done():
+                    continue
+                if is_invalid and table == PASS:
+                    future.set_exception(ValueError('no legal lead'))
+                elif is_invalid:
+                    future.set_exception(ValueError(f'invalid table move {table:#x}'))
+                else:
+                    future.set_result(move)
+
+
+def state_from_request(request: dict) -> DeucesGameState:
+    return DeucesGameState(
+        [int(h) for h in request['hands']],
+        int(request.get('table', PASS)),
+        int(request.get('leader', 0)),
+        int(request.get('passes', 0)),
+        int(request.get('turn', 0)),
+    )
+
+
+async def handle_connection(service: BotService, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    """Answer each request line as soon as its batch is decided, in any order."""
+    pending: List[asyncio.Task] = []
+
+    async def answer(line: bytes):
+        request_id = None
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise TypeError('request must be a JSON object')
+            request_id = request.get('id')
+            response = {'id': request_id, 'move': await service.decide(state_from_request(request), block=False)}
+        except ServiceOverloaded:
+            response = {'id': request_id, 'error': 'overloaded'}
+        except (ValueError, KeyError, TypeError) as e:
+            response = {'id': request_id, 'error': str(e)}
+        writer.write(json.dumps(response).encode() + b'\n')
+        await writer.drain()
+
+    try:
+        while line := await reader.readline():
+            pending = [t for t in pending if not t.done()]
+            pending.append(asyncio.ensure_future(answer(line)))
+        await asyncio.gather(*pending)
+    finally:
+        writer.close()
+
+
+async def serve(service: BotService, host: str = '127.0.0.1', port: int = DEFAULT_PORT):
+    async with service:
+        server = await asyncio.start_server(lambda r, w: handle_connection(service, r, w), host, port)
+        async with server:
+            await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_MAX_BATCH_SIZE)
+    parser.add_argument('--latency-ms', type=float, default=DEFAULT_MAX_LATENCY * 1000,
+                        help='longest a request waits for its batch to fill')
+    parser.add_argument('--queue-size', type=int, default=DEFAULT_MAX_QUEUE)
+    args = parser.parse_args(argv)
+    service = BotService(
+        max_batch_size=args.batch_size,
+        max_latency=args.latency_ms / 1000,
+        max_queue=args.queue_size,
+    )
+    try:
+        asyncio.run(serve(service, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
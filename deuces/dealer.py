@@ -0,0 +1,126 @@
+"""Random four-player deals in bulk, as hand masks or ordinal arrays.
+
+A Dealer shuffles a whole batch of deals with a few numpy calls: each deal
+is an argsort of random keys over the cards left to deal, cut into one
+contiguous run per seat. Cards known to be in a seat's hand can be fixed,
+and only the rest are shuffled, which is what sampling the hidden hands of
+a game in progress needs.
+
+Deals depend only on the seed: dealing a batch at once gives the same
+deals as dealing it in smaller batches with the same known cards.
+"""
+from typing import (
+    TYPE_CHECKING,
+    Optional,
+    Sequence,
+    Union,
+)
+
+import numpy as np
+
+from cardgame import Deck
+from deuces import (
+    DeucesCard,
+    bitmask,
+)
+from deuces.game_state import NUM_PLAYERS
+
+if TYPE_CHECKING:
+    from deuces.rules import CompiledRules
+
+Seed = Union[None, int, np.random.SeedSequence, np.random.Generator]
+
+
+def deck_ordinals(deck: Optional[Deck] = None, rules: Optional['CompiledRules'] = None) -> np.ndarray:
+    """Sorted ordinals of the DeucesCards in ``deck``, a full 52-card deck by default.
+
+    With ``rules``, cards are numbered in that variant's rank and suit order.
+    """
+    if deck is None:
+        deck = Deck(DeucesCard.CARDS)
+    if rules is None:
+        ordinals = np.array(sorted(card.value for card in deck), dtype=np.uint64)
+    else:
+        ordinals = np.array(sorted(rules.ordinal_of(card) for card in deck), dtype=np.uint64)
+    if len(ordinals) % NUM_PLAYERS:
+        raise ValueError(f'cannot deal {len(ordinals)} cards evenly to {NUM_PLAYERS} players')
+    return ordinals
+
+
+def masks_to_ordinals(masks: np.ndarray, hand_size: int) -> np.ndarray:
+    """Sorted ordinals of each of ``masks``, which must all hold ``hand_size`` cards.
+
+    The result has shape ``masks.shape + (hand_size,)``.
+    """
+    masks = np.ascontiguousarray(masks, dtype='<u8')
+    bits = np.unpackbits(masks.view(np.uint8).reshape(masks.shape + (8,)), axis=-1, bitorder='little')
+    counts = bits.sum(axis=-1)
+    if (counts != hand_size).any():
+        raise ValueError(f'expected every hand to hold {hand_size} cards')
+    # nonzero walks the bits row by row, so each hand's ordinals come out sorted
+    return np.nonzero(bits.reshape(-1, 64))[1].astype(np.uint8).reshape(masks.shape + (hand_size,))
+
+
+class Dealer:
+    def __init__(self, seed: Seed = None, deck: Optional[Deck] = None, rules: Optional['CompiledRules'] = None):
+        """
+        :param seed: anything ``numpy.random.default_rng`` takes; a Generator is used as is
+        :param deck: the cards to deal, a full 52-card deck by default
+        :param rules: the variant whose ordinals to deal, the standard game's by default
+        """
+        self.generator = np.random.default_rng(seed)
+        self.ordinals = deck_ordinals(deck, rules)
+        self.deck_mask = bitmask.to_mask(self.ordinals.tolist())
+        self.hand_size = len(self.ordinals) // NUM_PLAYERS
+
+    def deal_masks(
+            self,
+            num_deals: int,
+            known: Sequence[int] = (0,) * NUM_PLAYERS,
+            hand_sizes: Optional[Sequence[int]] = None,
+            excluded: int = 0,
+    ) -> np.ndarray:
+        """``num_deals`` x NUM_PLAYERS hand masks.
+
+        :param known: cards fixed in each seat's hand, as masks
+        :param hand_sizes: cards in each seat's hand, ``known`` included; the
+            deck split evenly by default. Cards left over are not dealt.
+        :param excluded: cards out of play, such as those already played, that are never dealt
+        """
+        if len(known) != NUM_PLAYERS:
+            raise ValueError(f'expected {NUM_PLAYERS} known hands, got {len(known)}')
+        if hand_sizes is None:
+            hand_sizes = (self.hand_size,) * NUM_PLAYERS
+        if len(hand_sizes) != NUM_PLAYERS:
+            raise ValueError(f'expected {NUM_PLAYERS} hand sizes, got {len(hand_sizes)}')
+        fixed = 0
+        for hand in known:
+            if hand & fixed:
+                raise ValueError('a card is known to be in more than one hand')
+            fixed |= hand
+        if fixed & ~self.deck_mask:
+            raise ValueError('known cards are not all in the deck')
+        if fixed & excluded:
+            raise ValueError('a card is both known and excluded')
+        needed = [size - bitmask.popcount(hand) for size, hand in zip(hand_sizes, known)]
+        if min(needed) < 0:
+            raise ValueError('a seat holds more known cards than its hand size')
+        pool = np.array(bitmask.ordinals(self.deck_mask & ~fixed & ~excluded), dtype=np.uint64)
+        if sum(needed) > len(pool):
+            raise ValueError(f'{sum(needed)} cards to deal but only {len(pool)} left')
+
+        masks = np.tile(np.array(known, dtype=np.uint64), (num_deals, 1))
+        if not sum(needed):
+            return masks
+        order = np.argsort(self.generator.random((num_deals, len(pool))), axis=1)[:, :sum(needed)]
+        bits = np.left_shift(np.uint64(1), pool[order])
+        start = 0
+        for seat, n in enumerate(needed):
+            if n:
+                masks[:, seat] |= np.bitwise_or.reduce(bits[:, start:start + n], axis=1)
+            start += n
+        return masks
+
+    def deal_ordinals(self, num_deals: int, known: Sequence[int] = (0,) * NUM_PLAYERS) -> np.ndarray:
+        """``num_deals`` x NUM_PLAYERS x hand size sorted card ordinals, with even hands."""
+        return masks_to_ordinals(self.deal_masks(num_deals, known), self.hand_size)
@@ -0,0 +1,188 @@
+"""Samples the hidden hands of a game in progress.
+
+A player sees their own hand, the cards out of play and how many cards
+every other player holds. Any deal of the unseen cards that gives each
+other player the right number of them is consistent with that, and a
+Dealer draws such deals in bulk.
+
+Passes say a little more: a player who passed often had nothing that beat
+the table. With a ``pass_weight`` below 1, every deal is weighted by
+``pass_weight`` once for each pass that the hand it gives the passing
+player could have beaten, as it was when they passed. Plays need no
+weighting of their own, since the cards played are out of play and so
+never dealt.
+"""
+from dataclasses import (
+    dataclass,
+    field,
+)
+from typing import (
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+import numpy as np
+
+from deuces import bitmask
+from deuces.dealer import (
+    Dealer,
+    Seed,
+)
+from deuces.game_state import (
+    NUM_PLAYERS,
+    PASS,
+    DeucesGameState,
+)
+from deuces.hand_moves import moves_from_hand
+from deuces.validation import LogicalValidator
+from deuces.validation.combos import (
+    FIVE_CARD_COMBO_TO_ORDER,
+    VALID_STRAIGHTS_BY_RANK_IXS,
+    Flush,
+    FiveCard,
+    FourOfAKind,
+    FullHouse,
+    Straight,
+    StraightFlush,
+)
+
+_RANK_SHIFTS = np.arange(bitmask.NUM_RANKS, dtype=np.uint64) * np.uint64(bitmask.NUM_SUITS)
+_SUIT_SET_MASK = np.uint64((1 << bitmask.NUM_SUITS) - 1)
+_NIBBLE_POPCOUNT = np.array([bin(n).count('1') for n in range(1 << bitmask.NUM_SUITS)], dtype=np.int8)
+# Highest suit ix in each suit set, -1 for none
+_TOP_SUIT = np.array([n.bit_length() - 1 for n in range(1 << bitmask.NUM_SUITS)], dtype=np.int8)
+# Which ranks each straight uses, straights x ranks
+_STRAIGHT_RANKS = np.zeros((len(VALID_STRAIGHTS_BY_RANK_IXS), bitmask.NUM_RANKS), dtype=bool)
+for _i, _rank_ixs in enumerate(VALID_STRAIGHTS_BY_RANK_IXS):
+    _STRAIGHT_RANKS[_i, list(_rank_ixs)] = True
+_COMBO_TYPE_SHIFT: int = FiveCard.STRENGTH_FIELD_BITS * FiveCard.STRENGTH_NUM_FIELDS
+
+
+def can_beat(hands: np.ndarray, table: int) -> np.ndarray:
+    """Whether each of ``hands`` holds a move that beats ``table``.
+
+    Singles up to quads are checked with a few array operations over the
+    hands' suit sets; five-card moves are searched for once per distinct hand.
+    """
+    hands = np.asarray(hands, dtype=np.uint64)
+    move_size = bitmask.popcount(table)
+    strength = LogicalValidator.move_strength(table)
+    suit_sets = (hands[..., None] >> _RANK_SHIFTS) & _SUIT_SET_MASK
+    if move_size == 5:
+        return _can_beat_five_card(hands, suit_sets, table, strength >> _COMBO_TYPE_SHIFT)
+    rank_ixs = np.arange(bitmask.NUM_RANKS)
+    if move_size <= 2:
+        # Singles and pairs are as strong as their highest card
+        strengths = rank_ixs * bitmask.NUM_SUITS + _TOP_SUIT[suit_sets] + 1
+    else:
+        strengths = rank_ixs + 1
+    return ((_NIBBLE_POPCOUNT[suit_sets] >= move_size) & (strengths > strength)).any(axis=-1)
+
+
+def _can_beat_five_card(hands: np.ndarray, suit_sets: np.ndarray, table: int, table_combo_ix: int) -> np.ndarray:
+    """Hands with a combo of a higher type than ``table`` beat it, and those
+    with none of its type do not; the rest are searched once per distinct hand.
+    """
+    counts = _NIBBLE_POPCOUNT[suit_sets]
+    in_suit = (suit_sets[..., None, :] >> np.arange(bitmask.NUM_SUITS, dtype=np.uint64)[:, None]) & np.uint64(1)
+    in_suit = in_suit.astype(bool)
+    has_straight_flush = (in_suit[..., None, :] | ~_STRAIGHT_RANKS).all(axis=-1).any(axis=(-2, -1))
+    has_four = (counts == 4).any(axis=-1) & (counts.sum(axis=-1) >= 5)
+    has_full_house = (counts >= 3).any(axis=-1) & ((counts >= 2).sum(axis=-1) >= 2)
+    has_flush = (in_suit.sum(axis=-1) >= 5).any(axis=-1)
+    has_straight = ((counts[..., None, :] > 0) | ~_STRAIGHT_RANKS).all(axis=-1).any(axis=-1)
+    best_combo_ix = np.zeros(hands.shape, dtype=np.int8)
+    for combo, present in (
+            (Straight, has_straight),
+            (Flush, has_flush),
+            (FullHouse, has_full_house),
+            (FourOfAKind, has_four),
+            (StraightFlush, has_straight_flush),
+    ):
+        best_combo_ix[present] = FIVE_CARD_COMBO_TO_ORDER[combo]
+    beats = best_combo_ix > table_combo_ix
+    undecided = best_combo_ix == table_combo_ix
+    if undecided.any():
+        distinct, inverse = np.unique(hands[undecided], return_inverse=True)
+        found = [next(moves_from_hand(h, table), None) is not None for h in distinct.tolist()]
+        beats[undecided] = np.array(found, dtype=bool)[inverse.ravel()]
+    return beats
+
+
+@dataclass
+class Observation:
+    """What ``seat`` knows of a game."""
+    seat: int
+    hand: int
+    card_counts: Tuple[int, ...]
+    # Cards in no one's hand: played, or never dealt
+    out_of_play: int
+    # (player, move, table before it) of the moves seen, oldest first
+    moves_made: List[Tuple[int, int, int]] = field(default_factory=list)
+
+    @classmethod
+    def from_state(cls, state: DeucesGameState, seat: Optional[int] = None) -> 'Observation':
+        """What ``seat``, the player to move by default, knows of ``state``."""
+        if seat is None:
+            seat = state.turn
+        held = 0
+        for hand in state.hands:
+            held |= hand
+        return cls(
+            seat,
+            state.hands[seat],
+            tuple(bitmask.popcount(h) for h in state.hands),
+            bitmask.FULL_DECK_MASK & ~held,
+            state.moves_made,
+        )
+
+    @property
+    def unseen(self) -> int:
+        return bitmask.FULL_DECK_MASK & ~self.hand & ~self.out_of_play
+
+
+class Deals(NamedTuple):
+    # num_deals x NUM_PLAYERS hand masks
+    hands: np.ndarray
+    # Relative likelihood of each deal, 1 when passes are not weighed
+    weights: np.ndarray
+
+
+class DeterminizationSampler:
+    def __init__(self, observation: Observation, seed: Seed = None, pass_weight: float = 1.0):
+        """Sample the hands hidden from ``observation.seat``.
+
+        :param pass_weight: how much less likely a pass is when the player
+            could have beaten the table; 1 ignores passes
+        """
+        if not 0 < pass_weight <= 1:
+            raise ValueError(f'pass_weight must be in (0, 1], got {pass_weight}')
+        if bitmask.popcount(observation.hand) != observation.card_counts[observation.seat]:
+            raise ValueError('the observed hand does not hold the observed number of cards')
+        hidden = sum(observation.card_counts) - observation.card_counts[observation.seat]
+        if hidden != bitmask.popcount(observation.unseen):
+            raise ValueError(f'{bitmask.popcount(observation.unseen)} unseen cards for {hidden} hidden ones')
+        self.observation = observation
+        self.pass_weight = pass_weight
+        self.dealer = Dealer(seed)
+        self._known = tuple(observation.hand if p == observation.seat else 0 for p in range(NUM_PLAYERS))
+        # (player, table passed on, cards the player has played since) of the other players' passes
+        self._passes: List[Tuple[int, int, int]] = []
+        played_since = [0] * NUM_PLAYERS
+        for player, move, table in reversed(observation.moves_made):
+            if move != PASS:
+                played_since[player] |= move
+            elif player != observation.seat and table != PASS:
+                self._passes.append((player, table, played_since[player]))
+
+    def sample(self, num_deals: int) -> Deals:
+        observation = self.observation
+        hands = self.dealer.deal_masks(
+            num_deals, self._known, observation.card_counts, excluded=observation.out_of_play)
+        weights = np.ones(num_deals)
+        if self.pass_weight != 1:
+            for player, table, played_since in self._passes:
+                weights[can_beat(hands[:, player] | np.uint64(played_since), table)] *= self.pass_weight
+        return Deals(hands, weights)
@@ -3,11 +3,20 @@ from cardgame.card import (Rank, Suit)
 
 from typing import (
     Dict,
+    Iterable,
     List,
+    Tuple,
 )
 
+from deuces import bitmask
+
 
 class DeucesCard(Card):
+    """A view over a card ordinal (see ``deuces.bitmask``).
+
+    The ordinal is computed once on construction; ``rank`` and ``suit`` are
+    derived from it, so cards are immutable and hash by ordinal.
+    """
     RANK_ORDER: List[Rank] = list(
         map(lambda r: Rank(r), '3 4 5 6 7 8 9 T J Q K A 2'.split()))
     SUIT_ORDER: List[Suit] = [
@@ -16,42 +25,73 @@ class DeucesCard(Card):
         (r, i) for i, r in enumerate(RANK_ORDER))
     SUIT_TO_ORDER: Dict[Suit, int] = dict(
         (s, i) for i, s in enumerate(SUIT_ORDER))
+    # Filled in below the class with one shared instance per ordinal
+    CARDS: Tuple['DeucesCard', ...] = ()
 
     def __init__(self, rank, suit):
         if rank not in DeucesCard.RANK_TO_ORDER.keys():
             raise TypeError('expected rank to be type string')
         if suit not in DeucesCard.SUIT_TO_ORDER.keys():
             raise TypeError('expected suit to be type Suit')
-        super().__init__(rank, suit)
+        self._value = bitmask.ordinal_of(
+            DeucesCard.RANK_TO_ORDER[rank], DeucesCard.SUIT_TO_ORDER[suit])
 
     def __gt__(self, other):
-        return other.value < self.value
+        return other._value < self._value
 
     def __lt__(self, other):
-        return self.value < other.value
+        return self._value < other._value
 
     def __ge__(self, other):
-        return other.value <= self.value
+        return other._value <= self._value
 
     def __le__(self, other):
-        return self.value <= other.value
+        return self._value <= other._value
 
     def __eq__(self, other):
-        return self.value == other.value
+        return self._value == other._value
 
     def __ne__(self, other):
-        return self.value != other.value
+        return self._value != other._value
+
+    def __hash__(self):
+        return self._value
+
+    @property
+    def rank(self) -> Rank:
+        return DeucesCard.RANK_ORDER[bitmask.rank_of(self._value)]
+
+    @property
+    def suit(self) -> Suit:
+        return DeucesCard.SUIT_ORDER[bitmask.suit_of(self._value)]
+
+    @property
+    def value(self) -> int:
+        return self._value
 
     @property
-    def value(self):
-        rank_val = DeucesCard.RANK_TO_ORDER[self.rank]
-        suit_val = DeucesCard.SUIT_TO_ORDER[self.suit]
-        return (rank_val * len(DeucesCard.SUIT_ORDER)) + suit_val
+    def mask(self) -> int:
+        return 1 << self._value
 
     @classmethod
     def from_value(cls, value: int):
-        return cls(
-            rank=DeucesCard.RANK_ORDER[value // len(DeucesCard.SUIT_ORDER)],
-            suit=DeucesCard.SUIT_ORDER[value % len(DeucesCard.SUIT_ORDER)],
-        )
+        if not (0 <= value < bitmask.NUM_CARDS):
+            raise ValueError(f'expected value in [0, {bitmask.NUM_CARDS}), got {value}')
+        card = object.__new__(cls)
+        card._value = value
+        return card
+
+    @staticmethod
+    def to_mask(cards: Iterable['DeucesCard']) -> int:
+        mask = 0
+        for c in cards:
+            mask |= 1 << c._value
+        return mask
+
+    @staticmethod
+    def from_mask(mask: int) -> Tuple['DeucesCard', ...]:
+        """Cards in ``mask``, lowest first."""
+        return tuple(DeucesCard.CARDS[o] for o in bitmask.ordinals(mask))
+
 
+DeucesCard.CARDS = tuple(DeucesCard.from_value(v) for v in range(bitmask.NUM_CARDS))
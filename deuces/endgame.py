@@ -0,0 +1,230 @@
+"""Exact play for endgames with few cards left.
+
+The solver runs a max-n search where a player's only payoff is winning:
+the player to move plays a move that lets them win if there is one, and
+otherwise the first move in the search order, which decides who wins
+instead. Moves are searched plays first, most cards and then the strongest
+first, and a player stops searching at their first winning move.
+
+Solved states and their winners go in an EndgameTable, which doubles as
+the transposition table and can be saved to a compact sorted file that
+other processes load and search in place.
+"""
+import bisect
+import mmap
+import os
+import struct
+
+from dataclasses import dataclass
+from typing import (
+    Dict,
+    List,
+    Optional,
+    Tuple,
+)
+
+from deuces import bitmask
+from deuces.game_state import (
+    PASS,
+    STATE_BYTES,
+    DeucesGameState,
+    TrackingDeucesGameState,
+)
+from deuces.validation import LogicalValidator
+
+DEFAULT_MAX_CARDS: int = 16
+
+# File layout, little-endian: magic, version (u16), record size (u16),
+# number of records (u64), then the records sorted by state: the state's
+# to_bytes() encoding and the winner (u8)
+MAGIC: bytes = b'DCEG'
+VERSION: int = 1
+HEADER = struct.Struct('<4sHHQ')
+RECORD_BYTES: int = STATE_BYTES + 1
+
+
+class _Records:
+    """The state keys of a mapped table file, as a sequence bisect can search."""
+
+    def __init__(self, buffer, count: int):
+        self._buffer = buffer
+        self._count = count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, i: int) -> bytes:
+        start = HEADER.size + i * RECORD_BYTES
+        return self._buffer[start:start + STATE_BYTES]
+
+    def winner(self, i: int) -> int:
+        return self._buffer[HEADER.size + i * RECORD_BYTES + STATE_BYTES]
+
+
+class EndgameTable:
+    """Winner of each solved state, keyed by ``DeucesGameState.to_bytes()``.
+
+    Entries come from a loaded file, searched in place, and from solves
+    since, kept in a dict until ``save``.
+    """
+
+    def __init__(self):
+        self._entries: Dict[bytes, int] = {}
+        self._mmap: Optional[mmap.mmap] = None
+        self._records = _Records(b'', 0)
+
+    @classmethod
+    def load(cls, path: str) -> 'EndgameTable':
+        table = cls()
+        with open(path, 'rb') as f:
+            table._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, record_size, count = HEADER.unpack_from(table._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f'not an endgame table, bad magic {magic!r}')
+        if version != VERSION:
+            raise ValueError(f'unsupported endgame table version {version}, expected {VERSION}')
+        if record_size != RECORD_BYTES:
+            raise ValueError(f'unexpected record size {record_size}')
+        table._records = _Records(table._mmap, count)
+        return table
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Unmap the loaded file; entries added since are kept."""
+        if self._mmap is not None:
+            self._entries.update(self._loaded_entries())
+            self._records = _Records(b'', 0)
+            self._mmap.close()
+            self._mmap = None
+
+    def __len__(self) -> int:
+        return len(self._records) + len(self._entries)
+
+    def get(self, key: bytes) -> Optional[int]:
+        winner = self._entries.get(key)
+        if winner is not None:
+            return winner
+        i = bisect.bisect_left(self._records, key)
+        if i < len(self._records) and self._records[i] == key:
+            return self._records.winner(i)
+        return None
+
+    def put(self, key: bytes, winner: int):
+        self._entries[key] = winner
+
+    def save(self, path: str):
+        """Write every entry, loaded or added, to ``path``."""
+        entries = dict(self._loaded_entries())
+        entries.update(self._entries)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, RECORD_BYTES, len(entries)))
+            f.write(b''.join(key + bytes((winner,)) for key, winner in sorted(entries.items())))
+        os.replace(tmp_path, path)
+
+    def _loaded_entries(self):
+        for i in range(len(self._records)):
+            yield self._records[i], self._records.winner(i)
+
+
+@dataclass
+class SolverStats:
+    nodes: int = 0
+    table_hits: int = 0
+
+
+class EndgameSolver:
+    def __init__(self, max_cards: int = DEFAULT_MAX_CARDS, table: Optional[EndgameTable] = None):
+        """
+        :param max_cards: most cards left in all hands together that ``solve`` accepts
+        :param table: solved states to reuse and add to, a new one by default;
+            its keys do not include the rules, so keep one table per variant
+        """
+        self.max_cards = max_cards
+        self.table = table if table is not None else EndgameTable()
+        self.stats = SolverStats()
+
+    def solve(self, state: DeucesGameState) -> int:
+        """The player who wins ``state`` when everyone plays as described above."""
+        return self._winner(self._search_state(state))
+
+    def best_move(self, state: DeucesGameState) -> int:
+        """A winning move for the player to move if they have one, otherwise the first searched."""
+        search_state = self._search_state(state)
+        if search_state.is_over:
+            raise ValueError('the game is over')
+        moves = self._ordered_moves(search_state)
+        for move in moves:
+            search_state.apply_move(move)
+            winner = self._winner(search_state)
+            search_state.undo_move()
+            if winner == search_state.turn:
+                return move
+        return moves[0]
+
+    def _search_state(self, state: DeucesGameState) -> TrackingDeucesGameState:
+        cards_left = sum(bitmask.popcount(h) for h in state.hands)
+        if cards_left > self.max_cards:
+            raise ValueError(f'{cards_left} cards left, the solver takes at most {self.max_cards}')
+        return TrackingDeucesGameState.from_key(state.key(), state.rules)
+
+    def _winner(self, state: TrackingDeucesGameState) -> int:
+        # Depth grows by up to a trick of passes per card played, so the
+        # search keeps its own stack of [key, player, moves, next move, winner]
+        # frames rather than recursing
+        key, winner = self._known_winner(state)
+        if winner is not None:
+            return winner
+        stack = [self._frame(state, key)]
+        outcome = None
+        while stack:
+            frame = stack[-1]
+            key, me, moves, i, winner = frame
+            if outcome is not None:
+                # The move before frame[3] has been searched
+                state.undo_move()
+                if winner is None or outcome == me:
+                    winner = frame[4] = outcome
+                if outcome == me:
+                    i = len(moves)
+                outcome = None
+            if i == len(moves):
+                self.table.put(key, winner)
+                stack.pop()
+                outcome = winner
+                continue
+            frame[3] = i + 1
+            state.apply_move(moves[i])
+            child_key, outcome = self._known_winner(state)
+            if outcome is None:
+                stack.append(self._frame(state, child_key))
+        return outcome
+
+    def _known_winner(self, state: TrackingDeucesGameState) -> Tuple[Optional[bytes], Optional[int]]:
+        """Key of ``state`` and its winner if the game is over or the state is solved."""
+        if state.is_over:
+            return None, state.winner
+        key = state.to_bytes()
+        winner = self.table.get(key)
+        if winner is not None:
+            self.stats.table_hits += 1
+        return key, winner
+
+    def _frame(self, state: TrackingDeucesGameState, key: bytes) -> list:
+        self.stats.nodes += 1
+        return [key, state.turn, self._ordered_moves(state), 0, None]
+
+    @staticmethod
+    def _ordered_moves(state: DeucesGameState) -> List[int]:
+        move_strength = LogicalValidator.move_strength if state.rules is None else state.rules.move_strength
+
+        def order(move: int):
+            if move == PASS:
+                return 1, 0, 0
+            return 0, -bitmask.popcount(move), -move_strength(move)
+        return sorted(state.legal_moves(), key=order)
@@ -0,0 +1,320 @@
+"""Enumerates the game states reachable from a set of root states.
+
+States travel as their fixed-width ``DeucesGameState.to_bytes`` encoding.
+
+Every move strictly lowers a state's ``state_level``, so breadth-first runs
+expand one level at a time, highest first, and a state can only ever be
+found on its own level. Each level's states are buffered in memory,
+spilled to disk as sorted chunks whenever the buffers pass the memory
+budget, and read back as a deduplicated merge of the level's chunks, so
+every state is expanded exactly once whatever the budget.
+
+Depth-first runs keep a stack whose oldest entries spill to disk instead,
+and only skip states that are still in the transposition table.
+
+The transposition table of canonical state keys skips states already
+generated. It is bounded, and cleared when full.
+
+Runs checkpoint to a JSON file (breadth-first between levels, depth-first
+every ``checkpoint_every`` states) and can be resumed from it.
+"""
+import heapq
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+
+from dataclasses import (
+    asdict,
+    dataclass,
+)
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from deuces import bitmask
+from deuces.game_state import (
+    NUM_PLAYERS,
+    PASS,
+    STATE_BYTES,
+    DeucesGameState,
+)
+
+if TYPE_CHECKING:
+    from deuces.rules import CompiledRules
+
+BREADTH_FIRST: str = 'bfs'
+DEPTH_FIRST: str = 'dfs'
+CHECKPOINT_VERSION: int = 1
+# Chunks are read back this many records at a time
+READ_BLOCK_RECORDS: int = 4096
+
+CanonicalKey = Callable[[DeucesGameState], bytes]
+
+
+@dataclass
+class ExplorationStats:
+    states: int = 0
+    terminal_states: int = 0
+    transposition_hits: int = 0
+    levels: int = 0
+    spilled_chunks: int = 0
+    peak_frontier: int = 0
+    peak_rss_bytes: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def states_per_sec(self) -> float:
+        return self.states / self.elapsed if self.elapsed else 0.0
+
+
+def peak_rss_bytes() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def state_level(state: DeucesGameState) -> int:
+    """Strictly decreases with every move.
+
+    Plays remove cards, and passes either count towards clearing the table
+    or clear it, so order by cards left, then whether there is a move to
+    beat, then passes left before the table clears.
+    """
+    cards_left = sum(bitmask.popcount(h) for h in state.hands)
+    return (cards_left * 2 + (state.table != PASS)) * NUM_PLAYERS + (NUM_PLAYERS - 1 - state.passes)
+
+
+class Explorer:
+    def __init__(
+            self,
+            order: str = BREADTH_FIRST,
+            memory_budget: int = 256 << 20,
+            transposition_size: int = 1 << 22,
+            spill_directory: Optional[str] = None,
+            checkpoint_path: Optional[str] = None,
+            checkpoint_every: int = 1 << 20,
+            canonical_key: CanonicalKey = DeucesGameState.to_bytes,
+            on_state: Optional[Callable[[DeucesGameState], None]] = None,
+            rules: Optional['CompiledRules'] = None,
+    ):
+        """
+        :param memory_budget: bytes of frontier kept in memory before spilling to disk
+        :param transposition_size: keys kept in the transposition table before it is cleared
+        :param canonical_key: maps a state to the ``to_bytes`` encoding of the representative
+            of its equivalence class
+        :param on_state: called with every state as it is expanded
+        :param rules: the variant to play, the standard game by default
+        """
+        if order not in (BREADTH_FIRST, DEPTH_FIRST):
+            raise ValueError(f'expected order {BREADTH_FIRST!r} or {DEPTH_FIRST!r}, got {order!r}')
+        self.order = order
+        self.frontier_budget = max(1, memory_budget // STATE_BYTES)
+        self.transposition_size = transposition_size
+        self._owns_spill_directory = spill_directory is None
+        self.spill_directory = spill_directory or tempfile.mkdtemp(prefix='deuces-explorer-')
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_every = checkpoint_every
+        self.canonical_key = canonical_key
+        self.on_state = on_state
+        self.rules = rules
+        self.stats = ExplorationStats()
+        self._transpositions: Set[bytes] = set()
+        # Breadth-first frontier: sorted chunk files and unsorted buffers per level
+        self._level_chunks: Dict[int, List[str]] = {}
+        self._level_buffers: Dict[int, List[bytes]] = {}
+        self._buffered = 0
+        # Depth-first frontier: chunk files of spilled stack entries, and the stack
+        self._chunks: List[str] = []
+        self._stack: List[bytes] = []
+        self._next_chunk_ix = 0
+        # Chunks already read back, deleted once a checkpoint no longer refers to them
+        self._consumed_chunks: List[str] = []
+        self._started_at = time.perf_counter()
+
+    @classmethod
+    def resume(cls, checkpoint_path: str, **kwargs) -> 'Explorer':
+        with open(checkpoint_path) as f:
+            checkpoint = json.load(f)
+        if checkpoint['version'] != CHECKPOINT_VERSION:
+            raise ValueError(f"unsupported checkpoint version {checkpoint['version']}")
+        explorer = cls(
+            order=checkpoint['order'],
+            spill_directory=checkpoint['spill_directory'],
+            checkpoint_path=checkpoint_path,
+            **kwargs,
+        )
+        explorer.stats = ExplorationStats(**checkpoint['stats'])
+        explorer._level_chunks = dict((int(level), paths) for level, paths in checkpoint['level_chunks'].items())
+        explorer._chunks = checkpoint['chunks']
+        explorer._next_chunk_ix = checkpoint['next_chunk_ix']
+        return explorer
+
+    def explore(self, roots: Iterable[DeucesGameState] = (), max_states: Optional[int] = None) -> ExplorationStats:
+        """Expand states from ``roots`` and from any resumed frontier.
+
+        With ``max_states``, stops at the first checkpoint (the end of a level
+        when breadth-first) after that many states in total were expanded.
+        """
+        self._started_at = time.perf_counter() - self.stats.elapsed
+        roots = [(state_level(r), self.canonical_key(r)) for r in roots]
+        try:
+            if self.order == BREADTH_FIRST:
+                self._explore_breadth_first(roots, max_states)
+            else:
+                self._explore_depth_first(roots, max_states)
+        finally:
+            self._update_stats()
+        if self._owns_spill_directory and self.checkpoint_path is None and not os.listdir(self.spill_directory):
+            os.rmdir(self.spill_directory)
+        return self.stats
+
+    def _explore_breadth_first(self, roots: List[Tuple[int, bytes]], max_states: Optional[int]):
+        for level, record in roots:
+            self._buffer(level, record)
+        since_checkpoint = 0
+        while self._level_chunks or self._level_buffers:
+            level = max(set(self._level_chunks) | set(self._level_buffers))
+            chunks = self._level_chunks.pop(level, [])
+            buffer = self._level_buffers.pop(level, [])
+            self._buffered -= len(buffer)
+            states_before = self.stats.states
+            for record in _merge_sorted([_read_chunk(p) for p in chunks] + [sorted(buffer)]):
+                for child_level, child in self._expand(record):
+                    self._buffer(child_level, child)
+            self._consumed_chunks.extend(chunks)
+            self.stats.levels += 1
+            since_checkpoint += self.stats.states - states_before
+            done = max_states is not None and self.stats.states >= max_states
+            if since_checkpoint >= self.checkpoint_every or done:
+                since_checkpoint = 0
+                self._spill_buffers()
+                self._checkpoint()
+                if done:
+                    return
+        self._checkpoint()
+
+    def _buffer(self, level: int, record: bytes):
+        self._level_buffers.setdefault(level, []).append(record)
+        self._buffered += 1
+        self.stats.peak_frontier = max(self.stats.peak_frontier, self._buffered)
+        if self._buffered >= self.frontier_budget:
+            self._spill_buffers()
+
+    def _spill_buffers(self):
+        for level, buffer in self._level_buffers.items():
+            self._level_chunks.setdefault(level, []).append(self._write_chunk(sorted(set(buffer))))
+        self._level_buffers = {}
+        self._buffered = 0
+
+    def _explore_depth_first(self, roots: List[Tuple[int, bytes]], max_states: Optional[int]):
+        self._stack.extend(record for _, record in roots)
+        since_checkpoint = 0
+        while self._stack or self._chunks:
+            if not self._stack:
+                path = self._chunks.pop()
+                self._stack = list(_read_chunk(path))
+                self._consumed_chunks.append(path)
+            self._stack.extend(record for _, record in self._expand(self._stack.pop()))
+            self.stats.peak_frontier = max(self.stats.peak_frontier, len(self._stack))
+            if len(self._stack) > self.frontier_budget:
+                # Spill the oldest half, which is popped last
+                half = len(self._stack) // 2
+                self._chunks.append(self._write_chunk(self._stack[:half]))
+                del self._stack[:half]
+            since_checkpoint += 1
+            if since_checkpoint >= self.checkpoint_every or (max_states is not None and self.stats.states >= max_states):
+                since_checkpoint = 0
+                if self._stack:
+                    self._chunks.append(self._write_chunk(self._stack))
+                    self._stack = []
+                self._checkpoint()
+                if max_states is not None and self.stats.states >= max_states:
+                    return
+        self._checkpoint()
+
+    def _expand(self, record: bytes) -> Iterator[Tuple[int, bytes]]:
+        state = DeucesGameState.from_bytes(record, self.rules)
+        self.stats.states += 1
+        if self.on_state is not None:
+            self.on_state(state)
+        if state.is_over:
+            self.stats.terminal_states += 1
+            return
+        for move in list(state.legal_moves()):
+            state.apply_move(move)
+            level = state_level(state)
+            key = self.canonical_key(state)
+            state.undo_move()
+            if key in self._transpositions:
+                self.stats.transposition_hits += 1
+                continue
+            if len(self._transpositions) >= self.transposition_size:
+                self._transpositions.clear()
+            self._transpositions.add(key)
+            yield level, key
+
+    def _write_chunk(self, records: List[bytes]) -> str:
+        path = os.path.join(self.spill_directory, f'chunk-{self._next_chunk_ix:08d}.bin')
+        self._next_chunk_ix += 1
+        with open(path, 'wb') as f:
+            f.write(b''.join(records))
+        self.stats.spilled_chunks += 1
+        return path
+
+    def _update_stats(self):
+        self.stats.elapsed = time.perf_counter() - self._started_at
+        self.stats.peak_rss_bytes = max(self.stats.peak_rss_bytes, peak_rss_bytes())
+
+    def _checkpoint(self):
+        if self.checkpoint_path is not None:
+            self._write_checkpoint()
+        for path in self._consumed_chunks:
+            os.remove(path)
+        self._consumed_chunks = []
+
+    def _write_checkpoint(self):
+        self._update_stats()
+        checkpoint = {
+            'version': CHECKPOINT_VERSION,
+            'order': self.order,
+            'spill_directory': self.spill_directory,
+            'level_chunks': self._level_chunks,
+            'chunks': self._chunks,
+            'next_chunk_ix': self._next_chunk_ix,
+            'stats': asdict(self.stats),
+        }
+        # Replace atomically so that a crash leaves the previous checkpoint intact
+        tmp_path = self.checkpoint_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(checkpoint, f)
+        os.replace(tmp_path, self.checkpoint_path)
+
+
+def _read_chunk(path: str) -> Iterator[bytes]:
+    with open(path, 'rb') as f:
+        while True:
+            block = f.read(STATE_BYTES * READ_BLOCK_RECORDS)
+            if not block:
+                return
+            for i in range(0, len(block), STATE_BYTES):
+                yield block[i:i + STATE_BYTES]
+
+
+def _merge_sorted(runs: List[Iterable[bytes]]) -> Iterator[bytes]:
+    """Records of sorted runs in sorted order, without duplicates."""
+    previous = None
+    for record in heapq.merge(*runs):
+        if record != previous:
+            yield record
+            previous = record
@@ -0,0 +1,214 @@
+from typing import (
+    TYPE_CHECKING,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from cardgame import GameState
+from deuces import (
+    bitmask,
+    instrumentation,
+)
+from deuces.hand_moves import (
+    HandMoveSet,
+    moves_from_hand,
+)
+from deuces.validation import LogicalValidator
+
+if TYPE_CHECKING:
+    from deuces.rules import CompiledRules
+
+NUM_PLAYERS: int = 4
+# The move a player makes when they pass
+PASS: int = 0
+# Whoever holds the lowest card, the 3♢ in the standard game, leads the
+# first trick, and their first move must include it
+OPENING_CARD_MASK: int = 1 << bitmask.ordinal_of(0, 0)
+
+# hand masks of players 0-3, table move mask, leader, passes, turn
+StateKey = Tuple[int, int, int, int, int, int, int, int]
+_MASK_BYTES: int = (bitmask.NUM_CARDS + 7) // 8
+STATE_BYTES: int = _MASK_BYTES * (NUM_PLAYERS + 1) + 1
+
+
+class DeucesGameState(GameState):
+    """Four hands, the move on the table and whose turn it is.
+
+    ``table`` is the move to beat, PASS when the player to move leads.
+    ``leader`` is the player who made it and ``passes`` counts the passes
+    since. Once every other player has passed, the table clears and the
+    leader leads again.
+
+    Moves are hand masks applied in place: ``apply_move`` and ``undo_move``
+    are O(1) and never copy hands, which suits depth-first search. Neither
+    checks legality; use ``legal_moves`` or ``is_legal_move`` for that.
+    States are mutable, so use ``key()`` or ``to_bytes()`` to put them in
+    sets and dicts.
+
+    ``rules`` plays a house variant (see ``deuces.rules``) off its compiled
+    tables; None plays the standard game, whose tables
+    ``compile_rules()`` reproduces. Keys do not include the rules.
+    """
+    __slots__ = ('hands', 'table', 'leader', 'passes', 'turn', 'rules', '_history')
+
+    def __init__(
+            self,
+            hands: Sequence[int],
+            table: int = PASS,
+            leader: int = 0,
+            passes: int = 0,
+            turn: int = 0,
+            rules: Optional['CompiledRules'] = None,
+    ):
+        if len(hands) != NUM_PLAYERS:
+            raise ValueError(f'expected {NUM_PLAYERS} hands, got {len(hands)}')
+        self.hands: List[int] = list(hands)
+        self.table = table
+        self.leader = leader
+        self.passes = passes
+        self.turn = turn
+        self.rules = rules
+        self._history: List[Tuple[int, int, int, int, int]] = []
+
+    @classmethod
+    def deal(cls, hands: Sequence[int], rules: Optional['CompiledRules'] = None) -> 'DeucesGameState':
+        """Start of a game; the holder of the 3♢, the lowest card, leads."""
+        turn = next((p for p, h in enumerate(hands) if h & OPENING_CARD_MASK), 0)
+        return cls(hands, leader=turn, turn=turn, rules=rules)
+
+    @classmethod
+    def from_key(cls, key: StateKey, rules: Optional['CompiledRules'] = None) -> 'DeucesGameState':
+        *hands, table, leader, passes, turn = key
+        return cls(hands, table, leader, passes, turn, rules)
+
+    @classmethod
+    def from_bytes(cls, data: bytes, rules: Optional['CompiledRules'] = None) -> 'DeucesGameState':
+        masks = [
+            int.from_bytes(data[i * _MASK_BYTES:(i + 1) * _MASK_BYTES], 'little')
+            for i in range(NUM_PLAYERS + 1)
+        ]
+        small = data[-1]
+        return cls(masks[:NUM_PLAYERS], masks[NUM_PLAYERS], small >> 4, (small >> 2) & 3, small & 3, rules)
+
+    def key(self) -> StateKey:
+        h = self.hands
+        return h[0], h[1], h[2], h[3], self.table, self.leader, self.passes, self.turn
+
+    def to_bytes(self) -> bytes:
+        """Fixed-width, STATE_BYTES long encoding of ``key()``."""
+        masks = b''.join(m.to_bytes(_MASK_BYTES, 'little') for m in (*self.hands, self.table))
+        return masks + bytes(((self.leader << 4) | (self.passes << 2) | self.turn,))
+
+    def __repr__(self):
+        return (
+            f'{self.__class__.__name__}(hands={[hex(h) for h in self.hands]}, table={self.table:#x}, '
+            f'leader={self.leader}, passes={self.passes}, turn={self.turn})'
+        )
+
+    @property
+    def is_opening(self) -> bool:
+        return self.table == PASS and sum(bitmask.popcount(h) for h in self.hands) == bitmask.NUM_CARDS
+
+    @property
+    def is_over(self) -> bool:
+        return not all(self.hands)
+
+    @property
+    def winner(self) -> Optional[int]:
+        return next((p for p, h in enumerate(self.hands) if not h), None)
+
+    @property
+    def moves_made(self) -> List[Tuple[int, int, int]]:
+        """``(player, move, table before it)`` of every move applied so far, oldest first."""
+        return [(turn, move, table) for move, table, _, _, turn in self._history]
+
+    def legal_moves(self) -> Iterator[int]:
+        """Moves the player to move can make, including PASS when they do not lead."""
+        if self.is_over:
+            return
+        generate = moves_from_hand if self.rules is None else self.rules.moves_from_hand
+        if self.table == PASS:
+            moves = generate(self.hands[self.turn])
+            if self.is_opening:
+                moves = (m for m in moves if m & OPENING_CARD_MASK)
+            yield from moves
+        else:
+            yield from generate(self.hands[self.turn], self.table)
+            yield PASS
+
+    def is_legal_move(self, move: int) -> bool:
+        if self.is_over:
+            return False
+        if move & ~self.hands[self.turn]:
+            return False
+        validator = LogicalValidator if self.rules is None else self.rules
+        if self.table == PASS:
+            return (
+                move != PASS and
+                validator.is_valid_mask(move) and
+                (not self.is_opening or bool(move & OPENING_CARD_MASK))
+            )
+        return move == PASS or validator.is_valid_mask(move, self.table)
+
+    def apply_move(self, move: int):
+        started = instrumentation.start('game_state.apply_move') if instrumentation.ENABLED else None
+        turn = self.turn
+        self._history.append((move, self.table, self.leader, self.passes, turn))
+        if move == PASS:
+            self.passes += 1
+            if self.passes == NUM_PLAYERS - 1:
+                # Everyone else passed, so the leader leads again
+                self.table = PASS
+                self.passes = 0
+        else:
+            self.hands[turn] ^= move
+            self.table = move
+            self.leader = turn
+            self.passes = 0
+        self.turn = (turn + 1) % NUM_PLAYERS
+        if started is not None:
+            instrumentation.stop('game_state.apply_move', started)
+
+    def undo_move(self):
+        move, self.table, self.leader, self.passes, self.turn = self._history.pop()
+        self.hands[self.turn] |= move
+
+
+class TrackingDeucesGameState(DeucesGameState):
+    """A DeucesGameState that keeps a HandMoveSet per player.
+
+    Legal moves come from the maintained sets, which suits rollouts and
+    searches that ask for them every turn.
+    """
+    __slots__ = ('move_sets',)
+
+    def __init__(self, hands: Sequence[int], *args, **kwargs):
+        super().__init__(hands, *args, **kwargs)
+        self.move_sets: List[HandMoveSet] = [HandMoveSet(h, self.rules) for h in self.hands]
+
+    def legal_moves(self) -> Iterator[int]:
+        if self.is_over:
+            return
+        move_set = self.move_sets[self.turn]
+        if self.table == PASS:
+            moves = move_set.replies()
+            if self.is_opening:
+                moves = (m for m in moves if m & OPENING_CARD_MASK)
+            yield from moves
+        else:
+            yield from move_set.replies(self.table)
+            yield PASS
+
+    def apply_move(self, move: int):
+        if move != PASS:
+            self.move_sets[self.turn].remove(move)
+        super().apply_move(move)
+
+    def undo_move(self):
+        move = self._history[-1][0]
+        super().undo_move()
+        if move != PASS:
+            self.move_sets[self.turn].restore()
@@ -0,0 +1,156 @@
+"""Heuristic quality of a hand, scored for many hands at once.
+
+A hand is described by a few features of its rank and suit histograms:
+its size, its control cards (2s and aces), the pairs, triples, quads,
+straights, flushes and full houses it can make, and the singles left over
+that nothing else takes. A score is a weighted sum of the features, higher
+is better.
+
+Everything works on arrays of unsigned 64-bit hand masks, so a policy can
+score the hand every legal move leaves behind in one call.
+"""
+import random
+
+from dataclasses import (
+    astuple,
+    dataclass,
+    fields,
+)
+from typing import (
+    List,
+    Sequence,
+    Tuple,
+)
+
+import numpy as np
+
+from deuces import bitmask
+from deuces.game_state import (
+    PASS,
+    DeucesGameState,
+)
+from deuces.validation.combos import VALID_STRAIGHTS_BY_RANK_IXS
+
+# What passing while able to play costs, against the score of the hand kept
+DEFAULT_PASS_PENALTY: float = 2.0
+
+TWO_RANK_IX: int = bitmask.NUM_RANKS - 1
+ACE_RANK_IX: int = bitmask.NUM_RANKS - 2
+
+_RANK_SHIFTS = np.arange(bitmask.NUM_RANKS, dtype=np.uint64) * np.uint64(bitmask.NUM_SUITS)
+_NIBBLE_POPCOUNT = np.array([bin(n).count('1') for n in range(1 << bitmask.NUM_SUITS)], dtype=np.int8)
+# Which ranks each straight uses, straights x ranks
+_STRAIGHT_RANKS = np.zeros((len(VALID_STRAIGHTS_BY_RANK_IXS), bitmask.NUM_RANKS), dtype=bool)
+for _i, _rank_ixs in enumerate(VALID_STRAIGHTS_BY_RANK_IXS):
+    _STRAIGHT_RANKS[_i, list(_rank_ixs)] = True
+
+
+@dataclass(frozen=True)
+class HandWeights:
+    """How much each feature adds to a score, in the order of FEATURES."""
+    cards: float = -1.0
+    twos: float = 1.5
+    aces: float = 0.75
+    pairs: float = 0.5
+    triples: float = 1.0
+    quads: float = 2.0
+    straights: float = 0.25
+    flushes: float = 0.75
+    full_houses: float = 0.75
+    loose_singles: float = -0.25
+    # Sum over loose singles of how many ranks each is below the 2
+    loose_single_lowness: float = -0.05
+
+
+FEATURES: Tuple[str, ...] = tuple(f.name for f in fields(HandWeights))
+
+
+def _suit_sets(masks: np.ndarray) -> np.ndarray:
+    masks = np.asarray(masks, dtype=np.uint64)
+    return (masks[..., None] >> _RANK_SHIFTS) & np.uint64((1 << bitmask.NUM_SUITS) - 1)
+
+
+def _suit_counts(suit_sets: np.ndarray) -> np.ndarray:
+    suits = np.arange(bitmask.NUM_SUITS, dtype=np.uint64)
+    return ((suit_sets[..., None] >> suits) & np.uint64(1)).sum(axis=-2, dtype=np.int8)
+
+
+def rank_counts(masks: np.ndarray) -> np.ndarray:
+    """Cards of each rank in each of ``masks``, hands x NUM_RANKS."""
+    return _NIBBLE_POPCOUNT[_suit_sets(masks)]
+
+
+def suit_counts(masks: np.ndarray) -> np.ndarray:
+    """Cards of each suit in each of ``masks``, hands x NUM_SUITS."""
+    return _suit_counts(_suit_sets(masks))
+
+
+def hand_features(masks: np.ndarray) -> np.ndarray:
+    """FEATURES of each of ``masks``, hands x len(FEATURES)."""
+    suit_sets = _suit_sets(masks)
+    ranks = _NIBBLE_POPCOUNT[suit_sets]
+    suits = _suit_counts(suit_sets)
+    present = ranks > 0
+    straights = (present[..., None, :] | ~_STRAIGHT_RANKS).all(axis=-1)
+    in_straight = (straights[..., :, None] & _STRAIGHT_RANKS).any(axis=-2)
+    loose = (ranks == 1) & ~in_straight
+    loose[..., TWO_RANK_IX] = False
+    cards = ranks.sum(axis=-1)
+    twos = ranks[..., TWO_RANK_IX]
+    aces = ranks[..., ACE_RANK_IX]
+    triples = (ranks == 3).sum(axis=-1)
+    quads = (ranks == 4).sum(axis=-1)
+    return np.stack([
+        cards,
+        twos,
+        aces,
+        (ranks == 2).sum(axis=-1),
+        triples,
+        # A four of a kind needs a fifth card
+        quads * (cards >= 5),
+        straights.sum(axis=-1),
+        (suits >= 5).sum(axis=-1),
+        (((triples + quads) > 0) & ((ranks >= 2).sum(axis=-1) >= 2)).astype(np.int64),
+        loose.sum(axis=-1),
+        (loose * (TWO_RANK_IX - np.arange(bitmask.NUM_RANKS))).sum(axis=-1),
+    ], axis=-1).astype(np.float64)
+
+
+class HandEvaluator:
+    def __init__(self, weights: HandWeights = HandWeights(), pass_penalty: float = DEFAULT_PASS_PENALTY):
+        """
+        :param pass_penalty: taken off the score of passing in ``score_moves``;
+            without one, keeping a hand's shape outweighs shedding cards and
+            a player passes far too often
+        """
+        self.weights = weights
+        self.pass_penalty = pass_penalty
+        self._weights = np.array(astuple(weights), dtype=np.float64)
+
+    def score(self, masks: np.ndarray) -> np.ndarray:
+        """Score of each of ``masks``."""
+        return hand_features(masks) @ self._weights
+
+    def score_hand(self, hand: int) -> float:
+        return float(self.score(np.array([hand], dtype=np.uint64))[0])
+
+    def score_moves(self, hand: int, moves: Sequence[int]) -> np.ndarray:
+        """Score of the hand each of ``moves`` leaves behind; PASS keeps ``hand`` less the pass penalty."""
+        moves = np.asarray(moves, dtype=np.uint64)
+        return self.score(np.uint64(hand) & ~moves) - self.pass_penalty * (moves == PASS)
+
+    def best_move(self, hand: int, moves: Sequence[int]) -> int:
+        """The first of ``moves`` leaving the best scored hand."""
+        return int(moves[int(np.argmax(self.score_moves(hand, moves)))])
+
+    def policy(self, state: DeucesGameState, moves: List[int], rng: random.Random) -> int:
+        """A ``deuces.simulator`` policy: play the move that leaves the best hand.
+
+        Emptying the hand always wins, whatever it scores.
+        """
+        hand = state.hands[state.turn]
+        if hand in moves:
+            return hand
+        if moves == [PASS]:
+            return PASS
+        return self.best_move(hand, moves)
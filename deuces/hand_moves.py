@@ -0,0 +1,250 @@
+"""Legal moves built from the cards in a hand.
+
+Moves are generated from the hand's rank and suit histograms instead of
+filtering the global move list, and when a table play is given only moves
+of its size that can beat it are produced. Moves are hand masks.
+
+``HandMoveSet`` keeps a hand's moves across turns instead: playing cards
+drops only the moves that used them, found through a card -> moves index.
+"""
+import bisect
+import itertools
+
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from deuces import bitmask
+from deuces.validation import LogicalValidator
+from deuces.validation.combos import (
+    FIVE_CARD_COMBO_TO_ORDER,
+    FiveCard,
+    Flush,
+    FourOfAKind,
+    FullHouse,
+    StraightFlush,
+    VALID_STRAIGHTS_BY_RANK_IXS,
+)
+from deuces.validation.combos.five_card_table import (
+    INVALID_STRENGTH,
+    five_card_strength,
+)
+
+if TYPE_CHECKING:
+    from deuces.rules import CompiledRules
+
+# Shift that leaves only the combo type of a FiveCard.strength
+_COMBO_TYPE_SHIFT: int = FiveCard.STRENGTH_FIELD_BITS * FiveCard.STRENGTH_NUM_FIELDS
+
+
+def moves_from_hand(hand: int, against: Optional[int] = None) -> Iterator[int]:
+    """Yield every move in ``hand``, or only those that beat ``against`` when it is given."""
+    if against is None:
+        for move_size in range(1, 6):
+            yield from _moves_of_size(hand, move_size, INVALID_STRENGTH)
+        return
+    move_size = bitmask.popcount(against)
+    if 1 <= move_size <= 5:
+        yield from _moves_of_size(hand, move_size, LogicalValidator.move_strength(against))
+
+
+class HandMoveSet:
+    """The moves in a hand, maintained as the hand loses cards.
+
+    Moves are generated once, when the set is built. ``remove`` drops the
+    moves that used any of the removed cards, and ``restore`` undoes the
+    last ``remove``, so the set follows a hand through apply/undo searches.
+    Per move size, moves are kept sorted by strength, so replies to a table
+    play are the tail of one list. With ``rules``, moves and strengths come
+    from that variant's compiled tables instead of the standard game's.
+    """
+    __slots__ = ('hand', '_move_strength', '_strengths', '_moves_by_card', '_by_size', '_listed', '_history')
+
+    def __init__(self, hand: int, rules: Optional['CompiledRules'] = None):
+        self.hand = hand
+        self._move_strength = LogicalValidator.move_strength if rules is None else rules.move_strength
+        # Live moves and their strengths
+        self._strengths: Dict[int, int] = {}
+        # Every move generated, live or not, per card it uses
+        self._moves_by_card: List[List[int]] = [[] for _ in range(bitmask.NUM_CARDS)]
+        # (strength, move) sorted per move size; may hold dead moves until compacted
+        self._by_size: List[List[Tuple[int, int]]] = [[] for _ in range(6)]
+        self._listed: Set[int] = set()
+        self._history: List[Tuple[int, List[Tuple[int, int]]]] = []
+        for move in moves_from_hand(hand) if rules is None else rules.moves_from_hand(hand):
+            strength = self._move_strength(move)
+            self._strengths[move] = strength
+            self._by_size[bitmask.popcount(move)].append((strength, move))
+            self._listed.add(move)
+            for ordinal in bitmask.ordinals(move):
+                self._moves_by_card[ordinal].append(move)
+        for moves in self._by_size:
+            moves.sort()
+
+    def __len__(self) -> int:
+        return len(self._strengths)
+
+    def __contains__(self, move: int) -> bool:
+        return move in self._strengths
+
+    def __iter__(self) -> Iterator[int]:
+        return self.replies()
+
+    def replies(self, against: Optional[int] = None) -> Iterator[int]:
+        """Same moves as ``moves_from_hand(self.hand, against)``, weakest first per size."""
+        if against is None:
+            for move_size in range(1, 6):
+                yield from self._live(self._by_size[move_size], 0)
+            return
+        move_size = bitmask.popcount(against)
+        if 1 <= move_size <= 5:
+            moves = self._by_size[move_size]
+            # Moves of equal strength never beat each other, so skip past all of them
+            start = bisect.bisect_right(moves, (self._move_strength(against), bitmask.FULL_DECK_MASK))
+            yield from self._live(moves, start)
+
+    def _live(self, moves: List[Tuple[int, int]], start: int) -> Iterator[int]:
+        strengths = self._strengths
+        for i in range(start, len(moves)):
+            move = moves[i][1]
+            if move in strengths:
+                yield move
+
+    def remove(self, cards: int):
+        """Drop ``cards`` from the hand, and every move that uses one of them."""
+        cards &= self.hand
+        removed: List[Tuple[int, int]] = []
+        strengths = self._strengths
+        for ordinal in bitmask.ordinals(cards):
+            for move in self._moves_by_card[ordinal]:
+                strength = strengths.pop(move, None)
+                if strength is not None:
+                    removed.append((strength, move))
+        self.hand ^= cards
+        self._history.append((cards, removed))
+        if len(self._listed) > 2 * len(strengths):
+            self._compact()
+
+    def restore(self):
+        """Undo the last ``remove``."""
+        cards, removed = self._history.pop()
+        self.hand |= cards
+        for strength, move in removed:
+            self._strengths[move] = strength
+            if move not in self._listed:
+                bisect.insort(self._by_size[bitmask.popcount(move)], (strength, move))
+                self._listed.add(move)
+
+    def _compact(self):
+        strengths = self._strengths
+        for move_size, moves in enumerate(self._by_size):
+            self._by_size[move_size] = [entry for entry in moves if entry[1] in strengths]
+        self._listed = set(strengths)
+
+
+def _moves_of_size(hand: int, move_size: int, against_strength: int) -> Iterator[int]:
+    if move_size == 1:
+        yield from _singles(hand, against_strength)
+    elif move_size == 5:
+        yield from _five_cards(hand, against_strength)
+    else:
+        yield from _n_of_a_kinds(hand, move_size, against_strength)
+
+
+def _singles(hand: int, against_strength: int) -> Iterator[int]:
+    # A single's strength is its ordinal + 1, so keep the cards above the one played
+    candidates = hand >> against_strength << against_strength
+    while candidates:
+        low = candidates & -candidates
+        yield low
+        candidates ^= low
+
+
+def _n_of_a_kinds(hand: int, move_size: int, against_strength: int) -> Iterator[int]:
+    # Pairs are stronger than anything with a lower top card, and triples and
+    # quads than anything of a lower rank, so start at the rank of the table play
+    if move_size == 2 and against_strength != INVALID_STRENGTH:
+        first_rank_ix = bitmask.rank_of(against_strength - 1)
+    else:
+        first_rank_ix = against_strength
+    for rank_ix in range(first_rank_ix, bitmask.NUM_RANKS):
+        rank_cards = hand & bitmask.RANK_MASKS[rank_ix]
+        if bitmask.popcount(rank_cards) < move_size:
+            continue
+        for move in _sub_masks(rank_cards, move_size):
+            if LogicalValidator.move_strength(move) > against_strength:
+                yield move
+
+
+def _five_cards(hand: int, against_strength: int) -> Iterator[int]:
+    against_combo_ix = against_strength >> _COMBO_TYPE_SHIFT
+    rank_cards = [hand & m for m in bitmask.RANK_MASKS]
+
+    def beats(move: int) -> bool:
+        return five_card_strength(move) > against_strength
+
+    # Straights, including straight flushes
+    if against_combo_ix <= FIVE_CARD_COMBO_TO_ORDER[StraightFlush]:
+        for rank_ixs in VALID_STRAIGHTS_BY_RANK_IXS:
+            if not all(rank_cards[r] for r in rank_ixs):
+                continue
+            for cards in itertools.product(*(bitmask.ordinals(rank_cards[r]) for r in rank_ixs)):
+                move = bitmask.to_mask(cards)
+                if beats(move):
+                    yield move
+
+    # Flushes, leaving out the straight flushes generated above
+    if against_combo_ix <= FIVE_CARD_COMBO_TO_ORDER[Flush]:
+        for suit_mask in bitmask.SUIT_MASKS:
+            suit_cards = hand & suit_mask
+            if bitmask.popcount(suit_cards) < 5:
+                continue
+            for move in _sub_masks(suit_cards, 5):
+                strength = five_card_strength(move)
+                if strength >> _COMBO_TYPE_SHIFT == FIVE_CARD_COMBO_TO_ORDER[Flush] and strength > against_strength:
+                    yield move
+
+    # Full houses
+    if against_combo_ix <= FIVE_CARD_COMBO_TO_ORDER[FullHouse]:
+        for triple_rank_ix, triple_cards in enumerate(rank_cards):
+            if bitmask.popcount(triple_cards) < 3:
+                continue
+            for triple in _sub_masks(triple_cards, 3):
+                if not beats(triple | _lowest_pair_outside(rank_cards, triple_rank_ix)):
+                    continue
+                for pair_rank_ix, pair_cards in enumerate(rank_cards):
+                    if pair_rank_ix == triple_rank_ix or bitmask.popcount(pair_cards) < 2:
+                        continue
+                    for pair in _sub_masks(pair_cards, 2):
+                        yield triple | pair
+
+    # Four of a kinds
+    if against_combo_ix <= FIVE_CARD_COMBO_TO_ORDER[FourOfAKind]:
+        for quad_rank_ix, quad_cards in enumerate(rank_cards):
+            if bitmask.popcount(quad_cards) < 4:
+                continue
+            kickers = hand & ~quad_cards
+            while kickers:
+                kicker = kickers & -kickers
+                kickers ^= kicker
+                if beats(quad_cards | kicker):
+                    yield quad_cards | kicker
+
+
+def _lowest_pair_outside(rank_cards, skip_rank_ix: int) -> int:
+    # Full houses only compare the triple, so any one pair tells whether a triple beats the table
+    for rank_ix, cards in enumerate(rank_cards):
+        if rank_ix != skip_rank_ix and bitmask.popcount(cards) >= 2:
+            return bitmask.to_mask(bitmask.ordinals(cards)[:2])
+    return 0
+
+
+def _sub_masks(mask: int, size: int) -> Iterator[int]:
+    for cards in itertools.combinations(bitmask.ordinals(mask), size):
+        yield bitmask.to_mask(cards)
@@ -0,0 +1,229 @@
+"""Counters and sampled latency histograms for the hot paths.
+
+Instrumented code checks the module-level ``ENABLED`` flag and does nothing
+else while it is off:
+
+    started = instrumentation.start('name') if instrumentation.ENABLED else None
+    ...
+    if started is not None:
+        instrumentation.stop('name', started)
+
+Once ``enable``d, every ``start`` counts a call, and one call in every
+``sample_every`` is also timed into a histogram with power-of-two
+nanosecond buckets. ``flush`` hands a snapshot of everything recorded so
+far to each sink: in memory, JSON lines, or a Prometheus text exposition
+file for a node exporter's textfile collector.
+
+Counters are plain dict updates, which is safe under the GIL but not across
+processes; each process records and flushes its own.
+"""
+import json
+import os
+import time
+
+from abc import ABC, abstractmethod
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    TextIO,
+    TypeVar,
+)
+
+T = TypeVar('T')
+
+# Checked by instrumented code before anything else
+ENABLED: bool = False
+DEFAULT_SAMPLE_EVERY: int = 16
+
+# Bucket i holds latencies below 2 ** (MIN_BUCKET_BITS + i) ns; the last is unbounded
+MIN_BUCKET_BITS: int = 7
+NUM_BUCKETS: int = 28
+BUCKET_BOUNDS_NS: List[int] = [1 << (MIN_BUCKET_BITS + i) for i in range(NUM_BUCKETS - 1)]
+
+Snapshot = Dict[str, Any]
+
+
+class Histogram:
+    __slots__ = ('count', 'sum_ns', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.sum_ns = 0
+        self.buckets = [0] * NUM_BUCKETS
+
+    def observe(self, ns: int):
+        self.count += 1
+        self.sum_ns += ns
+        self.buckets[min(NUM_BUCKETS - 1, max(0, ns.bit_length() - MIN_BUCKET_BITS))] += 1
+
+    def quantile(self, q: float) -> Optional[int]:
+        """Upper bound in ns of the bucket holding the ``q`` quantile, None when unbounded or empty."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank and n:
+                return BUCKET_BOUNDS_NS[i] if i < len(BUCKET_BOUNDS_NS) else None
+        return None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'sum_ns': self.sum_ns,
+            'buckets': list(self.buckets),
+            'p50_ns': self.quantile(0.5),
+            'p99_ns': self.quantile(0.99),
+        }
+
+
+class Sink(ABC):
+    @abstractmethod
+    def emit(self, snapshot: Snapshot):
+        raise NotImplementedError("emit must be implemented by a subclass")
+
+
+class MemorySink(Sink):
+    def __init__(self):
+        self.snapshots: List[Snapshot] = []
+
+    def emit(self, snapshot: Snapshot):
+        self.snapshots.append(snapshot)
+
+
+class JsonLinesSink(Sink):
+    """Appends each snapshot to ``path`` as one line of JSON."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def emit(self, snapshot: Snapshot):
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(snapshot) + '\n')
+
+
+class PrometheusSink(Sink):
+    """Rewrites ``path`` with the latest snapshot in the Prometheus text format."""
+
+    def __init__(self, path: str, prefix: str = 'deuces'):
+        self.path = path
+        self.prefix = prefix
+
+    def emit(self, snapshot: Snapshot):
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            write_prometheus(f, snapshot, self.prefix)
+        os.replace(tmp_path, self.path)
+
+
+def write_prometheus(f: TextIO, snapshot: Snapshot, prefix: str = 'deuces'):
+    f.write(f'# TYPE {prefix}_calls_total counter\n')
+    for name, count in sorted(snapshot['counters'].items()):
+        f.write(f'{prefix}_calls_total{{operation="{name}"}} {count}\n')
+    f.write(f'# TYPE {prefix}_latency_seconds histogram\n')
+    for name, histogram in sorted(snapshot['histograms'].items()):
+        labels = f'operation="{name}"'
+        cumulative = 0
+        for bound_ns, n in zip(BUCKET_BOUNDS_NS, histogram['buckets']):
+            cumulative += n
+            f.write(f'{prefix}_latency_seconds_bucket{{{labels},le="{bound_ns / 1e9:g}"}} {cumulative}\n')
+        f.write(f'{prefix}_latency_seconds_bucket{{{labels},le="+Inf"}} {histogram["count"]}\n')
+        f.write(f'{prefix}_latency_seconds_sum{{{labels}}} {histogram["sum_ns"] / 1e9:g}\n')
+        f.write(f'{prefix}_latency_seconds_count{{{labels}}} {histogram["count"]}\n')
+
+
+_counters: Dict[str, int] = {}
+_histograms: Dict[str, Histogram] = {}
+_sinks: List[Sink] = []
+_sample_every: int = DEFAULT_SAMPLE_EVERY
+
+
+def enable(sample_every: int = DEFAULT_SAMPLE_EVERY, sinks: Iterable[Sink] = ()):
+    """Start recording; time one call in ``sample_every`` per operation."""
+    global ENABLED, _sample_every
+    if sample_every < 1:
+        raise ValueError(f'sample_every must be positive, got {sample_every}')
+    _sample_every = sample_every
+    _sinks.extend(sinks)
+    ENABLED = True
+
+
+def disable():
+    """Stop recording; what was recorded stays until ``reset``."""
+    global ENABLED
+    ENABLED = False
+
+
+def reset():
+    """Drop everything recorded, and the sinks."""
+    _counters.clear()
+    _histograms.clear()
+    _sinks.clear()
+
+
+def start(name: str) -> Optional[int]:
+    """Count a call to ``name``; returns its start time when this call is sampled."""
+    calls = _counters.get(name, 0) + 1
+    _counters[name] = calls
+    if calls % _sample_every:
+        return None
+    return time.perf_counter_ns()
+
+
+def stop(name: str, started: int):
+    _histogram(name).observe(time.perf_counter_ns() - started)
+
+
+def count(name: str, n: int = 1):
+    _counters[name] = _counters.get(name, 0) + n
+
+
+def timed_iter(name: str, items: Iterable[T]) -> Iterator[T]:
+    """Yield ``items``, counting them under ``name``.
+
+    The time spent producing all of them, but not consuming them, is one
+    histogram sample.
+    """
+    iterator = iter(items)
+    elapsed = 0
+    n = 0
+    while True:
+        started = time.perf_counter_ns()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            break
+        finally:
+            elapsed += time.perf_counter_ns() - started
+        n += 1
+        yield item
+    count(name, n)
+    _histogram(name).observe(elapsed)
+
+
+def _histogram(name: str) -> Histogram:
+    histogram = _histograms.get(name)
+    if histogram is None:
+        histogram = _histograms[name] = Histogram()
+    return histogram
+
+
+def snapshot() -> Snapshot:
+    return {
+        'time': time.time(),
+        'counters': dict(_counters),
+        'histograms': dict((name, h.to_dict()) for name, h in _histograms.items()),
+    }
+
+
+def flush() -> Snapshot:
+    """Emit a snapshot to every sink and return it."""
+    current = snapshot()
+    for sink in _sinks:
+        sink.emit(current)
+    return current
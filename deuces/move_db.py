@@ -0,0 +1,135 @@
+"""Packed binary move database.
+
+The file holds every move class the move generator writes, so worker
+processes can map it and share the pages instead of parsing the CSVs.
+
+Layout, little-endian:
+  * header: magic ``b'DCMV'``, version (u16), number of classes (u16),
+    record size (u32),
+  * one entry per class: name (8 bytes, NUL padded), byte offset of its
+    first record (u64), number of records (u64),
+  * records, each ``RECORD_DTYPE``: the move's hand mask, its card ordinals
+    padded with ``PAD``, and its ``LogicalValidator.move_strength``.
+Record blocks start on RECORD_ALIGNMENT byte boundaries.
+"""
+import mmap
+import struct
+
+from typing import (
+    Dict,
+    List,
+    Optional,
+)
+
+import numpy as np
+
+from deuces.moves import to_masks
+from deuces.validation import BatchValidator
+from deuces.validation.batch_validator import MAX_MOVE_SIZE
+
+MOVE_DB_FILENAME: str = 'moves.bin'
+MAGIC: bytes = b'DCMV'
+VERSION: int = 1
+HEADER = struct.Struct('<4sHHI')
+CLASS_ENTRY = struct.Struct('<8sQQ')
+RECORD_ALIGNMENT: int = 16
+RECORD_DTYPE = np.dtype([
+    ('mask', '<u8'),
+    ('cards', 'i1', (MAX_MOVE_SIZE,)),
+    ('_padding', 'V1'),
+    ('strength', '<u2'),
+])
+
+
+def write_move_db(path: str, moves_by_class: Dict[str, np.ndarray], strength_table: Optional[np.ndarray] = None):
+    """Write N x 5 ordinal arrays, keyed by move class, to ``path``.
+
+    Strengths are scored with ``BatchValidator`` against ``strength_table``,
+    the standard game's by default.
+    """
+    offset = HEADER.size + CLASS_ENTRY.size * len(moves_by_class)
+    entries: List[bytes] = []
+    blocks: List[bytes] = []
+    for move_class, moves in moves_by_class.items():
+        name = move_class.encode('ascii')
+        if len(name) > 8:
+            raise ValueError(f'move class names are at most 8 bytes, got {move_class!r}')
+        padding = -offset % RECORD_ALIGNMENT
+        offset += padding
+        records = np.zeros(len(moves), dtype=RECORD_DTYPE)
+        records['mask'] = to_masks(moves)
+        records['cards'] = moves
+        records['strength'] = BatchValidator.move_strengths(moves, strength_table)
+        entries.append(CLASS_ENTRY.pack(name, offset, len(records)))
+        blocks.append(b'\0' * padding + records.tobytes())
+        offset += records.nbytes
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(moves_by_class), RECORD_DTYPE.itemsize))
+        for entry in entries:
+            f.write(entry)
+        for block in blocks:
+            f.write(block)
+
+
+class MoveDB:
+    """Read-only view over a move database.
+
+    Every array it hands out is a view of the underlying buffer, so mapping a
+    file with ``MoveDB.open`` costs no parsing or copying and the pages are
+    shared between processes.
+    """
+
+    def __init__(self, buffer, mmap_: Optional[mmap.mmap] = None):
+        magic, version, num_classes, record_size = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise ValueError(f'not a move database, bad magic {magic!r}')
+        if version != VERSION:
+            raise ValueError(f'unsupported move database version {version}, expected {VERSION}')
+        if record_size != RECORD_DTYPE.itemsize:
+            raise ValueError(f'unexpected record size {record_size}')
+        self._mmap = mmap_
+        self._records: Dict[str, np.ndarray] = {}
+        for i in range(num_classes):
+            name, offset, count = CLASS_ENTRY.unpack_from(buffer, HEADER.size + i * CLASS_ENTRY.size)
+            self._records[name.rstrip(b'\0').decode('ascii')] = np.frombuffer(
+                buffer, dtype=RECORD_DTYPE, count=count, offset=offset)
+
+    @classmethod
+    def open(cls, path: str) -> 'MoveDB':
+        with open(path, 'rb') as f:
+            mmap_ = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(mmap_, mmap_)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Release the mapping; arrays handed out must not be used afterwards."""
+        self._records = {}
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                # Views are still alive; the mapping is released when they are
+                pass
+            self._mmap = None
+
+    @property
+    def move_classes(self) -> List[str]:
+        return list(self._records)
+
+    def records(self, move_class: str) -> np.ndarray:
+        return self._records[move_class]
+
+    def moves(self, move_class: str) -> np.ndarray:
+        """N x 5 card ordinals, padded with PAD."""
+        return self._records[move_class]['cards']
+
+    def masks(self, move_class: str) -> np.ndarray:
+        return self._records[move_class]['mask']
+
+    def strengths(self, move_class: str) -> np.ndarray:
+        return self._records[move_class]['strength']
@@ -0,0 +1,106 @@
+import os
+
+from typing import (
+    Callable,
+    Dict,
+    Optional,
+)
+
+import numpy as np
+
+from deuces import bitmask
+from deuces.move_db import (
+    MOVE_DB_FILENAME,
+    MoveDB,
+)
+from deuces.moves import (
+    MOVE_CLASSES,
+    MOVES_DIRECTORY,
+    load_moves,
+    to_masks,
+)
+from deuces.validation import (
+    BatchValidator,
+    LogicalValidator,
+)
+
+
+class MoveIndex:
+    """Every move, grouped by size and sorted by strength.
+
+    The moves that beat a table play are the ones of the same size with a
+    higher strength, so finding them is a binary search plus a slice.
+    Results are unsigned 64-bit hand masks, weakest first.
+    """
+
+    def __init__(
+            self,
+            masks_by_size: Dict[int, np.ndarray],
+            strengths_by_size: Dict[int, np.ndarray],
+            move_strength: Callable[[int], int] = LogicalValidator.move_strength,
+    ):
+        """Index moves of each size by their strengths.
+
+        :param move_strength: strength of a table play, on the scale of
+            ``strengths_by_size``
+        """
+        self._move_strength = move_strength
+        self._masks: Dict[int, np.ndarray] = {}
+        self._strengths: Dict[int, np.ndarray] = {}
+        for move_size, strengths in strengths_by_size.items():
+            order = np.argsort(strengths, kind='stable')
+            self._masks[move_size] = masks_by_size[move_size][order]
+            self._strengths[move_size] = strengths[order]
+
+    @classmethod
+    def from_moves(cls, moves_by_size: Dict[int, np.ndarray]) -> 'MoveIndex':
+        return cls(
+            dict((s, to_masks(moves)) for s, moves in moves_by_size.items()),
+            dict((s, BatchValidator.move_strengths(moves)) for s, moves in moves_by_size.items()),
+        )
+
+    @classmethod
+    def from_move_db(cls, db: MoveDB) -> 'MoveIndex':
+        move_sizes = range(1, len(MOVE_CLASSES) + 1)
+        return cls(
+            dict((s, db.masks(c)) for s, c in zip(move_sizes, MOVE_CLASSES)),
+            dict((s, db.strengths(c)) for s, c in zip(move_sizes, MOVE_CLASSES)),
+        )
+
+    @classmethod
+    def load(cls, directory: str = MOVES_DIRECTORY) -> 'MoveIndex':
+        """Index the move database in ``directory``, or its CSVs if it has none."""
+        db_path = os.path.join(directory, MOVE_DB_FILENAME)
+        if os.path.exists(db_path):
+            with MoveDB.open(db_path) as db:
+                return cls.from_move_db(db)
+        return cls.from_moves(dict(
+            (move_size, load_moves(move_class, directory))
+            for move_size, move_class in enumerate(MOVE_CLASSES, start=1)
+        ))
+
+    def __len__(self):
+        return sum(len(m) for m in self._masks.values())
+
+    def moves(self, move_size: int) -> np.ndarray:
+        return self._masks[move_size]
+
+    def strengths(self, move_size: int) -> np.ndarray:
+        """Strengths of ``moves(move_size)``, ascending."""
+        return self._strengths[move_size]
+
+    def moves_beating(self, against: int) -> np.ndarray:
+        move_size = bitmask.popcount(against)
+        if move_size not in self._masks:
+            return np.empty(0, dtype=np.uint64)
+        start = np.searchsorted(
+            self._strengths[move_size], self._move_strength(against), side='right')
+        return self._masks[move_size][start:]
+
+    def legal_replies(self, hand: int, against: Optional[int] = None) -> np.ndarray:
+        """Moves that can be made from ``hand``, beating ``against`` when given."""
+        if against is None:
+            candidates = np.concatenate([self._masks[s] for s in sorted(self._masks)])
+        else:
+            candidates = self.moves_beating(against)
+        return candidates[(candidates & np.uint64(~hand & bitmask.FULL_DECK_MASK)) == 0]
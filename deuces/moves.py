@@ -0,0 +1,58 @@
+"""The move universe written by ``deuces.scripts.move_generator``.
+
+Moves are loaded as N x 5 arrays of card ordinals padded with
+``batch_validator.PAD``, the layout ``BatchValidator`` works on.
+"""
+import os
+
+from typing import (
+    Dict,
+    Tuple,
+)
+
+import numpy as np
+
+from deuces import (
+    DeucesCard,
+    bitmask,
+)
+from deuces.validation.batch_validator import (
+    MAX_MOVE_SIZE,
+    PAD,
+)
+
+MOVES_DIRECTORY: str = os.path.join(os.path.dirname(__file__), 'data', 'moves')
+# Every move, by number of cards; the other files split '5s' by combo type
+MOVE_CLASSES: Tuple[str, ...] = ('1s', '2s', '3s', '4s', '5s')
+
+CARD_STR_TO_VALUE: Dict[str, int] = dict((str(c), c.value) for c in DeucesCard.CARDS)
+
+
+def load_moves(move_class: str, directory: str = MOVES_DIRECTORY) -> np.ndarray:
+    filename = os.path.join(directory, f'{move_class}.csv')
+    with open(filename, encoding='utf-8') as f:
+        rows = [[CARD_STR_TO_VALUE[c] for c in line.rstrip('\n').split(',')] for line in f if line.strip()]
+    moves = np.full((len(rows), MAX_MOVE_SIZE), PAD, dtype=np.int8)
+    for i, row in enumerate(rows):
+        moves[i, :len(row)] = row
+    return moves
+
+
+def to_masks(moves: np.ndarray) -> np.ndarray:
+    """Hand mask of each row of ``moves``, as unsigned 64-bit integers."""
+    moves = np.asarray(moves)
+    is_card = moves >= 0
+    bits = np.left_shift(np.uint64(1), np.where(is_card, moves, 0).astype(np.uint64))
+    return np.bitwise_or.reduce(np.where(is_card, bits, np.uint64(0)), axis=1)
+
+
+def from_masks(masks: np.ndarray) -> np.ndarray:
+    """Inverse of ``to_masks``."""
+    masks = np.asarray(masks, dtype=np.uint64)
+    bits = (masks[:, None] >> np.arange(bitmask.NUM_CARDS, dtype=np.uint64)) & np.uint64(1)
+    moves = np.full((len(masks), MAX_MOVE_SIZE), PAD, dtype=np.int8)
+    rows, ordinals = np.nonzero(bits)
+    # Position of each card within its row
+    starts = np.searchsorted(rows, rows, side='left')
+    moves[rows, np.arange(len(rows)) - starts] = ordinals
+    return moves
@@ -0,0 +1,383 @@
+"""House rules, compiled once into the lookup tables the engine runs on.
+
+``Rules`` names a variant: the order of ranks and suits, which runs of
+ranks are straights, which five-card combos exist and how they rank, and
+whether flushes compare by suit or by their highest card first. Leaving a
+combo out of ``combo_order`` bans it, e.g. dropping ``'FourOfAKind'``
+disallows four of a kind plus a kicker.
+
+``compile_rules`` turns a ``Rules`` into ``CompiledRules``: every move
+sorted by strength per size, the five-card strength table, and the
+straights as rank masks. Validation and move generation for the variant
+then read those tables, never the rules. Ordinals follow the variant's own
+rank and suit order, so they still compare the way its cards do.
+
+A game state built with ``rules=compile_rules(...)`` generates and checks
+its moves from the variant's tables, as do the tracked move sets, endgame
+solver, explorer and bot service built on it; the simulator takes the
+``Rules`` themselves and compiles them once per process. Without rules,
+they all play the standard game.
+
+Compiled tables are kept per process, and on disk under
+``cache_directory``, keyed by ``Rules.config_hash``, so hosting several
+variants costs one compile each, ever. The default rules compile to the
+same strengths as ``five_card_table`` and ``LogicalValidator``.
+
+Cache file layout: an ``np.savez`` archive of the format version, the
+rules as JSON, and per move size the move masks and their strengths.
+"""
+import hashlib
+import itertools
+import json
+import os
+
+from dataclasses import (
+    asdict,
+    dataclass,
+)
+from typing import (
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+import numpy as np
+
+from cardgame.card import (
+    Card,
+    Rank,
+    Suit,
+)
+from deuces import bitmask
+from deuces.move_index import MoveIndex
+from deuces.moves import from_masks
+from deuces.validation import (
+    BatchValidator,
+    LogicalValidator,
+)
+from deuces.validation.batch_validator import (
+    Against,
+    MAX_MOVE_SIZE,
+)
+from deuces.validation.combos import (
+    FIVE_CARD_COMBO_ORDER,
+    FiveCard,
+)
+from deuces.validation.combos.five_card_table import (
+    BINOMIALS,
+    INVALID_STRENGTH,
+    NUM_FIVE_CARD_HANDS,
+)
+
+# Bump when compiled tables change for the same rules
+TABLES_VERSION: int = 1
+RULES_CACHE_DIRECTORY: str = os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'), 'deuces', 'rules')
+
+SUIT_BY_LETTER: Dict[str, Suit] = dict((s.name[0], s) for s in Suit)
+COMBO_NAMES: Tuple[str, ...] = tuple(c.__name__ for c in FIVE_CARD_COMBO_ORDER[1:])
+FLUSH_COMPARES: Tuple[str, ...] = ('suit', 'rank')
+
+# Each straight is written in sequence; its last rank is the one it ends on
+DEFAULT_STRAIGHTS: Tuple[str, ...] = (
+    'A 2 3 4 5',
+    '2 3 4 5 6',
+    '3 4 5 6 7',
+    '4 5 6 7 8',
+    '5 6 7 8 9',
+    '6 7 8 9 T',
+    '7 8 9 T J',
+    '8 9 T J Q',
+    '9 T J Q K',
+    'T J Q K A',
+)
+
+_FIELD_BITS: int = FiveCard.STRENGTH_FIELD_BITS
+
+# Compiled tables of this process, by config hash
+_COMPILED: Dict[str, 'CompiledRules'] = {}
+
+
+@dataclass(frozen=True)
+class Rules:
+    """A variant of the game, the standard one by default."""
+    # Ranks, lowest first
+    rank_order: str = '3 4 5 6 7 8 9 T J Q K A 2'
+    # Suits by their initial, lowest first
+    suit_order: str = 'D C H S'
+    straights: Tuple[str, ...] = DEFAULT_STRAIGHTS
+    # Five-card combos allowed, weakest type first
+    combo_order: Tuple[str, ...] = COMBO_NAMES
+    # What two flushes compare first, the other breaking ties: 'suit', or
+    # 'rank' for their highest cards
+    flush_compare: str = 'suit'
+
+    def __post_init__(self):
+        # Configs read from JSON hold lists, which would leave the rules unhashable
+        object.__setattr__(self, 'straights', tuple(self.straights))
+        object.__setattr__(self, 'combo_order', tuple(self.combo_order))
+        ranks = self.rank_order.split()
+        if sorted(ranks) != sorted(r.value for r in Rank):
+            raise ValueError(f'rank_order must hold every rank once, got {self.rank_order!r}')
+        suits = self.suit_order.split()
+        if sorted(suits) != sorted(SUIT_BY_LETTER):
+            raise ValueError(f'suit_order must hold every suit once, got {self.suit_order!r}')
+        for straight in self.straights:
+            if len(set(straight.split()) & set(ranks)) != 5 or len(straight.split()) != 5:
+                raise ValueError(f'a straight is five different ranks, got {straight!r}')
+        if len(set(self.straights)) != len(self.straights):
+            raise ValueError('straights must not repeat')
+        if not set(self.combo_order) <= set(COMBO_NAMES) or len(set(self.combo_order)) != len(self.combo_order):
+            raise ValueError(f'combo_order must hold distinct combos of {COMBO_NAMES}, got {self.combo_order}')
+        if self.flush_compare not in FLUSH_COMPARES:
+            raise ValueError(f'flush_compare must be one of {FLUSH_COMPARES}, got {self.flush_compare!r}')
+
+    @property
+    def config_hash(self) -> str:
+        """Hex digest identifying these rules and the tables they compile to."""
+        config = json.dumps(dict(asdict(self), tables_version=TABLES_VERSION), sort_keys=True)
+        return hashlib.sha256(config.encode('utf-8')).hexdigest()[:16]
+
+
+DEFAULT_RULES = Rules()
+
+
+class CompiledRules:
+    """Lookup tables of a ``Rules``, and the validator and move generator that run off them.
+
+    Build one with ``compile_rules``. Moves are hand masks and rows of
+    ordinals as everywhere else, in the variant's ordinals.
+    """
+
+    def __init__(self, rules: Rules, masks_by_size: Dict[int, np.ndarray], strengths_by_size: Dict[int, np.ndarray]):
+        self.rules = rules
+        self.config_hash = rules.config_hash
+        self.rank_order: Tuple[Rank, ...] = tuple(Rank(r) for r in rules.rank_order.split())
+        self.suit_order: Tuple[Suit, ...] = tuple(SUIT_BY_LETTER[s] for s in rules.suit_order.split())
+        self._rank_to_ix: Dict[Rank, int] = dict((r, i) for i, r in enumerate(self.rank_order))
+        self._suit_to_ix: Dict[Suit, int] = dict((s, i) for i, s in enumerate(self.suit_order))
+        # Rank ixs of every straight, and the rank ix it ends on
+        self.straights: List[Tuple[Tuple[int, ...], int]] = _straight_rank_ixs(rules, self._rank_to_ix)
+        # Rank set (see bitmask.rank_set) of every straight, in the order of ``straights``
+        self.straight_masks: np.ndarray = np.array(
+            [bitmask.to_mask(rank_ixs) for rank_ixs, _ in self.straights], dtype=np.uint16)
+        self.move_index = MoveIndex(masks_by_size, strengths_by_size, self.move_strength)
+        five_cards = masks_by_size[MAX_MOVE_SIZE]
+        self._strength_by_mask: Dict[int, int] = dict(
+            zip(five_cards.tolist(), strengths_by_size[MAX_MOVE_SIZE].tolist()))
+        # Strength of all C(52, 5) hands, indexed like five_card_table.strength_table()
+        self.strength_table: np.ndarray = np.zeros(NUM_FIVE_CARD_HANDS, dtype=np.uint16)
+        if len(five_cards):
+            ordinals = from_masks(five_cards).astype(np.intp)
+            binomials = np.array(BINOMIALS, dtype=np.int64)
+            ixs = sum(binomials[k + 1][ordinals[:, k]] for k in range(MAX_MOVE_SIZE))
+            self.strength_table[ixs] = strengths_by_size[MAX_MOVE_SIZE]
+
+    def __repr__(self):
+        return f'CompiledRules({self.rules!r})'
+
+    def ordinal_of(self, card: Card) -> int:
+        return bitmask.ordinal_of(self._rank_to_ix[card.rank], self._suit_to_ix[card.suit])
+
+    def to_mask(self, cards: Iterable[Card]) -> int:
+        return bitmask.to_mask(self.ordinal_of(c) for c in cards)
+
+    def cards(self, mask: int) -> Tuple[Card, ...]:
+        """Cards in ``mask``, lowest first."""
+        return tuple(
+            Card(self.rank_order[bitmask.rank_of(o)], self.suit_order[bitmask.suit_of(o)])
+            for o in bitmask.ordinals(mask))
+
+    def five_card_strength(self, mask: int) -> int:
+        return self._strength_by_mask.get(mask, INVALID_STRENGTH)
+
+    def move_strength(self, move: int) -> int:
+        """Strength of ``move`` under these rules, 0 if it is not a valid move."""
+        if bitmask.popcount(move) == MAX_MOVE_SIZE:
+            return self._strength_by_mask.get(move, INVALID_STRENGTH)
+        # Sizes up to four are ranked by their ordinals alone, whatever the variant
+        return LogicalValidator.move_strength(move)
+
+    def is_valid_mask(self, move: int, against: Optional[int] = None) -> bool:
+        strength = self.move_strength(move)
+        if strength == INVALID_STRENGTH:
+            return False
+        if against is None:
+            return True
+        return bitmask.popcount(move) == bitmask.popcount(against) and self.move_strength(against) < strength
+
+    def move_strengths(self, moves: np.ndarray) -> np.ndarray:
+        """``BatchValidator.move_strengths`` under these rules."""
+        return BatchValidator.move_strengths(moves, self.strength_table)
+
+    def are_valid_moves(self, moves: np.ndarray, against: Against = None) -> np.ndarray:
+        """``BatchValidator.are_valid_moves`` under these rules."""
+        return BatchValidator.are_valid_moves(moves, against, self.strength_table)
+
+    def moves(self, move_size: int) -> np.ndarray:
+        """Every move of ``move_size`` cards, weakest first."""
+        return self.move_index.moves(move_size)
+
+    def legal_replies(self, hand: int, against: Optional[int] = None) -> np.ndarray:
+        """Moves that can be made from ``hand``, beating ``against`` when given."""
+        return self.move_index.legal_replies(hand, against)
+
+    def moves_from_hand(self, hand: int, against: Optional[int] = None) -> Iterator[int]:
+        """``hand_moves.moves_from_hand`` under these rules, weakest first per size."""
+        return iter(self.move_index.legal_replies(hand, against).tolist())
+
+
+def compile_rules(rules: Rules = DEFAULT_RULES, cache_directory: Optional[str] = RULES_CACHE_DIRECTORY) -> CompiledRules:
+    """Tables of ``rules``, compiled at most once per process and once per cache directory.
+
+    :param cache_directory: where compiled tables are kept between
+        processes; None compiles in memory only
+    """
+    config_hash = rules.config_hash
+    compiled = _COMPILED.get(config_hash)
+    if compiled is not None:
+        return compiled
+    path = None if cache_directory is None else os.path.join(cache_directory, cache_filename(rules))
+    tables = None if path is None else _load_tables(path, rules)
+    if tables is None:
+        tables = _compile_tables(rules)
+        if path is not None:
+            try:
+                _save_tables(path, rules, *tables)
+            except OSError:
+                # A read-only cache only costs compiling again next time
+                pass
+    compiled = _COMPILED[config_hash] = CompiledRules(rules, *tables)
+    return compiled
+
+
+def cache_filename(rules: Rules) -> str:
+    return f'rules-{rules.config_hash}.npz'
+
+
+def _straight_rank_ixs(rules: Rules, rank_to_ix: Dict[Rank, int]) -> List[Tuple[Tuple[int, ...], int]]:
+    straights = []
+    for straight in rules.straights:
+        rank_ixs = [rank_to_ix[Rank(r)] for r in straight.split()]
+        straights.append((tuple(sorted(rank_ixs)), rank_ixs[-1]))
+    return straights
+
+
+def _compile_tables(rules: Rules) -> Tuple[Dict[int, np.ndarray], Dict[int, np.ndarray]]:
+    rank_to_ix = dict((Rank(r), i) for i, r in enumerate(rules.rank_order.split()))
+    classify = _five_card_classifier(rules, _straight_rank_ixs(rules, rank_to_ix))
+    moves_by_size: Dict[int, List[Tuple[int, int]]] = dict((s, []) for s in range(1, MAX_MOVE_SIZE + 1))
+    for rank_ix in range(bitmask.NUM_RANKS):
+        for move_size in range(1, bitmask.NUM_SUITS + 1):
+            for ordinals in itertools.combinations(bitmask.ordinals(bitmask.RANK_MASKS[rank_ix]), move_size):
+                move = bitmask.to_mask(ordinals)
+                moves_by_size[move_size].append((LogicalValidator.move_strength(move), move))
+    for move in set(_five_card_candidates(rules, rank_to_ix)):
+        strength = classify(move)
+        if strength != INVALID_STRENGTH:
+            moves_by_size[MAX_MOVE_SIZE].append((strength, move))
+    masks_by_size = {}
+    strengths_by_size = {}
+    for move_size, moves in moves_by_size.items():
+        moves.sort()
+        strengths_by_size[move_size] = np.array([s for s, _ in moves], dtype=np.uint16)
+        masks_by_size[move_size] = np.array([m for _, m in moves], dtype=np.uint64)
+    return masks_by_size, strengths_by_size
+
+
+def _five_card_candidates(rules: Rules, rank_to_ix: Dict[Rank, int]) -> Iterable[int]:
+    # Straights, flushes, and hands of two ranks; no other hand can be a combo
+    for straight in rules.straights:
+        rank_ixs = [rank_to_ix[Rank(r)] for r in straight.split()]
+        for suit_ixs in itertools.product(range(bitmask.NUM_SUITS), repeat=5):
+            yield bitmask.to_mask(bitmask.ordinal_of(r, s) for r, s in zip(rank_ixs, suit_ixs))
+    for suit_mask in bitmask.SUIT_MASKS:
+        for ordinals in itertools.combinations(bitmask.ordinals(suit_mask), 5):
+            yield bitmask.to_mask(ordinals)
+    for major_rank_ix, minor_rank_ix in itertools.permutations(range(bitmask.NUM_RANKS), 2):
+        for num_major in (3, 4):
+            for major in itertools.combinations(bitmask.ordinals(bitmask.RANK_MASKS[major_rank_ix]), num_major):
+                for minor in itertools.combinations(
+                        bitmask.ordinals(bitmask.RANK_MASKS[minor_rank_ix]), 5 - num_major):
+                    yield bitmask.to_mask(major + minor)
+
+
+def _five_card_classifier(rules: Rules, straights: Sequence[Tuple[Tuple[int, ...], int]]):
+    # Strengths pack like FiveCard.strength: the combo's place in combo_order,
+    # then up to two tie-break fields
+    combo_ixs = dict((name, i) for i, name in enumerate(rules.combo_order, start=1))
+    end_rank_by_rank_set = dict((bitmask.to_mask(rank_ixs), end) for rank_ixs, end in straights)
+
+    def strength(combo: str, *combo_fields: int) -> int:
+        value = combo_ixs[combo]
+        for f in combo_fields:
+            value = value << _FIELD_BITS | f
+        return value << _FIELD_BITS * (FiveCard.STRENGTH_NUM_FIELDS - len(combo_fields))
+
+    def classify(mask: int) -> int:
+        ordinals = bitmask.ordinals(mask)
+        counts = sorted(c for c in bitmask.rank_counts(mask) if c)
+        candidates = [INVALID_STRENGTH]
+        if counts == [1, 4] and 'FourOfAKind' in combo_ixs:
+            candidates.append(strength('FourOfAKind', bitmask.rank_of(ordinals[2])))
+        elif counts == [2, 3] and 'FullHouse' in combo_ixs:
+            candidates.append(strength('FullHouse', bitmask.rank_of(ordinals[2])))
+        elif len(counts) == 5:
+            is_flush = len(set(bitmask.suit_of(o) for o in ordinals)) == 1
+            end_rank_ix = end_rank_by_rank_set.get(bitmask.rank_set(mask))
+            if end_rank_ix is not None:
+                end_suit_ix = bitmask.suit_of(next(o for o in ordinals if bitmask.rank_of(o) == end_rank_ix))
+                if 'Straight' in combo_ixs:
+                    candidates.append(strength('Straight', end_rank_ix, end_suit_ix))
+                if is_flush and 'StraightFlush' in combo_ixs:
+                    candidates.append(strength('StraightFlush', end_rank_ix, end_suit_ix))
+            if is_flush and 'Flush' in combo_ixs:
+                suit_ix, top_rank_ix = bitmask.suit_of(ordinals[-1]), bitmask.rank_of(ordinals[-1])
+                if rules.flush_compare == 'suit':
+                    candidates.append(strength('Flush', suit_ix, top_rank_ix))
+                else:
+                    candidates.append(strength('Flush', top_rank_ix, suit_ix))
+        # A hand that makes several combos plays as the best of them
+        return max(candidates)
+
+    return classify
+
+
+def _load_tables(path: str, rules: Rules) -> Optional[Tuple[Dict[int, np.ndarray], Dict[int, np.ndarray]]]:
+    """Tables cached at ``path``, or None if there are none for ``rules``."""
+    try:
+        with np.load(path) as archive:
+            if int(archive['version']) != TABLES_VERSION or str(archive['rules']) != _rules_json(rules):
+                return None
+            sizes = range(1, MAX_MOVE_SIZE + 1)
+            return (
+                dict((s, archive[f'masks_{s}']) for s in sizes),
+                dict((s, archive[f'strengths_{s}']) for s in sizes),
+            )
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def _save_tables(path: str, rules: Rules, masks_by_size: Dict[int, np.ndarray], strengths_by_size: Dict[int, np.ndarray]):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    arrays = dict(version=np.array(TABLES_VERSION), rules=np.array(_rules_json(rules)))
+    for move_size in masks_by_size:
+        arrays[f'masks_{move_size}'] = masks_by_size[move_size]
+        arrays[f'strengths_{move_size}'] = strengths_by_size[move_size]
+    # Write aside and rename, so other processes never load a partial file
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    try:
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _rules_json(rules: Rules) -> str:
+    return json.dumps(asdict(rules), sort_keys=True)
@@ -0,0 +1,304 @@
+"""Benchmarks import time and the hot paths of the card game packages.
+
+The ``import.*`` benchmarks time a fresh interpreter importing a module,
+which is what a short-lived worker or CLI pays before doing anything.
+Every other benchmark runs a fixed operation on fixed inputs a fixed
+number of times per repeat, and reports the best and median seconds per
+operation.
+Results are written as JSON; given a baseline file from an earlier run,
+benchmarks more than ``--threshold`` slower than it are flagged as
+regressions and the exit status is 1.
+
+    python -m deuces.scripts.benchmark --output after.json --baseline before.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import timeit
+
+from dataclasses import dataclass
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+)
+
+import numpy as np
+
+import deuces
+from cardgame.card import (
+    Rank,
+    Suit,
+)
+from deuces import DeucesCard
+from deuces.dealer import Dealer
+from deuces.determinization import (
+    DeterminizationSampler,
+    Observation,
+)
+from deuces.game_state import DeucesGameState
+from deuces.hand_evaluator import HandEvaluator
+from deuces.scripts.move_generator import MOVE_GENERATORS
+from deuces.validation import LogicalValidator
+from deuces.validation.combos import FiveCard
+
+RESULTS_VERSION: int = 1
+DEFAULT_REPEAT: int = 5
+DEFAULT_THRESHOLD: float = 0.10
+
+# Timed by the import.* benchmarks
+IMPORT_MODULES: Tuple[str, ...] = ('deuces', 'deuces.validation', 'deuces.game_state', 'deuces.simulator')
+
+# A benchmark's setup returns the operation to time
+Setup = Callable[[], Callable[[], Any]]
+# name -> (setup, operations per repeat)
+BENCHMARKS: Dict[str, Tuple[Setup, int]] = {}
+
+_CARD_BY_STR: Dict[str, DeucesCard] = dict((str(c), c) for c in DeucesCard.CARDS)
+
+FIVE_CARD_HANDS: Dict[str, str] = {
+    'invalid': '3♢ 4♣ 5♢ 6♢ 9♠',
+    'straight': '3♢ 4♣ 5♢ 6♢ 7♠',
+    'flush': '3♡ 4♡ 9♡ J♡ 2♡',
+    'full_house': '3♢ 3♣ 3♡ 9♢ 9♠',
+    'four_of_a_kind': '3♢ 3♣ 3♡ 3♠ 9♠',
+    'straight_flush': '3♣ 4♣ 5♣ 6♣ 7♣',
+}
+# (move, against) per move size
+VALIDATOR_MOVES: Dict[int, Tuple[str, str]] = {
+    1: ('9♠', '9♡'),
+    2: ('9♣ 9♠', '9♢ 9♡'),
+    3: ('J♢ J♣ J♠', '9♢ 9♣ 9♠'),
+    4: ('J♢ J♣ J♡ J♠', '9♢ 9♣ 9♡ 9♠'),
+    5: ('3♢ 3♣ 3♡ 9♢ 9♠', '3♡ 4♡ 9♡ J♡ 2♡'),
+}
+
+
+def cards(s: str) -> Tuple[DeucesCard, ...]:
+    return tuple(_CARD_BY_STR[c] for c in s.split())
+
+
+def _python(*args: str) -> subprocess.CompletedProcess:
+    """Run a fresh interpreter that imports this checkout of the packages."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(deuces.__file__)))
+    path = os.pathsep.join(p for p in (root, os.environ.get('PYTHONPATH')) if p)
+    return subprocess.run(
+        [sys.executable, *args], env=dict(os.environ, PYTHONPATH=path), capture_output=True, text=True, check=True)
+
+
+def import_times(module: str) -> Dict[str, int]:
+    """Cumulative microseconds to import each module a fresh interpreter loads to import ``module``.
+
+    Parsed from ``python -X importtime``, in import order.
+    """
+    times = {}
+    for line in _python('-X', 'importtime', '-c', f'import {module}').stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def register(name: str, number: int) -> Callable[[Setup], Setup]:
+    def decorator(setup: Setup) -> Setup:
+        BENCHMARKS[name] = (setup, number)
+        return setup
+    return decorator
+
+
+@register('card.construct', 20000)
+def _card_construct():
+    return lambda: DeucesCard(Rank.ACE, Suit.SPADES)
+
+
+@register('card.from_value', 20000)
+def _card_from_value():
+    return lambda: DeucesCard.from_value(47)
+
+
+@register('card.compare', 100000)
+def _card_compare():
+    low, high = cards('9♡ 9♠')
+    return lambda: low < high
+
+
+@register('card.sort_hand', 10000)
+def _card_sort_hand():
+    hand = cards('2♠ 9♡ 3♢ K♣ 9♠ A♡ 4♣ T♢ 7♠ 6♡ J♣ Q♢ 5♠')
+    return lambda: sorted(hand)
+
+
+def _register_import(module: str):
+    register(f'import.{module}', 1)(lambda: lambda: _python('-c', f'import {module}'))
+
+
+for _module in IMPORT_MODULES:
+    _register_import(_module)
+
+
+@register('dealer.deal_masks.1000', 20)
+def _dealer_deal_masks():
+    dealer = Dealer(0)
+    return lambda: dealer.deal_masks(1000)
+
+
+@register('determinization.sample.1000', 10)
+def _determinization_sample():
+    rng = random.Random(0)
+    state = DeucesGameState.deal(Dealer(0).deal_masks(1).tolist()[0])
+    for _ in range(30):
+        state.apply_move(rng.choice(list(state.legal_moves())))
+    sampler = DeterminizationSampler(Observation.from_state(state), seed=0, pass_weight=0.5)
+    return lambda: sampler.sample(1000)
+
+
+@register('hand_evaluator.score.1000', 20)
+def _hand_evaluator_score():
+    evaluator = HandEvaluator()
+    hands = Dealer(0).deal_masks(250).ravel()
+    return lambda: evaluator.score(hands)
+
+
+def _register_from_hand(combo: str, hand: str):
+    def setup():
+        hand_cards = cards(hand)
+        return lambda: FiveCard.from_hand(hand_cards)
+    register(f'five_card.from_hand.{combo}', 5000)(setup)
+
+
+def _register_is_valid_move(move_size: int, move: str, against: str):
+    def setup():
+        move_cards, against_cards = cards(move), cards(against)
+        return lambda: LogicalValidator.is_valid_move(move_cards, against_cards)
+    register(f'logical_validator.is_valid_move.{move_size}', 20000)(setup)
+
+
+def _register_generator(group_type: str):
+    generator = MOVE_GENERATORS[group_type]
+    register(f'move_generator.{group_type}', 1)(lambda: lambda: sum(1 for _ in generator()))
+
+
+for _combo, _hand in FIVE_CARD_HANDS.items():
+    _register_from_hand(_combo, _hand)
+for _move_size, (_move, _against) in VALIDATOR_MOVES.items():
+    _register_is_valid_move(_move_size, _move, _against)
+for _group_type in MOVE_GENERATORS:
+    _register_generator(_group_type)
+
+
+@dataclass
+class Comparison:
+    name: str
+    baseline: Optional[float]
+    current: float
+    status: str
+
+    @property
+    def ratio(self) -> Optional[float]:
+        if self.baseline is None:
+            return None
+        return self.current / self.baseline
+
+
+def run_benchmarks(
+        names: Optional[List[str]] = None,
+        repeat: int = DEFAULT_REPEAT,
+        scale: float = 1.0,
+) -> Dict[str, Any]:
+    """Time ``names`` (every benchmark by default) and return the results document.
+
+    ``scale`` multiplies the operations per repeat, e.g. 0.01 for a smoke run.
+    """
+    results: Dict[str, Dict[str, float]] = {}
+    for name in names if names is not None else list(BENCHMARKS):
+        setup, number = BENCHMARKS[name]
+        number = max(1, int(number * scale))
+        operation = setup()
+        operation()  # warm up lazily built tables
+        times = [t / number for t in timeit.Timer(operation).repeat(repeat, number)]
+        results[name] = {
+            'number': number,
+            'best': min(times),
+            'median': statistics.median(times),
+            'ops_per_sec': 1 / min(times) if min(times) else 0.0,
+        }
+    return {
+        'version': RESULTS_VERSION,
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'numpy': np.__version__,
+        'repeat': repeat,
+        'benchmarks': results,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float = DEFAULT_THRESHOLD) -> List[Comparison]:
+    """Compare the best times of the benchmarks in ``current`` with ``baseline``.
+
+    Slower than the baseline by more than ``threshold`` is a regression.
+    """
+    if baseline.get('version') != RESULTS_VERSION:
+        raise ValueError(f"unsupported baseline version {baseline.get('version')}")
+    current_benchmarks = current['benchmarks']
+    baseline_benchmarks = baseline['benchmarks']
+    comparisons = []
+    for name, result in current_benchmarks.items():
+        now = result['best']
+        before = baseline_benchmarks.get(name, {}).get('best')
+        if before is None:
+            status = 'new'
+        elif now > before * (1 + threshold):
+            status = 'regressed'
+        elif now < before * (1 - threshold):
+            status = 'improved'
+        else:
+            status = 'unchanged'
+        comparisons.append(Comparison(name, before, now, status))
+    return comparisons
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('-k', dest='filters', action='append',
+                        help='only run benchmarks whose name contains this, may be repeated')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help='multiply the operations per repeat by this')
+    parser.add_argument('--output', help='write the results to this JSON file')
+    parser.add_argument('--baseline', help='compare against the results in this JSON file')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='relative slowdown that counts as a regression')
+    args = parser.parse_args(argv)
+
+    names = [n for n in BENCHMARKS if not args.filters or any(f in n for f in args.filters)]
+    results = run_benchmarks(names, args.repeat, args.scale)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if not args.baseline:
+        for name, result in results['benchmarks'].items():
+            print(f"{name:45} {result['best'] * 1e6:12.3f} us  {result['ops_per_sec']:14,.0f} ops/s")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    comparisons = compare(results, baseline, args.threshold)
+    for c in comparisons:
+        ratio = f'{c.ratio:6.2f}x' if c.ratio is not None else '      -'
+        print(f'{c.name:45} {ratio}  {c.status}')
+    return int(any(c.status == 'regressed' for c in comparisons))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
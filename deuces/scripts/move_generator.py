@@ -1,170 +1,300 @@
+"""Enumerates every Deuces move and writes them out.
+
+Moves are tuples of card ordinals (see ``deuces.bitmask``). Each move class
+streams through a buffered writer, and the classes can be fanned out over a
+process pool. Run as a script for the CLI; ``--benchmark`` reports moves/sec.
+
+``--rules`` instead writes the move database of a house variant, read from
+a JSON object of ``deuces.rules.Rules`` fields, in that variant's ordinals.
+"""
+import argparse
+import itertools
+import json
 import os
-import sys
+import time
 
+from concurrent.futures import ProcessPoolExecutor
 from typing import (
+    Callable,
+    Dict,
     Iterable,
+    List,
+    Optional,
+    Sequence,
+    TextIO,
     Tuple,
 )
 
+import numpy as np
+
 from deuces import (
     DeucesCard,
+    bitmask,
+    instrumentation,
+)
+from deuces.move_db import (
+    MOVE_DB_FILENAME,
+    write_move_db,
+)
+from deuces.moves import (
+    MOVE_CLASSES,
+    MOVES_DIRECTORY,
+    from_masks,
+)
+from deuces.rules import (
+    RULES_CACHE_DIRECTORY,
+    Rules,
+    compile_rules,
 )
+from deuces.validation.batch_validator import (
+    MAX_MOVE_SIZE,
+    PAD,
+)
+from deuces.validation.combos import (
+    VALID_STRAIGHTS_BY_RANK_IXS,
+)
+
+Move = Tuple[int, ...]
+
+# Lines are joined and written once this many have been buffered
+WRITE_CHUNK_SIZE: int = 4096
+CARD_STRS: List[str] = [str(c) for c in DeucesCard.CARDS]
+
+_RANK_IXS = range(bitmask.NUM_RANKS)
+_SUIT_IXS = range(bitmask.NUM_SUITS)
+_o = bitmask.ordinal_of
+
 
+def generate_all_singles(skip_rank_ix: int = -1) -> Iterable[Move]:
+    for r in _RANK_IXS:
+        if r == skip_rank_ix:
+            continue
+        for s in _SUIT_IXS:
+            yield _o(r, s),  # returns tuple
 
-VALID_STRAIGHTS_BY_RANK_IXS = [
-    (0, 1, 2, 11, 12),
-    (0, 1, 2, 3, 12),
-    (0, 1, 2, 3, 4),
-    (1, 2, 3, 4, 5),
-    (2, 3, 4, 5, 6),
-    (3, 4, 5, 6, 7),
-    (4, 5, 6, 7, 8),
-    (5, 6, 7, 8, 9),
-    (6, 7, 8, 9, 10),
-    (7, 8, 9, 10, 11),
-]
-
-
-def generate_all_singles(skip_rank_ix: int = -1) -> Iterable[Tuple[DeucesCard]]:
-    rs = DeucesCard.RANK_ORDER if skip_rank_ix == -1 else (
-            DeucesCard.RANK_ORDER[:skip_rank_ix] + DeucesCard.RANK_ORDER[skip_rank_ix+1:])
-    for r in rs:
-        for s in DeucesCard.SUIT_ORDER:
-            yield DeucesCard(r, s),  # returns tuple
-
-
-def generate_all_twos(skip_rank_ix: int = -1) -> Iterable[Tuple[DeucesCard]]:
-    rs = DeucesCard.RANK_ORDER if skip_rank_ix == -1 else (
-        DeucesCard.RANK_ORDER[:skip_rank_ix] + DeucesCard.RANK_ORDER[skip_rank_ix+1:])
-    s1_ss = DeucesCard.SUIT_ORDER[1:]
-    for r in rs:
-        for s1_ix, s1 in enumerate(s1_ss, start=1):
-            s0_ss = DeucesCard.SUIT_ORDER[:s1_ix]
-            for s0 in s0_ss:
-                yield DeucesCard(r, s0), DeucesCard(r, s1)
-
-
-def generate_all_threes(skip_rank_ix: int = -1) -> Iterable[Tuple[DeucesCard]]:
-    rs = DeucesCard.RANK_ORDER if skip_rank_ix == -1 else (
-            DeucesCard.RANK_ORDER[:skip_rank_ix] + DeucesCard.RANK_ORDER[skip_rank_ix+1:])
-    s2_ss = DeucesCard.SUIT_ORDER[2:]
-    for r in rs:
-        for s2_ix, s2 in enumerate(s2_ss, start=2):
-            s1_ss = DeucesCard.SUIT_ORDER[1:s2_ix]
-            for s1_ix, s1 in enumerate(s1_ss, start=1):
-                s0_ss = DeucesCard.SUIT_ORDER[:s1_ix]
-                for s0 in s0_ss:
-                    yield DeucesCard(r, s0), DeucesCard(r, s1), DeucesCard(r, s2)
-
-
-def generate_all_fours() -> Iterable[Tuple[DeucesCard]]:
-    for r in DeucesCard.RANK_ORDER:
-        yield tuple(DeucesCard(r, s) for s in DeucesCard.SUIT_ORDER)
-
-
-def generate_all_combos() -> Iterable[Tuple[DeucesCard]]:
-    for group in _generate_straights():
-        yield group
-    for group in _generate_flushes():
-        yield group
-    for group in _generate_full_house():
-        yield group
-    for group in _generate_four_of_a_kind():
-        yield group
-    for group in _generate_straight_flush():
-        yield group
-
-
-def _generate_straights(include_straight_flushes=False) -> Iterable[Tuple[DeucesCard]]:
+
+def generate_all_twos(skip_rank_ix: int = -1) -> Iterable[Move]:
+    for r in _RANK_IXS:
+        if r == skip_rank_ix:
+            continue
+        for s1 in range(1, bitmask.NUM_SUITS):
+            for s0 in range(s1):
+                yield _o(r, s0), _o(r, s1)
+
+
+def generate_all_threes(skip_rank_ix: int = -1) -> Iterable[Move]:
+    for r in _RANK_IXS:
+        if r == skip_rank_ix:
+            continue
+        for s2 in range(2, bitmask.NUM_SUITS):
+            for s1 in range(1, s2):
+                for s0 in range(s1):
+                    yield _o(r, s0), _o(r, s1), _o(r, s2)
+
+
+def generate_all_fours() -> Iterable[Move]:
+    for r in _RANK_IXS:
+        yield tuple(_o(r, s) for s in _SUIT_IXS)
+
+
+def generate_all_combos() -> Iterable[Move]:
+    yield from _generate_straights()
+    yield from _generate_flushes()
+    yield from _generate_full_house()
+    yield from _generate_four_of_a_kind()
+    yield from _generate_straight_flush()
+
+
+def _generate_straights(include_straight_flushes=False) -> Iterable[Move]:
     for vs_ixs in VALID_STRAIGHTS_BY_RANK_IXS:
-        for s4 in DeucesCard.SUIT_ORDER:
-            for s3 in DeucesCard.SUIT_ORDER:
-                for s2 in DeucesCard.SUIT_ORDER:
-                    for s1 in DeucesCard.SUIT_ORDER:
-                        for s0 in DeucesCard.SUIT_ORDER:
-                            if (
-                                include_straight_flushes or
-                                not s0 == s1 == s2 == s3 == s4
-                            ):
-                                yield (
-                                    DeucesCard(DeucesCard.RANK_ORDER[r], s)
-                                    for r, s in zip(vs_ixs, (s0, s1, s2, s3, s4))
-                                )
-
-
-def _generate_flushes(include_straight_flushes=False) -> Iterable[Tuple[DeucesCard]]:
-    r4_rs = DeucesCard.RANK_ORDER[4:]  # possible end cards
-    for s in DeucesCard.SUIT_ORDER:
-        for r4_ix, r4 in enumerate(r4_rs, start=4):
-            r3_rs = DeucesCard.RANK_ORDER[3:r4_ix]  # start at lowest possible card and go up to previous card's index
-            for r3_ix, r3 in enumerate(r3_rs, start=3):
-                r2_rs = DeucesCard.RANK_ORDER[2:r3_ix]
-                for r2_ix, r2 in enumerate(r2_rs, start=2):
-                    r1_rs = DeucesCard.RANK_ORDER[1:r2_ix]
-                    for r1_ix, r1 in enumerate(r1_rs, start=1):
-                        r0_rs = DeucesCard.RANK_ORDER[:r1_ix]
-                        for r0_ix, r0 in enumerate(r0_rs):
-                            if (
-                                include_straight_flushes or
-                                not (  # a straight
-                                    (r0_ix+4) == (r1_ix+3) == (r2_ix+2) == (r3_ix+1) == r4_ix != 12 or
-                                    (r0_ix, r1_ix, r2_ix, r3_ix, r4_ix) in [(0, 1, 2, 11, 12), (0, 1, 2, 3, 12)]
-                                )
-                            ):
-                                yield (DeucesCard(r, s) for r in (r0, r1, r2, r3, r4))
-
-
-def _generate_full_house() -> Iterable[Tuple[DeucesCard]]:
-    triples = generate_all_threes()
-    for triple in triples:
-        pairs = generate_all_twos(skip_rank_ix=DeucesCard.RANK_TO_ORDER[triple[0].rank])
-        for pair in pairs:
-            yield tuple(sorted([*triple, *pair]))
-
-
-def _generate_four_of_a_kind() -> Iterable[Tuple[DeucesCard]]:
-    for foak_r_ix, foak_r in enumerate(DeucesCard.RANK_ORDER):
-        single_rs = DeucesCard.RANK_ORDER[:foak_r_ix] + DeucesCard.RANK_ORDER[foak_r_ix+1:]
-        for single_r in single_rs:
-            for single_s in DeucesCard.SUIT_ORDER:
-                if DeucesCard.RANK_TO_ORDER[foak_r] < DeucesCard.RANK_TO_ORDER[single_r]:
-                    yield tuple([
-                        *(DeucesCard(foak_r, foak_s) for foak_s in DeucesCard.SUIT_ORDER),
-                        DeucesCard(single_r, single_s),
-                    ])
+        # The last card's suit varies slowest
+        for s4, s3, s2, s1, s0 in itertools.product(_SUIT_IXS, repeat=5):
+            if (
+                include_straight_flushes or
+                not s0 == s1 == s2 == s3 == s4
+            ):
+                yield tuple(_o(r, s) for r, s in zip(vs_ixs, (s0, s1, s2, s3, s4)))
+
+
+def _generate_flushes(include_straight_flushes=False) -> Iterable[Move]:
+    straights = set(VALID_STRAIGHTS_BY_RANK_IXS)
+    for s in _SUIT_IXS:
+        for r4 in range(4, bitmask.NUM_RANKS):  # possible end cards
+            for r3 in range(3, r4):  # start at lowest possible card and go up to previous card's index
+                for r2 in range(2, r3):
+                    for r1 in range(1, r2):
+                        for r0 in range(r1):
+                            if include_straight_flushes or (r0, r1, r2, r3, r4) not in straights:
+                                yield _o(r0, s), _o(r1, s), _o(r2, s), _o(r3, s), _o(r4, s)
+
+
+def _generate_full_house() -> Iterable[Move]:
+    for triple in generate_all_threes():
+        for pair in generate_all_twos(skip_rank_ix=bitmask.rank_of(triple[0])):
+            yield tuple(sorted(triple + pair))
+
+
+def _generate_four_of_a_kind() -> Iterable[Move]:
+    for foak_r in _RANK_IXS:
+        foak = tuple(_o(foak_r, s) for s in _SUIT_IXS)
+        for single_r in _RANK_IXS:
+            if single_r == foak_r:
+                continue
+            for single_s in _SUIT_IXS:
+                if foak_r < single_r:
+                    yield foak + (_o(single_r, single_s),)
                 else:
-                    yield tuple([
-                        DeucesCard(single_r, single_s),
-                        *(DeucesCard(foak_r, foak_s) for foak_s in DeucesCard.SUIT_ORDER),
-                    ])
+                    yield (_o(single_r, single_s),) + foak
 
 
-def _generate_straight_flush() -> Iterable[Tuple[DeucesCard]]:
+def _generate_straight_flush() -> Iterable[Move]:
     for vs_ixs in VALID_STRAIGHTS_BY_RANK_IXS:
-        for s in DeucesCard.SUIT_ORDER:
-            yield (DeucesCard(DeucesCard.RANK_ORDER[r], s) for r in vs_ixs)
-
-
-def write_all_possible_moves(directory='.'):
-    move_generators = {
-        '1s': generate_all_singles,
-        '2s': generate_all_twos,
-        '3s': generate_all_threes,
-        '4s': generate_all_fours,
-        '5s': generate_all_combos,
-        'st': _generate_straights,
-        'fl': _generate_flushes,
-        'fh': _generate_full_house,
-        'fk': _generate_four_of_a_kind,
-        'sf': _generate_straight_flush,
-    }
-    for group_type, generator in move_generators.items():
+        for s in _SUIT_IXS:
+            yield tuple(_o(r, s) for r in vs_ixs)
+
+
+MOVE_GENERATORS: Dict[str, Callable[[], Iterable[Move]]] = {
+    '1s': generate_all_singles,
+    '2s': generate_all_twos,
+    '3s': generate_all_threes,
+    '4s': generate_all_fours,
+    '5s': generate_all_combos,
+    'st': _generate_straights,
+    'fl': _generate_flushes,
+    'fh': _generate_full_house,
+    'fk': _generate_four_of_a_kind,
+    'sf': _generate_straight_flush,
+}
+
+
+def write_moves_csv(f: TextIO, moves: Iterable[Move], chunk_size: int = WRITE_CHUNK_SIZE) -> int:
+    """Stream moves to ``f`` as lines of comma-separated cards; returns the number written."""
+    count = 0
+    chunk: List[str] = []
+    for move in moves:
+        chunk.append(','.join([CARD_STRS[o] for o in move]) + '\n')
+        if len(chunk) >= chunk_size:
+            f.write(''.join(chunk))
+            count += len(chunk)
+            chunk = []
+    f.write(''.join(chunk))
+    return count + len(chunk)
+
+
+def write_move_class(
+        group_type: str,
+        directory: Optional[str],
+        keep_moves: bool = False,
+) -> Tuple[str, int, float, Optional[List[Move]]]:
+    """Generate one move class, writing ``<group_type>.csv`` unless ``directory`` is None.
+
+    Returns the class, its number of moves, the seconds it took and, with
+    ``keep_moves``, the moves themselves.
+    """
+    start = time.perf_counter()
+    moves: Iterable[Move] = MOVE_GENERATORS[group_type]()
+    if instrumentation.ENABLED:
+        moves = instrumentation.timed_iter(f'move_generator.{group_type}', moves)
+    kept: Optional[List[Move]] = None
+    if keep_moves:
+        moves = kept = list(moves)
+    if directory is None:
+        count = sum(1 for _ in moves)
+    else:
         filename = os.path.join(directory, f'{group_type}.csv')
-        with open(filename, 'w') as f:
-            for group in generator():
-                f.write(','.join(str(c) for c in group) + '\n')
+        with open(filename, 'w', encoding='utf-8', buffering=1 << 20) as f:
+            count = write_moves_csv(f, moves)
+    return group_type, count, time.perf_counter() - start, kept
+
+
+def write_all_possible_moves(
+        directory='.',
+        formats=('csv',),
+        processes: int = 1,
+) -> Dict[str, Tuple[int, float]]:
+    """Write every move class as CSV files and/or one binary move database.
+
+    ``formats`` holds 'csv' for one ``<class>.csv`` per move class and 'bin'
+    for a ``move_db.MOVE_DB_FILENAME`` database holding all of them. With
+    ``processes`` > 1 the classes are generated in a process pool.
+
+    Returns the number of moves and seconds taken per class.
+    """
+    csv_directory = directory if 'csv' in formats else None
+    keep_moves = 'bin' in formats
+    jobs = [(group_type, csv_directory, keep_moves) for group_type in MOVE_GENERATORS]
+    if processes > 1:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            results = list(pool.map(write_move_class, *zip(*jobs)))
+    else:
+        results = [write_move_class(*job) for job in jobs]
+
+    if keep_moves:
+        write_move_db(
+            os.path.join(directory, MOVE_DB_FILENAME),
+            dict((group_type, _to_array(moves)) for group_type, _, _, moves in results),
+        )
+    return dict((group_type, (count, seconds)) for group_type, count, seconds, _ in results)
+
+
+def write_rules_move_db(
+        rules: Rules,
+        directory: str = '.',
+        cache_directory: Optional[str] = RULES_CACHE_DIRECTORY,
+) -> Dict[str, Tuple[int, float]]:
+    """Write the move database of ``rules``, one class per move size, from its compiled tables.
+
+    Returns the number of moves and seconds taken per class, like
+    ``write_all_possible_moves``.
+
+    :param cache_directory: where the compiled tables are kept, see
+        ``deuces.rules.compile_rules``
+    """
+    start = time.perf_counter()
+    compiled = compile_rules(rules, cache_directory)
+    seconds = time.perf_counter() - start
+    moves_by_class = dict(
+        (move_class, from_masks(compiled.moves(move_size)))
+        for move_size, move_class in enumerate(MOVE_CLASSES, start=1))
+    write_move_db(os.path.join(directory, MOVE_DB_FILENAME), moves_by_class, compiled.strength_table)
+    return dict((move_class, (len(moves), seconds)) for move_class, moves in moves_by_class.items())
+
+
+def _to_array(moves: Sequence[Move]) -> np.ndarray:
+    array = np.full((len(moves), MAX_MOVE_SIZE), PAD, dtype=np.int8)
+    for i, move in enumerate(moves):
+        array[i, :len(move)] = move
+    return array
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('directory', nargs='?', default=MOVES_DIRECTORY)
+    parser.add_argument('--format', dest='formats', action='append', choices=('csv', 'bin'),
+                        help='output format, may be repeated (default: csv)')
+    parser.add_argument('--processes', type=int, default=1,
+                        help='generate move classes in this many processes')
+    parser.add_argument('--benchmark', action='store_true',
+                        help='report moves/sec per move class')
+    parser.add_argument('--rules', metavar='JSON_FILE',
+                        help='write the move database of this house variant instead')
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    if args.rules is not None:
+        if args.formats and args.formats != ['bin']:
+            parser.error('--rules writes only the bin format')
+        with open(args.rules, encoding='utf-8') as f:
+            stats = write_rules_move_db(Rules(**json.load(f)), args.directory)
+    else:
+        stats = write_all_possible_moves(args.directory, tuple(args.formats or ('csv',)), args.processes)
+    elapsed = time.perf_counter() - start
+    if args.benchmark:
+        for group_type, (count, seconds) in stats.items():
+            print(f'{group_type}: {count} moves in {seconds:.3f}s ({count / seconds:,.0f} moves/s)')
+        total = sum(count for count, _ in stats.values())
+        print(f'total: {total} moves in {elapsed:.3f}s ({total / elapsed:,.0f} moves/s)')
 
 
 if __name__ == '__main__':
-    write_directory = sys.argv[1] if len(sys.argv) > 1 else os.path.join('..', 'data', 'moves')
-    write_all_possible_moves(directory=write_directory)
+    main()
@@ -0,0 +1,171 @@
+"""Move and strength tables published once in shared memory.
+
+The owner process copies the move database and the five-card strength
+table into one ``multiprocessing.shared_memory`` segment; workers attach
+to it by name and get read-only numpy views of the same pages, instead of
+each loading the move files and building the strength table.
+
+Segment layout, little-endian: a header of magic ``b'DCST'``, version
+(u16), then offset and length (u64 each) of the move database block and of
+the strength table block. The move database block is a ``move_db`` file
+image; the strength table is ``five_card_table.strength_table()``.
+
+Every process closes its mapping on ``close`` or when it exits, and the
+owner also unlinks the segment; attached processes never do.
+"""
+import atexit
+import inspect
+import os
+import struct
+
+from multiprocessing import (
+    resource_tracker,
+    shared_memory,
+)
+from typing import (
+    Optional,
+    Set,
+)
+
+import numpy as np
+
+from deuces.move_db import (
+    MOVE_DB_FILENAME,
+    MoveDB,
+)
+from deuces.move_index import MoveIndex
+from deuces.moves import (
+    MOVE_CLASSES,
+    MOVES_DIRECTORY,
+)
+from deuces.validation import BatchValidator
+from deuces.validation.combos import five_card_table
+
+MAGIC: bytes = b'DCST'
+VERSION: int = 1
+HEADER = struct.Struct('<4sHQQQQ')
+BLOCK_ALIGNMENT: int = 64
+
+# SharedMemory takes track=False from Python 3.13
+_TRACK_PARAMETER: bool = 'track' in inspect.signature(shared_memory.SharedMemory).parameters
+# Keeps the tables attached by worker_initializer alive in pool workers
+_WORKER_TABLES: Optional['SharedTables'] = None
+# Segments published by this process, which its resource tracker must keep tracking
+_PUBLISHED: Set[str] = set()
+
+
+def _aligned(offset: int) -> int:
+    return offset + -offset % BLOCK_ALIGNMENT
+
+
+class SharedTables:
+    """Read-only views over a shared tables segment.
+
+    Use ``publish`` in the owner process and ``attach`` in workers; both
+    are context managers.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool):
+        self._shm = shm
+        self.owner = owner
+        magic, version, db_offset, db_length, table_offset, table_length = HEADER.unpack_from(shm.buf, 0)
+        if magic != MAGIC:
+            raise ValueError(f'not a shared tables segment, bad magic {magic!r}')
+        if version != VERSION:
+            raise ValueError(f'unsupported shared tables version {version}, expected {VERSION}')
+        buffer = shm.buf.toreadonly()
+        self.move_db = MoveDB(buffer[db_offset:db_offset + db_length])
+        self.strength_table: np.ndarray = np.frombuffer(
+            buffer, dtype=np.uint16, count=table_length // 2, offset=table_offset)
+        atexit.register(self.close)
+
+    @classmethod
+    def publish(cls, name: Optional[str] = None, directory: str = MOVES_DIRECTORY) -> 'SharedTables':
+        """Copy the move database in ``directory`` and the strength table into a new segment."""
+        with open(os.path.join(directory, MOVE_DB_FILENAME), 'rb') as f:
+            db = f.read()
+        table = memoryview(five_card_table.strength_table()).cast('B')
+        db_offset = _aligned(HEADER.size)
+        table_offset = _aligned(db_offset + len(db))
+        shm = shared_memory.SharedMemory(name=name, create=True, size=table_offset + len(table))
+        try:
+            HEADER.pack_into(shm.buf, 0, MAGIC, VERSION, db_offset, len(db), table_offset, len(table))
+            shm.buf[db_offset:db_offset + len(db)] = db
+            shm.buf[table_offset:table_offset + len(table)] = table
+            tables = cls(shm, owner=True)
+        except BaseException:
+            shm.close()
+            shm.unlink()
+            raise
+        _PUBLISHED.add(shm.name)
+        return tables
+
+    @classmethod
+    def attach(cls, name: str) -> 'SharedTables':
+        # Attaching registers the segment with this process's resource
+        # tracker, which would unlink it when this process exits; only the
+        # publishing process's tracker should keep it
+        if _TRACK_PARAMETER and name not in _PUBLISHED:
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        else:
+            shm = shared_memory.SharedMemory(name=name)
+            if not _TRACK_PARAMETER and shm.name not in _PUBLISHED:
+                # Before Python 3.13 there is no track=False, and the tracker
+                # is keyed by the private, platform-prefixed _name
+                resource_tracker.unregister(shm._name, 'shared_memory')
+        return cls(shm, owner=False)
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    def __enter__(self) -> 'SharedTables':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def move_index(self) -> MoveIndex:
+        return MoveIndex.from_move_db(self.move_db)
+
+    def install(self):
+        """Use these tables for this process's five-card strength lookups.
+
+        BatchValidator reads the shared strength table directly; the scalar
+        lookup dict is built from the shared five-card moves instead of by
+        classifying every candidate hand.
+        """
+        BatchValidator._STRENGTH_TABLE = self.strength_table
+        five_cards = MOVE_CLASSES[-1]
+        five_card_table._STRENGTH_BY_MASK = dict(zip(
+            self.move_db.masks(five_cards).tolist(), self.move_db.strengths(five_cards).tolist()))
+
+    def close(self):
+        """Release this process's mapping, and unlink the segment if this process published it.
+
+        Views handed out must not be used afterwards.
+        """
+        if self._shm is None:
+            return
+        if BatchValidator._STRENGTH_TABLE is self.strength_table:
+            BatchValidator._STRENGTH_TABLE = None
+        self.move_db.close()
+        self.move_db = None
+        self.strength_table = None
+        try:
+            self._shm.close()
+        except BufferError:
+            # Views are still alive; the mapping is released when they are
+            pass
+        if self.owner:
+            self._shm.unlink()
+            _PUBLISHED.discard(self._shm.name)
+        atexit.unregister(self.close)
+        self._shm = None
+
+
+def worker_initializer(name: str):
+    """Pool ``initializer`` that attaches to and installs the tables named ``name``."""
+    global _WORKER_TABLES
+    _WORKER_TABLES = SharedTables.attach(name)
+    _WORKER_TABLES.install()
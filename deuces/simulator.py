@@ -0,0 +1,247 @@
+"""Monte Carlo self-play.
+
+Games are dealt from a ``cardgame.Deck`` and played to completion by one
+policy per seat. Runs are split into chunks of games that are played in a
+process pool; each chunk draws from its own child of the run's
+``numpy.random.SeedSequence``, so results depend only on the seed and the
+chunk size, not on the number of processes. Chunk results stream back as
+running ``SimulationStats``.
+
+Deals are shuffled for a whole chunk at once by a ``deuces.dealer.Dealer``,
+and each player's legal moves are maintained across turns (see
+``TrackingDeucesGameState``). A house variant is played by passing its
+``deuces.rules.Rules``; each process compiles them, or loads them from
+the rules cache, once.
+"""
+import os
+import random
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import (
+    dataclass,
+    field,
+)
+from typing import (
+    Callable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+import numpy as np
+
+from cardgame import Deck
+from deuces import (
+    bitmask,
+    instrumentation,
+)
+from deuces.dealer import (
+    Dealer,
+    deck_ordinals,
+)
+from deuces.game_state import (
+    NUM_PLAYERS,
+    PASS,
+    DeucesGameState,
+    TrackingDeucesGameState,
+)
+from deuces.rules import (
+    RULES_CACHE_DIRECTORY,
+    CompiledRules,
+    Rules,
+    compile_rules,
+)
+
+# Games each pool task plays
+CHUNK_SIZE: int = 1000
+
+# Picks one of the legal moves for the player to move
+Policy = Callable[[DeucesGameState, List[int], random.Random], int]
+
+
+def random_policy(state: DeucesGameState, moves: List[int], rng: random.Random) -> int:
+    return rng.choice(moves)
+
+
+def low_card_policy(state: DeucesGameState, moves: List[int], rng: random.Random) -> int:
+    """Never pass when able to play; shed the lowest card, with as many others as possible."""
+    plays = [m for m in moves if m != PASS]
+    if not plays:
+        return PASS
+    return min(plays, key=lambda m: (bitmask.lowest(m), -bitmask.popcount(m), m))
+
+
+@dataclass
+class GameResult:
+    winner: int
+    # Moves made, passes included
+    length: int
+    cards_left: Tuple[int, ...]
+
+
+@dataclass
+class SimulationStats:
+    games: int = 0
+    wins: List[int] = field(default_factory=lambda: [0] * NUM_PLAYERS)
+    cards_left: List[int] = field(default_factory=lambda: [0] * NUM_PLAYERS)
+    moves: int = 0
+    moves_squared: int = 0
+    shortest_game: Optional[int] = None
+    longest_game: Optional[int] = None
+    elapsed: float = 0.0
+
+    def add(self, result: GameResult):
+        self.games += 1
+        self.wins[result.winner] += 1
+        for seat, left in enumerate(result.cards_left):
+            self.cards_left[seat] += left
+        self.moves += result.length
+        self.moves_squared += result.length * result.length
+        if self.shortest_game is None or result.length < self.shortest_game:
+            self.shortest_game = result.length
+        if self.longest_game is None or result.length > self.longest_game:
+            self.longest_game = result.length
+
+    def merge(self, other: 'SimulationStats'):
+        """Fold in another run's games; ``elapsed`` is left to the caller."""
+        self.games += other.games
+        self.wins = [a + b for a, b in zip(self.wins, other.wins)]
+        self.cards_left = [a + b for a, b in zip(self.cards_left, other.cards_left)]
+        self.moves += other.moves
+        self.moves_squared += other.moves_squared
+        lengths = [n for n in (self.shortest_game, other.shortest_game) if n is not None]
+        self.shortest_game = min(lengths, default=None)
+        lengths = [n for n in (self.longest_game, other.longest_game) if n is not None]
+        self.longest_game = max(lengths, default=None)
+
+    @property
+    def win_rates(self) -> List[float]:
+        return [w / self.games if self.games else 0.0 for w in self.wins]
+
+    @property
+    def mean_game_length(self) -> float:
+        return self.moves / self.games if self.games else 0.0
+
+    @property
+    def game_length_stdev(self) -> float:
+        if not self.games:
+            return 0.0
+        mean = self.mean_game_length
+        return max(0.0, self.moves_squared / self.games - mean * mean) ** 0.5
+
+    @property
+    def moves_per_sec(self) -> float:
+        return self.moves / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def games_per_sec(self) -> float:
+        return self.games / self.elapsed if self.elapsed else 0.0
+
+
+def play_game(
+        hands: Sequence[int],
+        policies: Sequence[Policy],
+        rng: random.Random,
+        rules: Optional[CompiledRules] = None,
+) -> GameResult:
+    state = TrackingDeucesGameState.deal(hands, rules)
+    length = 0
+    while not state.is_over:
+        started = instrumentation.start('simulator.decision') if instrumentation.ENABLED else None
+        moves = list(state.legal_moves())
+        move = policies[state.turn](state, moves, rng)
+        if started is not None:
+            instrumentation.stop('simulator.decision', started)
+        state.apply_move(move)
+        length += 1
+    return GameResult(state.winner, length, tuple(bitmask.popcount(h) for h in state.hands))
+
+
+def simulate_chunk(
+        policies: Sequence[Policy],
+        seed: np.random.SeedSequence,
+        num_games: int,
+        deck: Optional[Deck] = None,
+        rules: Optional[Rules] = None,
+        cache_directory: Optional[str] = RULES_CACHE_DIRECTORY,
+) -> SimulationStats:
+    start = time.perf_counter()
+    compiled = None if rules is None else compile_rules(rules, cache_directory)
+    # Deals and policy choices each get their own stream of the chunk's seed
+    deal_seed, policy_seed = seed.spawn(2)
+    dealer = Dealer(deal_seed, deck, compiled)
+    rng = random.Random(int(policy_seed.generate_state(1)[0]))
+    stats = SimulationStats()
+    for hands in dealer.deal_masks(num_games).tolist():
+        stats.add(play_game(hands, policies, rng, compiled))
+    stats.elapsed = time.perf_counter() - start
+    return stats
+
+
+def iter_simulate(
+        num_games: int,
+        policies: Union[Policy, Sequence[Policy]] = random_policy,
+        seed: int = 0,
+        processes: Optional[int] = None,
+        chunk_size: int = CHUNK_SIZE,
+        deck: Optional[Deck] = None,
+        rules: Optional[Rules] = None,
+        cache_directory: Optional[str] = RULES_CACHE_DIRECTORY,
+) -> Iterator[SimulationStats]:
+    """Play ``num_games`` games, yielding the running totals after every chunk.
+
+    The same SimulationStats is yielded each time, updated in place.
+
+    :param policies: one policy for every seat, or one per seat
+    :param processes: pool size, all cores by default; 1 plays in this process
+    :param rules: the variant to play, the standard game by default
+    :param cache_directory: where the variant's compiled tables are kept,
+        see ``deuces.rules.compile_rules``
+    """
+    if callable(policies):
+        policies = [policies] * NUM_PLAYERS
+    if len(policies) != NUM_PLAYERS:
+        raise ValueError(f'expected {NUM_PLAYERS} policies, got {len(policies)}')
+    sizes = [min(chunk_size, num_games - i) for i in range(0, num_games, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    # Reject a deck that cannot be dealt before starting the pool
+    deck_ordinals(deck)
+    if rules is not None:
+        # Compiled once up front. Pool workers load the tables from the cache
+        # only if this call wrote them there, not if this process already
+        # held them in memory
+        compile_rules(rules, cache_directory)
+    jobs = (
+        [policies] * len(sizes),
+        seeds,
+        sizes,
+        [deck] * len(sizes),
+        [rules] * len(sizes),
+        [cache_directory] * len(sizes),
+    )
+    processes = processes or os.cpu_count() or 1
+    start = time.perf_counter()
+    totals = SimulationStats()
+    if processes > 1:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            for stats in pool.map(simulate_chunk, *jobs):
+                totals.merge(stats)
+                totals.elapsed = time.perf_counter() - start
+                yield totals
+    else:
+        for stats in map(simulate_chunk, *jobs):
+            totals.merge(stats)
+            totals.elapsed = time.perf_counter() - start
+            yield totals
+
+
+def simulate(num_games: int, *args, **kwargs) -> SimulationStats:
+    """Totals of ``iter_simulate``."""
+    totals = SimulationStats()
+    for totals in iter_simulate(num_games, *args, **kwargs):
+        pass
+    return totals
@@ -0,0 +1,443 @@
+"""Game states stored on disk in sorted, block-compressed segments.
+
+A store is a directory of immutable segment files. Each segment holds
+fixed-size records, a key (by default a ``DeucesGameState.to_bytes``
+encoding) and an optional fixed-size value, sorted by key and compressed
+in blocks of ``block_records`` records. A sparse index of every block's
+first key is kept in memory, so looking a key up is a binary search of the
+index, one block read from the mapped file and decompressed, and a binary
+search of the block.
+
+States added to a store are buffered in memory and written out as a new
+segment when the buffer fills or on ``flush``. Newer segments win when
+the same key is in several. ``compact`` merges every segment into one,
+streaming them block by block, optionally on a background thread while
+the store keeps serving lookups and taking new states.
+
+Segment layout, little-endian:
+  * header: magic ``b'DCSS'``, version (u16), codec (u8), a pad byte, key
+    size (u16), value size (u16), records per block (u32), number of
+    records (u64), number of blocks (u64), byte offset of the index (u64),
+  * the compressed blocks, back to back,
+  * the index: per block, its first key, then its byte offset (u64),
+    compressed length (u32) and number of records (u32).
+"""
+import bisect
+import heapq
+import lzma
+import mmap
+import os
+import re
+import struct
+import threading
+import zlib
+
+from collections import OrderedDict
+from typing import (
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+from deuces.game_state import (
+    STATE_BYTES,
+    DeucesGameState,
+)
+
+MAGIC: bytes = b'DCSS'
+VERSION: int = 1
+HEADER = struct.Struct('<4sHBxHHIQQQ')
+INDEX_ENTRY = struct.Struct('<QII')
+
+# Codec name -> (id stored in the header, compress, decompress)
+CODECS = {
+    'none': (0, bytes, bytes),
+    'zlib': (1, zlib.compress, zlib.decompress),
+    'lzma': (2, lzma.compress, lzma.decompress),
+}
+_CODECS_BY_ID = dict((codec_id, name) for name, (codec_id, _, _) in CODECS.items())
+
+DEFAULT_CODEC: str = 'zlib'
+DEFAULT_BLOCK_RECORDS: int = 1024
+# Decompressed blocks each segment keeps for repeated lookups
+DEFAULT_CACHED_BLOCKS: int = 8
+# Records a store buffers before writing them out as a segment
+DEFAULT_BUFFER_RECORDS: int = 1 << 20
+
+SEGMENT_PATTERN = re.compile(r'segment-(\d{8})\.dcss$')
+
+
+def segment_filename(generation: int) -> str:
+    return f'segment-{generation:08d}.dcss'
+
+
+class _BlockKeys:
+    """The keys of packed fixed-size records, a decompressed block or the
+    index, as a sequence bisect can search.
+    """
+
+    def __init__(self, block: bytes, key_size: int, record_size: int):
+        self._block = block
+        self._key_size = key_size
+        self._record_size = record_size
+
+    def __len__(self) -> int:
+        return len(self._block) // self._record_size
+
+    def __getitem__(self, i: int) -> bytes:
+        start = i * self._record_size
+        return self._block[start:start + self._key_size]
+
+
+class SegmentWriter:
+    """Writes records, added in strictly increasing key order, to a new segment.
+
+    The segment appears at ``path`` only once the writer is closed.
+    """
+
+    def __init__(
+            self,
+            path: str,
+            key_size: int = STATE_BYTES,
+            value_size: int = 0,
+            codec: str = DEFAULT_CODEC,
+            block_records: int = DEFAULT_BLOCK_RECORDS,
+    ):
+        if codec not in CODECS:
+            raise ValueError(f'unknown codec {codec!r}, expected one of {sorted(CODECS)}')
+        if block_records < 1:
+            raise ValueError(f'block_records must be positive, got {block_records}')
+        self.path = path
+        self.key_size = key_size
+        self.value_size = value_size
+        self.codec = codec
+        self.block_records = block_records
+        self.num_records = 0
+        self._compress = CODECS[codec][1]
+        self._tmp_path = path + '.tmp'
+        self._file = open(self._tmp_path, 'wb')
+        self._file.write(bytes(HEADER.size))
+        self._index: List[bytes] = []
+        self._block: List[bytes] = []
+        self._last_key: Optional[bytes] = None
+
+    def __enter__(self) -> 'SegmentWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def add(self, key: bytes, value: bytes = b''):
+        if len(key) != self.key_size:
+            raise ValueError(f'expected a {self.key_size} byte key, got {len(key)} bytes')
+        if len(value) != self.value_size:
+            raise ValueError(f'expected a {self.value_size} byte value, got {len(value)} bytes')
+        if self._last_key is not None and key <= self._last_key:
+            raise ValueError('keys must be added in strictly increasing order')
+        self._last_key = key
+        self._block.append(key + value)
+        self.num_records += 1
+        if len(self._block) == self.block_records:
+            self._write_block()
+
+    def close(self):
+        if self._file is None:
+            return
+        if self._block:
+            self._write_block()
+        index_offset = self._file.tell()
+        self._file.write(b''.join(self._index))
+        self._file.seek(0)
+        self._file.write(HEADER.pack(
+            MAGIC, VERSION, CODECS[self.codec][0], self.key_size, self.value_size,
+            self.block_records, self.num_records, len(self._index), index_offset))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        self._file = None
+        os.replace(self._tmp_path, self.path)
+
+    def abort(self):
+        """Give up on the segment and remove what was written of it."""
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        os.remove(self._tmp_path)
+
+    def _write_block(self):
+        data = self._compress(b''.join(self._block))
+        self._index.append(self._block[0][:self.key_size] + INDEX_ENTRY.pack(self._file.tell(), len(data), len(self._block)))
+        self._file.write(data)
+        self._block = []
+
+
+def write_segment(path: str, records, **kwargs) -> int:
+    """Write ``(key, value)`` pairs, sorted by key, to a segment at ``path``; returns how many."""
+    with SegmentWriter(path, **kwargs) as writer:
+        for key, value in records:
+            writer.add(key, value)
+    return writer.num_records
+
+
+class Segment:
+    """A segment file, mapped read-only, with its index in memory."""
+
+    def __init__(self, path: str, cached_blocks: int = DEFAULT_CACHED_BLOCKS):
+        self.path = path
+        self.cached_blocks = cached_blocks
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, codec_id, self.key_size, self.value_size, self.block_records,
+         self.num_records, num_blocks, index_offset) = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f'{path} is not a state store segment, bad magic {magic!r}')
+        if version != VERSION:
+            raise ValueError(f'unsupported segment version {version}, expected {VERSION}')
+        if codec_id not in _CODECS_BY_ID:
+            raise ValueError(f'unknown codec id {codec_id}')
+        self.codec = _CODECS_BY_ID[codec_id]
+        self.record_size = self.key_size + self.value_size
+        self._decompress = CODECS[self.codec][2]
+        self.num_blocks = num_blocks
+        # The index is kept as the file stores it, key_size + INDEX_ENTRY.size
+        # bytes per block, and searched in place
+        self._entry_size = self.key_size + INDEX_ENTRY.size
+        self._index = self._mmap[index_offset:index_offset + num_blocks * self._entry_size]
+        self._first_keys = _BlockKeys(self._index, self.key_size, self._entry_size)
+        self._cache: OrderedDict = OrderedDict()
+
+    def __enter__(self) -> 'Segment':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self._mmap is not None:
+            self._cache.clear()
+            self._mmap.close()
+            self._mmap = None
+
+    def __len__(self) -> int:
+        return self.num_records
+
+    def get(self, key: bytes) -> Optional[bytes]:
+        """The value stored for ``key``, None if it is not in the segment."""
+        i = bisect.bisect_right(self._first_keys, key) - 1
+        if i < 0:
+            return None
+        block = self._cache.get(i)
+        if block is None:
+            block = self._cache[i] = self._read_block(i)
+            if len(self._cache) > self.cached_blocks:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(i)
+        keys = _BlockKeys(block, self.key_size, self.record_size)
+        j = bisect.bisect_left(keys, key)
+        if j < len(keys) and keys[j] == key:
+            start = j * self.record_size + self.key_size
+            return block[start:start + self.value_size]
+        return None
+
+    def __iter__(self) -> Iterator[Tuple[bytes, bytes]]:
+        """Every ``(key, value)`` in key order, reading one block at a time."""
+        for i in range(self.num_blocks):
+            block = self._read_block(i)
+            for start in range(0, len(block), self.record_size):
+                yield block[start:start + self.key_size], block[start + self.key_size:start + self.record_size]
+
+    def _read_block(self, i: int) -> bytes:
+        offset, length, _ = INDEX_ENTRY.unpack_from(self._index, i * self._entry_size + self.key_size)
+        return self._decompress(self._mmap[offset:offset + length])
+
+
+class StateStore:
+    def __init__(
+            self,
+            directory: str,
+            key_size: int = STATE_BYTES,
+            value_size: int = 0,
+            codec: str = DEFAULT_CODEC,
+            block_records: int = DEFAULT_BLOCK_RECORDS,
+            buffer_records: int = DEFAULT_BUFFER_RECORDS,
+    ):
+        """Open the store in ``directory``, creating it if needed.
+
+        :param value_size: bytes stored with every key, 0 for a set of states
+        :param codec: compression of new segments; existing ones keep theirs
+        :param buffer_records: records added before they are written out as a segment
+        """
+        if codec not in CODECS:
+            raise ValueError(f'unknown codec {codec!r}, expected one of {sorted(CODECS)}')
+        self.directory = directory
+        self.key_size = key_size
+        self.value_size = value_size
+        self.codec = codec
+        self.block_records = block_records
+        self.buffer_records = buffer_records
+        os.makedirs(directory, exist_ok=True)
+        # Oldest first, as (generation, segment)
+        self._segments: List[Tuple[int, Segment]] = []
+        for name in sorted(os.listdir(directory)):
+            match = SEGMENT_PATTERN.match(name)
+            if match is None:
+                continue
+            segment = Segment(os.path.join(directory, name))
+            if (segment.key_size, segment.value_size) != (key_size, value_size):
+                segment.close()
+                raise ValueError(
+                    f'{name} holds {segment.key_size} byte keys and {segment.value_size} byte values, '
+                    f'expected {key_size} and {value_size}')
+            self._segments.append((int(match.group(1)), segment))
+        self._next_generation = self._segments[-1][0] + 1 if self._segments else 0
+        self._buffer: Dict[bytes, bytes] = {}
+        self._lock = threading.RLock()
+        self._compaction: Optional[threading.Thread] = None
+        self._compaction_error: Optional[BaseException] = None
+
+    def __enter__(self) -> 'StateStore':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Finish any compaction, write out buffered records and close every segment."""
+        self.wait()
+        self.flush()
+        with self._lock:
+            for _, segment in self._segments:
+                segment.close()
+            self._segments = []
+
+    @property
+    def num_segments(self) -> int:
+        return len(self._segments)
+
+    def add(self, key: bytes, value: bytes = b''):
+        if len(key) != self.key_size:
+            raise ValueError(f'expected a {self.key_size} byte key, got {len(key)} bytes')
+        if len(value) != self.value_size:
+            raise ValueError(f'expected a {self.value_size} byte value, got {len(value)} bytes')
+        with self._lock:
+            self._buffer[key] = value
+            if len(self._buffer) >= self.buffer_records:
+                self.flush()
+
+    def add_state(self, state: DeucesGameState, value: bytes = b''):
+        self.add(state.to_bytes(), value)
+
+    def flush(self):
+        """Write buffered records out as a new segment."""
+        with self._lock:
+            if not self._buffer:
+                return
+            generation = self._reserve_generation()
+            path = os.path.join(self.directory, segment_filename(generation))
+            write_segment(path, sorted(self._buffer.items()), **self._segment_options())
+            self._segments.append((generation, Segment(path)))
+            self._segments.sort(key=lambda s: s[0])
+            self._buffer = {}
+
+    def get(self, key: bytes) -> Optional[bytes]:
+        """The newest value stored for ``key``, None if it was never added."""
+        with self._lock:
+            value = self._buffer.get(key)
+            if value is not None:
+                return value
+            for _, segment in reversed(self._segments):
+                value = segment.get(key)
+                if value is not None:
+                    return value
+        return None
+
+    def __contains__(self, key: bytes) -> bool:
+        return self.get(key) is not None
+
+    def __iter__(self) -> Iterator[Tuple[bytes, bytes]]:
+        """Every stored ``(key, value)`` in key order, with only the newest value of each key.
+
+        Buffered records are not included; ``flush`` first to see them. The
+        store must not be compacted until the iteration is done.
+        """
+        with self._lock:
+            segments = list(self._segments)
+        return _merge_segments([s for _, s in segments])
+
+    def compact(self, background: bool = False):
+        """Merge every segment into one.
+
+        In the background, lookups and additions go on while the segments are
+        merged, and states added meanwhile go in newer segments; ``wait``
+        for the merge to finish.
+        """
+        self.wait()
+        with self._lock:
+            self.flush()
+            if len(self._segments) < 2:
+                return
+            merged = list(self._segments)
+            generation = self._reserve_generation()
+        if not background:
+            self._compact(merged, generation)
+            self.wait()
+            return
+        self._compaction = threading.Thread(
+            target=self._compact, args=(merged, generation), name='state-store-compaction', daemon=True)
+        self._compaction.start()
+
+    def wait(self):
+        """Wait for a background compaction to finish, raising what it raised."""
+        if self._compaction is not None:
+            self._compaction.join()
+            self._compaction = None
+        error, self._compaction_error = self._compaction_error, None
+        if error is not None:
+            raise error
+
+    def _compact(self, merged: List[Tuple[int, Segment]], generation: int):
+        try:
+            path = os.path.join(self.directory, segment_filename(generation))
+            write_segment(path, _merge_segments([s for _, s in merged]), **self._segment_options())
+            compacted = Segment(path)
+            with self._lock:
+                self._segments = sorted(
+                    [s for s in self._segments if s not in merged] + [(generation, compacted)], key=lambda s: s[0])
+                for _, segment in merged:
+                    segment.close()
+                    os.remove(segment.path)
+        except BaseException as e:
+            self._compaction_error = e
+
+    def _reserve_generation(self) -> int:
+        generation = self._next_generation
+        self._next_generation += 1
+        return generation
+
+    def _segment_options(self) -> dict:
+        return {
+            'key_size': self.key_size,
+            'value_size': self.value_size,
+            'codec': self.codec,
+            'block_records': self.block_records,
+        }
+
+
+def _merge_segments(segments: List[Segment]) -> Iterator[Tuple[bytes, bytes]]:
+    """Records of ``segments``, oldest first, in key order; a key's newest value wins."""
+    def aged(segment: Segment, age: int) -> Iterator[Tuple[bytes, int, bytes]]:
+        for key, value in segment:
+            yield key, age, value
+
+    previous = None
+    for key, _, value in heapq.merge(*(aged(s, age) for age, s in enumerate(reversed(segments)))):
+        if key != previous:
+            yield key, value
+            previous = key
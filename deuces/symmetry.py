@@ -0,0 +1,100 @@
+"""Suit-relabeling symmetries of hands and game states.
+
+Relabeling suits with a permutation keeps every combo's type, but suits
+break ties: singles, pairs and straights of equal rank compare the suit of
+their top card, and flushes compare suits first. A permutation therefore
+preserves every LogicalValidator outcome between moves that can still be
+made, as long as it keeps the order of
+  * the suits still in play at each rank, and
+  * the suits in which some hand (or the table) holds a flush.
+Cards only ever leave play, so a permutation that is valid for a state
+stays valid for every state reachable from it.
+
+The permutations valid for a state map it to a set of equivalent states,
+and that set is the same whichever of them we start from, so its smallest
+member is a canonical representative. ``tests/deuces/symmetry_test.py``
+checks that validator outcomes and legal moves are preserved.
+"""
+import itertools
+
+from typing import (
+    List,
+    Sequence,
+    Tuple,
+)
+
+from deuces import bitmask
+from deuces.game_state import DeucesGameState
+
+# SUIT_PERMUTATIONS[p][suit_ix] is the suit that suit_ix is relabeled to
+SUIT_PERMUTATIONS: List[Tuple[int, ...]] = list(itertools.permutations(range(bitmask.NUM_SUITS)))
+IDENTITY: int = 0
+
+_NUM_SUIT_SETS: int = 1 << bitmask.NUM_SUITS
+_RANK_SHIFTS = tuple(r * bitmask.NUM_SUITS for r in range(bitmask.NUM_RANKS))
+_SUIT_SET_MASK: int = _NUM_SUIT_SETS - 1
+
+
+def _permute_suit_set(permutation: Tuple[int, ...], suit_set: int) -> int:
+    return sum(1 << permutation[s] for s in range(bitmask.NUM_SUITS) if suit_set >> s & 1)
+
+
+def _preserves_order(permutation: Tuple[int, ...], suit_set: int) -> bool:
+    images = [permutation[s] for s in range(bitmask.NUM_SUITS) if suit_set >> s & 1]
+    return images == sorted(images)
+
+
+# The cards of one rank in a hand mask form a suit set, so each permutation
+# relabels a hand one rank at a time through a 16-entry table
+_SUIT_SET_TABLES: List[Tuple[int, ...]] = [
+    tuple(_permute_suit_set(p, x) for x in range(_NUM_SUIT_SETS)) for p in SUIT_PERMUTATIONS]
+# Bit x is set when the permutation keeps the order of the suits in suit set x
+_ORDER_PRESERVED: List[int] = [
+    sum(1 << x for x in range(_NUM_SUIT_SETS) if _preserves_order(p, x)) for p in SUIT_PERMUTATIONS]
+
+
+def permute_suits(mask: int, permutation_ix: int) -> int:
+    table = _SUIT_SET_TABLES[permutation_ix]
+    permuted = 0
+    for shift in _RANK_SHIFTS:
+        permuted |= table[(mask >> shift) & _SUIT_SET_MASK] << shift
+    return permuted
+
+
+def valid_suit_permutations(holders: Sequence[int]) -> List[int]:
+    """Indexes of the permutations that are symmetries given who holds which cards.
+
+    ``holders`` are the masks moves can be made from or must beat: each
+    player's hand and the table move.
+    """
+    in_play = 0
+    flush_suits = 0
+    for holder in holders:
+        in_play |= holder
+        for suit_ix, suit_mask in enumerate(bitmask.SUIT_MASKS):
+            if bitmask.popcount(holder & suit_mask) >= 5:
+                flush_suits |= 1 << suit_ix
+    # Suit sets whose order must be kept; sets of fewer than two suits have no order
+    constraints = 1 << flush_suits
+    for shift in _RANK_SHIFTS:
+        constraints |= 1 << ((in_play >> shift) & _SUIT_SET_MASK)
+    return [p for p, preserved in enumerate(_ORDER_PRESERVED) if not constraints & ~preserved]
+
+
+def canonical_hand(hand: int) -> int:
+    """Smallest mask equivalent to ``hand`` when it is the only cards in play."""
+    return min(permute_suits(hand, p) for p in valid_suit_permutations((hand,)))
+
+
+def canonical_state(state: DeucesGameState) -> DeucesGameState:
+    permutations = valid_suit_permutations((*state.hands, state.table))
+    if permutations == [IDENTITY]:
+        return DeucesGameState.from_key(state.key())
+    *hands, table = min(
+        tuple(permute_suits(m, p) for m in (*state.hands, state.table)) for p in permutations)
+    return DeucesGameState(hands, table, state.leader, state.passes, state.turn)
+
+
+def canonical_state_bytes(state: DeucesGameState) -> bytes:
+    """``canonical_state(state).to_bytes()``, usable as an Explorer canonical_key."""
+    return canonical_state(state).to_bytes()
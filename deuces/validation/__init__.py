@@ -1,3 +1,20 @@
-from .base_validator import BaseValidator
-from .logical_validator import LogicalValidator
-from .serial_validator import SerialValidator
+from typing import TYPE_CHECKING
+
+from cardgame.lazy import lazy_exports
+
+__all__ = ['BaseValidator', 'BatchValidator', 'CachingValidator', 'LogicalValidator', 'SerialValidator']
+# BatchValidator pulls in numpy, so none of these load until used
+__getattr__, __dir__ = lazy_exports(__name__, {
+    'BaseValidator': '.base_validator',
+    'BatchValidator': '.batch_validator',
+    'CachingValidator': '.caching_validator',
+    'LogicalValidator': '.logical_validator',
+    'SerialValidator': '.serial_validator',
+})
+
+if TYPE_CHECKING:
+    from .base_validator import BaseValidator
+    from .batch_validator import BatchValidator
+    from .caching_validator import CachingValidator
+    from .logical_validator import LogicalValidator
+    from .serial_validator import SerialValidator
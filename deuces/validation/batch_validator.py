@@ -0,0 +1,142 @@
+from abc import ABC
+from typing import (
+    Iterable,
+    Optional,
+    Tuple,
+    Union,
+)
+
+import numpy as np
+
+from deuces import (
+    DeucesCard,
+    bitmask,
+)
+from deuces.validation.base_validator import BaseValidator
+from deuces.validation.combos.five_card_table import (
+    BINOMIALS,
+    INVALID_STRENGTH,
+    strength_table,
+)
+
+# Fills the unused trailing slots of a move shorter than five cards
+PAD: int = -1
+MAX_MOVE_SIZE: int = 5
+
+Against = Union[None, int, Tuple[DeucesCard], np.ndarray]
+
+
+class BatchValidator(BaseValidator, ABC):
+    """Validates many moves per call.
+
+    Moves are rows of an N x 5 integer array of card ordinals, with PAD in
+    the slots a shorter move does not use. Each row is scored with a
+    single move strength that is 0 for an invalid move and otherwise
+    orders moves of the same size the way LogicalValidator does:
+      * singles and pairs by their highest card,
+      * triples and quads by their rank,
+      * five-card moves by their five_card_table strength.
+    """
+    _BINOMIALS: Optional[np.ndarray] = None
+    _STRENGTH_TABLE: Optional[np.ndarray] = None
+
+    @staticmethod
+    def is_valid_move(move: Tuple[DeucesCard], against: Optional[Tuple[DeucesCard]] = None) -> bool:
+        return bool(BatchValidator.are_valid_moves(BatchValidator.from_moves([move]), against)[0])
+
+    @staticmethod
+    def are_valid_moves(
+            moves: np.ndarray, against: Against = None, strength_table: Optional[np.ndarray] = None) -> np.ndarray:
+        """Boolean mask of the rows of ``moves`` that can be played on ``against``.
+
+        ``against`` is either one move, as a hand mask, a tuple of cards or a
+        row of ordinals, or an array with one row per move.
+        """
+        sizes, strengths = BatchValidator.move_sizes_and_strengths(moves, strength_table)
+        valid = strengths != INVALID_STRENGTH
+        if against is None:
+            return valid
+        against_sizes, against_strengths = BatchValidator.move_sizes_and_strengths(
+            BatchValidator._against_to_array(against), strength_table)
+        return valid & (sizes == against_sizes) & (against_strengths < strengths)
+
+    @staticmethod
+    def move_strengths(moves: np.ndarray, strength_table: Optional[np.ndarray] = None) -> np.ndarray:
+        return BatchValidator.move_sizes_and_strengths(moves, strength_table)[1]
+
+    @staticmethod
+    def move_sizes_and_strengths(
+            moves: np.ndarray, strength_table: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Size and strength of each row of ``moves``.
+
+        Five-card moves are looked up in ``strength_table``, indexed like
+        ``five_card_table.strength_table()``, which it is by default.
+        """
+        moves = np.asarray(moves)
+        if moves.ndim != 2 or moves.shape[1] != MAX_MOVE_SIZE:
+            raise ValueError(f'expected an N x {MAX_MOVE_SIZE} array of ordinals, got shape {moves.shape}')
+        if moves.size and moves.max() >= bitmask.NUM_CARDS:
+            raise ValueError(f'card ordinals must be less than {bitmask.NUM_CARDS}')
+
+        is_card = moves >= 0
+        sizes = is_card.sum(axis=1)
+        # Ascending ordinals with the padding moved to the end
+        sorted_moves = np.sort(np.where(is_card, moves, bitmask.NUM_CARDS).astype(np.int16), axis=1)
+        is_sorted_card = sorted_moves < bitmask.NUM_CARDS
+        has_duplicates = ((sorted_moves[:, 1:] == sorted_moves[:, :-1]) & is_sorted_card[:, 1:]).any(axis=1)
+
+        lowest = sorted_moves[:, 0]
+        highest = np.where(is_sorted_card, sorted_moves, -1).max(axis=1)
+        lowest_rank = lowest // bitmask.NUM_SUITS
+        highest_rank = highest // bitmask.NUM_SUITS
+        is_n_of_a_kind = lowest_rank == highest_rank
+
+        strengths = np.zeros(len(moves), dtype=np.int32)
+        strengths = np.where(sizes == 1, highest + 1, strengths)
+        strengths = np.where((sizes == 2) & is_n_of_a_kind, highest + 1, strengths)
+        strengths = np.where(((sizes == 3) | (sizes == 4)) & is_n_of_a_kind, highest_rank + 1, strengths)
+
+        is_five_card = (sizes == MAX_MOVE_SIZE) & ~has_duplicates
+        if is_five_card.any():
+            five_card_moves = sorted_moves[is_five_card].astype(np.intp)
+            binomials = BatchValidator._binomials()
+            ixs = sum(binomials[k + 1][five_card_moves[:, k]] for k in range(MAX_MOVE_SIZE))
+            if strength_table is None:
+                strength_table = BatchValidator._strength_table()
+            strengths[is_five_card] = strength_table[ixs]
+
+        strengths[has_duplicates] = INVALID_STRENGTH
+        return sizes, strengths
+
+    @staticmethod
+    def from_moves(moves: Iterable[Tuple[DeucesCard]]) -> np.ndarray:
+        rows = [[c.value for c in move] for move in moves]
+        array = np.full((len(rows), MAX_MOVE_SIZE), PAD, dtype=np.int8)
+        for i, row in enumerate(rows):
+            array[i, :len(row)] = row
+        return array
+
+    @staticmethod
+    def from_masks(masks: Iterable[int]) -> np.ndarray:
+        return BatchValidator.from_moves(DeucesCard.from_mask(m) for m in masks)
+
+    @staticmethod
+    def _against_to_array(against: Against) -> np.ndarray:
+        if isinstance(against, int):
+            return BatchValidator.from_masks([against])
+        if isinstance(against, tuple):
+            return BatchValidator.from_moves([against])
+        against = np.asarray(against)
+        return against.reshape(1, -1) if against.ndim == 1 else against
+
+    @staticmethod
+    def _binomials() -> np.ndarray:
+        if BatchValidator._BINOMIALS is None:
+            BatchValidator._BINOMIALS = np.array(BINOMIALS, dtype=np.int64)
+        return BatchValidator._BINOMIALS
+
+    @staticmethod
+    def _strength_table() -> np.ndarray:
+        if BatchValidator._STRENGTH_TABLE is None:
+            BatchValidator._STRENGTH_TABLE = np.frombuffer(strength_table(), dtype=np.uint16)
+        return BatchValidator._STRENGTH_TABLE
@@ -0,0 +1,87 @@
+from collections import OrderedDict
+from typing import (
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+from deuces import (
+    DeucesCard,
+    bitmask,
+)
+from deuces.validation.base_validator import BaseValidator
+from deuces.validation.logical_validator import LogicalValidator
+
+DEFAULT_MAX_SIZE: int = 1 << 16
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    max_size: int
+    size: int
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+def cache_key(move: int, against: Optional[int] = None) -> int:
+    """One integer for a (move, against) pair of hand masks.
+
+    The move takes the low 52 bits and ``against + 1`` the bits above, so
+    leading (``against`` None) never collides with beating a move.
+    """
+    return move if against is None else (against + 1) << bitmask.NUM_CARDS | move
+
+
+class CachingValidator(BaseValidator):
+    """LogicalValidator results for the most recently used (move, against) pairs.
+
+    Unlike the other validators it is instantiated, so every cache has its own
+    size bound and counters. Lookups move an entry to the back of the LRU
+    order, and inserting past ``max_size`` evicts from the front. Not thread
+    safe; give each thread its own.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE):
+        if max_size < 1:
+            raise ValueError(f'max_size must be positive, got {max_size}')
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._cache: 'OrderedDict[int, bool]' = OrderedDict()
+
+    def is_valid_move(self, move: Tuple[DeucesCard], against: Optional[Tuple[DeucesCard]] = None) -> bool:
+        if len(move) != len(set(move)):
+            return False
+        return self.is_valid_mask(
+            DeucesCard.to_mask(move),
+            None if against is None else DeucesCard.to_mask(against),
+        )
+
+    def is_valid_mask(self, move: int, against: Optional[int] = None) -> bool:
+        key = cache_key(move, against)
+        cache = self._cache
+        valid = cache.get(key)
+        if valid is not None:
+            self.hits += 1
+            cache.move_to_end(key)
+            return valid
+        self.misses += 1
+        valid = cache[key] = LogicalValidator.is_valid_mask(move, against)
+        if len(cache) > self.max_size:
+            cache.popitem(last=False)
+            self.evictions += 1
+        return valid
+
+    def cache_info(self) -> CacheInfo:
+        return CacheInfo(self.hits, self.misses, self.evictions, self.max_size, len(self._cache))
+
+    def cache_clear(self):
+        """Empty the cache and reset the counters."""
+        self._cache.clear()
+        self.hits = self.misses = self.evictions = 0
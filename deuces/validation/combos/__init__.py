@@ -1,12 +1,36 @@
-from .combo_type import ComboType
-from .five_card import (
-    FiveCard,
-    Flush,
-    FourOfAKind,
-    FullHouse,
-    InvalidFiveCard,
-    Straight,
-    StraightFlush,
-    FIVE_CARD_COMBO_ORDER,
-    FIVE_CARD_COMBO_TO_ORDER,
-)
+from typing import TYPE_CHECKING
+
+from cardgame.lazy import lazy_exports
+
+__all__ = [
+    'ComboType',
+    'FiveCard',
+    'Flush',
+    'FourOfAKind',
+    'FullHouse',
+    'InvalidFiveCard',
+    'Straight',
+    'StraightFlush',
+    'FIVE_CARD_COMBO_ORDER',
+    'FIVE_CARD_COMBO_TO_ORDER',
+    'STRENGTH_KEY',
+    'VALID_STRAIGHTS_BY_RANK_IXS',
+]
+__getattr__, __dir__ = lazy_exports(__name__, dict(
+    [('ComboType', '.combo_type')] + [(name, '.five_card') for name in __all__[1:]]))
+
+if TYPE_CHECKING:
+    from .combo_type import ComboType
+    from .five_card import (
+        FiveCard,
+        Flush,
+        FourOfAKind,
+        FullHouse,
+        InvalidFiveCard,
+        Straight,
+        StraightFlush,
+        FIVE_CARD_COMBO_ORDER,
+        FIVE_CARD_COMBO_TO_ORDER,
+        STRENGTH_KEY,
+        VALID_STRAIGHTS_BY_RANK_IXS,
+    )
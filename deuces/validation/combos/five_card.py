@@ -1,7 +1,13 @@
-import functools
+import operator
 
 from collections import defaultdict
+from dataclasses import (
+    dataclass,
+    fields,
+)
 from typing import (
+    Callable,
+    ClassVar,
     Dict,
     List,
     Optional,
@@ -9,14 +15,55 @@ from typing import (
 )
 
 from cardgame.card import (Rank, Suit)
-from deuces import DeucesCard
-from deuces.validation.combos import ComboType
+from deuces import (
+    DeucesCard,
+    bitmask,
+    instrumentation,
+)
+from deuces.validation.combos.combo_type import ComboType
+
+# Tie-break field names of each combo class, filled in on first construction
+_FIELD_NAMES: Dict[type, Tuple[str, ...]] = {}
 
 
 class FiveCard(ComboType):
+    """A five-card combo, ordered, compared and hashed by its ``strength``.
+
+    Combos are immutable, and ``strength`` is computed once on construction
+    and kept as a plain attribute, so ``sorted(combos, key=STRENGTH_KEY)``
+    and ``bisect`` over strengths run without calling back into Python.
+    """
+    # Each tie-break field of a combo packs into this many bits of its strength
+    STRENGTH_FIELD_BITS: ClassVar[int] = 4
+    STRENGTH_NUM_FIELDS: ClassVar[int] = 2
+
+    # Integer that orders combos the way Deuces does; 0 for an InvalidFiveCard.
+    # The combo type is the most significant part, followed by the dataclass
+    # fields in declaration order, which is their tie-break order.
+    strength: int
+
+    def __post_init__(self):
+        cls = self.__class__
+        field_names = _FIELD_NAMES.get(cls)
+        if field_names is None:
+            field_names = _FIELD_NAMES[cls] = tuple(f.name for f in fields(cls))
+        strength = FIVE_CARD_COMBO_TO_ORDER[cls]
+        for name in field_names:
+            strength = (strength << FiveCard.STRENGTH_FIELD_BITS) | getattr(self, name)
+        strength <<= FiveCard.STRENGTH_FIELD_BITS * (FiveCard.STRENGTH_NUM_FIELDS - len(field_names))
+        # The dataclasses are frozen, so set it the way their __init__ sets fields
+        object.__setattr__(self, 'strength', strength)
+
     @classmethod
-    # @functools.lru_cache()
     def from_hand(cls, cards: Tuple[DeucesCard]):
+        started = instrumentation.start('five_card.from_hand') if instrumentation.ENABLED else None
+        combo = cls.from_mask(DeucesCard.to_mask(cards))
+        if started is not None:
+            instrumentation.stop('five_card.from_hand', started)
+        return combo
+
+    @classmethod
+    def from_mask(cls, mask: int):
         # Straight
         #   Five consecutive cards
         #   Straight ending on Ace is highest
@@ -31,64 +78,90 @@ class FiveCard(ComboType):
         #   Five consecutive cards of the same suit
         #   Royal Flush is a Straight Flush that ends on an Ace
 
-        sorted_cards = list(sorted(cards, key=lambda c: c.value))
-        unique_ranks = set(c.rank for c in cards)
+        if bitmask.popcount(mask) != 5:
+            return InvalidFiveCard()
+        sorted_ordinals = bitmask.ordinals(mask)
+        sorted_rank_ixs = [bitmask.rank_of(o) for o in sorted_ordinals]
+        num_unique_ranks = len(set(sorted_rank_ixs))
 
-        if len(unique_ranks) == 2:
+        if num_unique_ranks == 2:
             # Get middle card of a sorted combo
             # e.g. 7 is always the majority card when there are two unique ranks
             # 3 3 [7] 7 7 - Full House on 7
             # 3 7 [7] 7 7 - Four of a Kind on 7
             # 7 7 [7] 7 K - Four of a Kind on 7
             # 7 7 [7] K K - Full House on 7
-            majority_card_rank_ix = DeucesCard.RANK_TO_ORDER[sorted_cards[2].rank]
+            majority_card_rank_ix = sorted_rank_ixs[2]
             # Four of a Kind
-            if sorted_cards[1] == sorted_cards[2] == sorted_cards[3]:
+            if sorted_rank_ixs[0] == sorted_rank_ixs[3] or sorted_rank_ixs[1] == sorted_rank_ixs[4]:
                 return FourOfAKind(rank_ix=majority_card_rank_ix)
             # Full House
             else:
                 return FullHouse(rank_ix=majority_card_rank_ix)
-        elif len(unique_ranks) == 5:
-            is_flush = (cards[0] == cards[1] == cards[2] == cards[3] == cards[4])
-            straight = (StraightFlush if is_flush else Straight).from_sorted_cards(sorted_cards)
+        elif num_unique_ranks == 5:
+            suit_ix = bitmask.suit_of(sorted_ordinals[-1])
+            is_flush = mask & bitmask.SUIT_MASKS[suit_ix] == mask
+            straight = (StraightFlush if is_flush else Straight).from_sorted_ordinals(sorted_ordinals)
             if straight:
                 return straight
             elif is_flush:
                 return Flush(
-                    suit_ix=DeucesCard.SUIT_TO_ORDER[sorted_cards[-1].suit],
-                    end_rank_ix=DeucesCard.RANK_TO_ORDER[sorted_cards[-1].rank],
+                    suit_ix=suit_ix,
+                    end_rank_ix=sorted_rank_ixs[-1],
                 )
             else:
                 return InvalidFiveCard()
         else:
             return InvalidFiveCard()
 
+    # Straight
+    #   Compare rank of ending card
+    #   Ties compare suit
+    # Flush
+    #   Compare suit
+    #   Ties compare rank of the highest card
+    # Full House
+    #   Compare rank of the three-of-a-kind
+    # Four of a Kind
+    #   Compare rank of the four-of-a-kind
+    # Straight Flush / Royal Flush
+    #   See Straight comparisons
+    # Any combo beats every combo of a lower type (FIVE_CARD_COMBO_ORDER)
+    def __eq__(self, other):
+        if not isinstance(other, FiveCard):
+            return NotImplemented
+        return self.strength == other.strength
+
+    def __hash__(self):
+        return hash(self.strength)
+
     def __lt__(self, other):
-        # Straight
-        #   Compare rank of ending card
-        #   Ties compare suit
-        # Flush
-        #   Compare rank of cards unless all cards are equal ranked
-        #   Ties compare suit
-        # Full House
-        #   Compare rank of the three-of-a-kind
-        # Four of a Kind
-        #   Compare rank of the four-of-a-kind
-        # Straight Flush / Royal Flush
-        #   See Straight comparisons
-        self_combo_ix = FIVE_CARD_COMBO_TO_ORDER[self.__class__]
-        other_combo_ix = FIVE_CARD_COMBO_TO_ORDER[other.__class__]
-        if self_combo_ix != other_combo_ix:
-            return self_combo_ix < other_combo_ix
-        # Dataclasses are constructed so that when compared against themselves,
-        #   they will properly order themselves.
-        return self < other
+        if not isinstance(other, FiveCard):
+            return NotImplemented
+        return self.strength < other.strength
+
+    def __le__(self, other):
+        if not isinstance(other, FiveCard):
+            return NotImplemented
+        return self.strength <= other.strength
 
+    def __gt__(self, other):
+        if not isinstance(other, FiveCard):
+            return NotImplemented
+        return self.strength > other.strength
 
+    def __ge__(self, other):
+        if not isinstance(other, FiveCard):
+            return NotImplemented
+        return self.strength >= other.strength
+
+
+@dataclass(frozen=True, eq=False)
 class InvalidFiveCard(FiveCard):
     pass
 
 
+@dataclass(frozen=True, eq=False)
 class Straight(FiveCard):
     # Compare the end card's rank
     end_rank_ix: int
@@ -101,7 +174,7 @@ class Straight(FiveCard):
     # LEGAL:   0  1  2  11 12 - ends on a Rank.FIVE (2)
     # LEGAL:   0  1  2  3  12 - ends on a Rank.SIX (3)
     # LEGAL:   0  1  2  3  4  - ends on a Rank.SEVEN (4)
-    VALID_STRAIGHTS_TO_END_RANK: Dict[str, Rank] = {
+    VALID_STRAIGHTS_TO_END_RANK: ClassVar[Dict[str, Rank]] = {
         '3 4 5 A 2': Rank.FIVE,
         '3 4 5 6 2': Rank.SIX,
         '3 4 5 6 7': Rank.SEVEN,
@@ -113,7 +186,7 @@ class Straight(FiveCard):
         '9 T J Q K': Rank.KING,
         'T J Q K A': Rank.ACE
     }
-    VALID_STRAIGHTS_TO_END_RANK_POS: Dict[str, int] = {
+    VALID_STRAIGHTS_TO_END_RANK_POS: ClassVar[Dict[str, int]] = {
         '3 4 5 A 2': 2,
         '3 4 5 6 2': 3,
         '3 4 5 6 7': 4,
@@ -125,6 +198,11 @@ class Straight(FiveCard):
         '9 T J Q K': 4,
         'T J Q K A': 4,
     }
+    # Same as above, keyed by the bitmask.rank_set of the straight
+    VALID_STRAIGHT_RANK_SETS_TO_END_RANK_POS: ClassVar[Dict[int, int]] = dict(
+        (sum(1 << DeucesCard.RANK_TO_ORDER[Rank(r)] for r in straight.split()), pos)
+        for straight, pos in VALID_STRAIGHTS_TO_END_RANK_POS.items()
+    )
 
     @classmethod
     def from_sorted_cards(cls, sorted_cards: Tuple[DeucesCard]) -> Optional:
@@ -139,7 +217,23 @@ class Straight(FiveCard):
         else:
             return None
 
+    @classmethod
+    def from_sorted_ordinals(cls, sorted_ordinals: List[int]) -> Optional:
+        rank_set = 0
+        for o in sorted_ordinals:
+            rank_set |= 1 << bitmask.rank_of(o)
+        end_rank_pos = Straight.VALID_STRAIGHT_RANK_SETS_TO_END_RANK_POS.get(rank_set)
+        if end_rank_pos:
+            end_ordinal = sorted_ordinals[end_rank_pos]
+            return cls(
+                end_rank_ix=bitmask.rank_of(end_ordinal),
+                end_rank_suit_ix=bitmask.suit_of(end_ordinal),
+            )
+        else:
+            return None
+
 
+@dataclass(frozen=True, eq=False)
 class Flush(FiveCard):
     # Compare the suit
     suit_ix: int
@@ -147,16 +241,19 @@ class Flush(FiveCard):
     end_rank_ix: int
 
 
+@dataclass(frozen=True, eq=False)
 class FullHouse(FiveCard):
     # Compare the three-of-a-kind's rank
     rank_ix: int
 
 
+@dataclass(frozen=True, eq=False)
 class FourOfAKind(FiveCard):
     # Compare the four-of-a-kind's rank
     rank_ix: int
 
 
+@dataclass(frozen=True, eq=False)
 class StraightFlush(Straight):
     pass
 
@@ -164,3 +261,19 @@ class StraightFlush(Straight):
 FIVE_CARD_COMBO_ORDER: List[FiveCard] = [InvalidFiveCard, Straight, Flush, FullHouse, FourOfAKind, StraightFlush]
 FIVE_CARD_COMBO_TO_ORDER: Dict[FiveCard, int] = dict((f, i) for i, f in enumerate(FIVE_CARD_COMBO_ORDER))
 
+# Sort key for FiveCards, weakest first
+STRENGTH_KEY: Callable[[FiveCard], int] = operator.attrgetter('strength')
+
+# Rank ixs of every straight, lowest first, in the order their cards sort
+VALID_STRAIGHTS_BY_RANK_IXS: List[Tuple[int, ...]] = [
+    (0, 1, 2, 11, 12),
+    (0, 1, 2, 3, 12),
+    (0, 1, 2, 3, 4),
+    (1, 2, 3, 4, 5),
+    (2, 3, 4, 5, 6),
+    (3, 4, 5, 6, 7),
+    (4, 5, 6, 7, 8),
+    (5, 6, 7, 8, 9),
+    (6, 7, 8, 9, 10),
+    (7, 8, 9, 10, 11),
+]
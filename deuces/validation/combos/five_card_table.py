@@ -0,0 +1,98 @@
+"""Precomputed strengths for every five-card hand.
+
+Only ~20k of the C(52, 5) = 2,598,960 five-card hands are valid combos, so
+the tables are built at first use by classifying just the candidate hands
+(straights, flushes and two-rank hands) with ``FiveCard.from_mask``.
+Everything else keeps the ``INVALID_STRENGTH`` sentinel, which is
+``InvalidFiveCard().strength``.
+
+Two views of the same data are kept:
+  * a dict from hand mask to strength, for scalar lookups, and
+  * an array indexed by the combinatorial (colex) index of the hand's sorted
+    ordinals, covering all C(52, 5) hands, for vectorized lookups.
+"""
+import itertools
+
+from array import array
+from math import comb
+from typing import (
+    Dict,
+    Iterable,
+    Optional,
+    Sequence,
+)
+
+from deuces import bitmask
+from deuces.validation.combos.five_card import (
+    FiveCard,
+    Straight,
+)
+
+INVALID_STRENGTH: int = 0
+NUM_FIVE_CARD_HANDS: int = comb(bitmask.NUM_CARDS, 5)
+# BINOMIALS[k][n] == comb(n, k), for the colex index of a sorted hand
+BINOMIALS = tuple(
+    tuple(comb(n, k) for n in range(bitmask.NUM_CARDS)) for k in range(6))
+
+_STRENGTH_BY_MASK: Optional[Dict[int, int]] = None
+_STRENGTH_TABLE: Optional[array] = None
+
+
+def five_card_strength(mask: int) -> int:
+    """Strength of the five-card hand ``mask``, INVALID_STRENGTH if it is not a combo."""
+    return (_STRENGTH_BY_MASK or strength_by_mask()).get(mask, INVALID_STRENGTH)
+
+
+def five_card_index(sorted_ordinals: Sequence[int]) -> int:
+    """Position of a hand, given as five ascending ordinals, in ``strength_table()``."""
+    return (
+        BINOMIALS[1][sorted_ordinals[0]] +
+        BINOMIALS[2][sorted_ordinals[1]] +
+        BINOMIALS[3][sorted_ordinals[2]] +
+        BINOMIALS[4][sorted_ordinals[3]] +
+        BINOMIALS[5][sorted_ordinals[4]]
+    )
+
+
+def strength_by_mask() -> Dict[int, int]:
+    """Strength of every valid five-card combo, keyed by hand mask."""
+    global _STRENGTH_BY_MASK
+    if _STRENGTH_BY_MASK is None:
+        strengths = {}
+        for mask in _candidate_masks():
+            strength = FiveCard.from_mask(mask).strength
+            if strength != INVALID_STRENGTH:
+                strengths[mask] = strength
+        _STRENGTH_BY_MASK = strengths
+    return _STRENGTH_BY_MASK
+
+
+def strength_table() -> array:
+    """Unsigned 16-bit strength of all C(52, 5) hands, indexed by ``five_card_index``."""
+    global _STRENGTH_TABLE
+    if _STRENGTH_TABLE is None:
+        table = array('H', bytes(NUM_FIVE_CARD_HANDS * array('H').itemsize))
+        for mask, strength in strength_by_mask().items():
+            table[five_card_index(bitmask.ordinals(mask))] = strength
+        _STRENGTH_TABLE = table
+    return _STRENGTH_TABLE
+
+
+def _candidate_masks() -> Iterable[int]:
+    # Straights and straight flushes
+    for rank_set in Straight.VALID_STRAIGHT_RANK_SETS_TO_END_RANK_POS:
+        rank_ixs = [r for r in range(bitmask.NUM_RANKS) if rank_set >> r & 1]
+        for suit_ixs in itertools.product(range(bitmask.NUM_SUITS), repeat=5):
+            yield bitmask.to_mask(bitmask.ordinal_of(r, s) for r, s in zip(rank_ixs, suit_ixs))
+    # Flushes
+    for suit_ix in range(bitmask.NUM_SUITS):
+        for rank_ixs in itertools.combinations(range(bitmask.NUM_RANKS), 5):
+            yield bitmask.to_mask(bitmask.ordinal_of(r, suit_ix) for r in rank_ixs)
+    # Full houses and four of a kinds
+    for major_rank_ix, minor_rank_ix in itertools.permutations(range(bitmask.NUM_RANKS), 2):
+        major_cards = bitmask.ordinals(bitmask.RANK_MASKS[major_rank_ix])
+        minor_cards = bitmask.ordinals(bitmask.RANK_MASKS[minor_rank_ix])
+        for num_major in (3, 4):
+            for major in itertools.combinations(major_cards, num_major):
+                for minor in itertools.combinations(minor_cards, 5 - num_major):
+                    yield bitmask.to_mask(major + minor)
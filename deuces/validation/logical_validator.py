@@ -6,26 +6,67 @@ from typing import (
     Tuple,
 )
 
-import deuces.validation as validation
-from deuces import DeucesCard
+from deuces import (
+    DeucesCard,
+    bitmask,
+    instrumentation,
+)
+from deuces.validation.base_validator import BaseValidator
+from deuces.validation.combos.five_card_table import (
+    INVALID_STRENGTH,
+    five_card_strength,
+)
 
-MoveValidator = Callable[[Tuple[DeucesCard], Optional[Tuple[DeucesCard]]], bool]
+MaskValidator = Callable[[int, Optional[int]], bool]
 
 
-class LogicalValidator(validation.BaseValidator, ABC):
-    _MOVE_VALIDATOR_FACTORY: Optional[Dict[int, MoveValidator]] = None
+class LogicalValidator(BaseValidator, ABC):
+    _MOVE_VALIDATOR_FACTORY: Optional[Dict[int, MaskValidator]] = None
 
     @staticmethod
     def is_valid_move(move: Tuple[DeucesCard], against: Optional[Tuple[DeucesCard]] = None) -> bool:
-        move_size: int = len(move)
-        if not (1 <= move_size <= 5):
-            return False
-        if against is not None and move_size != len(against):
+        if len(move) != len(set(move)):
             return False
-        return LogicalValidator._move_validator_factory(move_size)(move, against)
+        return LogicalValidator.is_valid_mask(
+            DeucesCard.to_mask(move),
+            None if against is None else DeucesCard.to_mask(against),
+        )
+
+    @staticmethod
+    def is_valid_mask(move: int, against: Optional[int] = None) -> bool:
+        started = instrumentation.start('logical_validator.is_valid_mask') if instrumentation.ENABLED else None
+        try:
+            move_size: int = bitmask.popcount(move)
+            if not (1 <= move_size <= 5):
+                return False
+            if against is not None and move_size != bitmask.popcount(against):
+                return False
+            return LogicalValidator._move_validator_factory(move_size)(move, against)
+        finally:
+            if started is not None:
+                instrumentation.stop('logical_validator.is_valid_mask', started)
 
     @staticmethod
-    def _move_validator_factory(move_size: int) -> Dict[int, MoveValidator]:
+    def move_strength(move: int) -> int:
+        """Strength of ``move`` as BatchValidator scores it, 0 if it is not a valid move.
+
+        A move beats any move of the same size with a lower strength.
+        """
+        move_size: int = bitmask.popcount(move)
+        if move_size == 1:
+            return bitmask.highest(move) + 1
+        if 2 <= move_size <= 4:
+            if not LogicalValidator._is_n_of_a_kind(move):
+                return INVALID_STRENGTH
+            if move_size == 2:
+                return bitmask.highest(move) + 1
+            return bitmask.rank_of(bitmask.highest(move)) + 1
+        if move_size == 5:
+            return five_card_strength(move)
+        return INVALID_STRENGTH
+
+    @staticmethod
+    def _move_validator_factory(move_size: int) -> MaskValidator:
         if LogicalValidator._MOVE_VALIDATOR_FACTORY is None:
             LogicalValidator._MOVE_VALIDATOR_FACTORY = {
                 1: LogicalValidator._validate_one_card_move,
@@ -37,41 +78,39 @@ class LogicalValidator(validation.BaseValidator, ABC):
         return LogicalValidator._MOVE_VALIDATOR_FACTORY[move_size]
 
     @staticmethod
-    def _validate_one_card_move(move: Tuple[DeucesCard], against: Optional[Tuple[DeucesCard]] = None) -> bool:
+    def _validate_one_card_move(move: int, against: Optional[int] = None) -> bool:
         if against is None:
             return True
-        return against[0] < move[0]
+        # Single bits order the same way their ordinals do
+        return against < move
 
     @staticmethod
-    def _validate_two_card_move(move: Tuple[DeucesCard], against: Optional[Tuple[DeucesCard]] = None) -> bool:
+    def _validate_two_card_move(move: int, against: Optional[int] = None) -> bool:
+        if not LogicalValidator._is_n_of_a_kind(move):
+            return False
         if against is None:
-            return move[0].rank == move[1].rank
-        return (
-            move[0].rank == move[1].rank and
-            max(c.value for c in against) < max(c.value for c in move)
-        )
+            return True
+        return bitmask.highest(against) < bitmask.highest(move)
 
     @staticmethod
-    def _validate_three_card_move(move: Tuple[DeucesCard], against: Optional[Tuple[DeucesCard]] = None) -> bool:
+    def _validate_three_card_move(move: int, against: Optional[int] = None) -> bool:
+        if not LogicalValidator._is_n_of_a_kind(move):
+            return False
         if against is None:
-            return move[0].rank == move[1].rank == move[2].rank
-        return (
-            move[0].rank == move[1].rank == move[2].rank and
-            against[0].rank < move[0].rank
-        )
+            return True
+        return bitmask.rank_of(bitmask.highest(against)) < bitmask.rank_of(bitmask.highest(move))
 
     @staticmethod
-    def _validate_four_card_move(move: Tuple[DeucesCard], against: Optional[Tuple[DeucesCard]] = None) -> bool:
-        if against is None:
-            return move[0].rank == move[1].rank == move[2].rank == move[3].rank
-        return (
-            move[0].rank == move[1].rank == move[2].rank == move[3].rank and
-            against[0].rank < move[0].rank
-        )
+    def _validate_four_card_move(move: int, against: Optional[int] = None) -> bool:
+        return LogicalValidator._validate_three_card_move(move, against)
 
     @staticmethod
-    def _validate_five_card_move(move: Tuple[DeucesCard], against: Optional[Tuple[DeucesCard]] = None) -> bool:
-        move_type = validation.combos.FiveCard.from_hand(move)
+    def _validate_five_card_move(move: int, against: Optional[int] = None) -> bool:
+        move_strength = five_card_strength(move)
         if against is None:
-            return not isinstance(move_type, validation.combos.InvalidFiveCardCombo)
-        return validation.combos.FiveCard.from_hand(against) < move_type
+            return move_strength != INVALID_STRENGTH
+        return five_card_strength(against) < move_strength
+
+    @staticmethod
+    def _is_n_of_a_kind(move: int) -> bool:
+        return move & bitmask.RANK_MASKS[bitmask.rank_of(bitmask.highest(move))] == move
@@ -7,7 +7,7 @@ from typing import (
 )
 
 from deuces import DeucesCard
-from deuces.validation import BaseValidator
+from deuces.validation.base_validator import BaseValidator
 
 MoveValidator = Callable[[Tuple[DeucesCard], Optional[Tuple[DeucesCard]]], bool]
 
@@ -0,0 +1,49 @@
+import sys
+import types
+import unittest
+
+import cardgame
+
+from cardgame.lazy import lazy_exports
+
+
+class LazyExportsTest(unittest.TestCase):
+    def setUp(self):
+        self.package = types.ModuleType('lazy_test_package')
+        sys.modules[self.package.__name__] = self.package
+        self.addCleanup(sys.modules.pop, self.package.__name__)
+        self.package.__getattr__, self.package.__dir__ = lazy_exports(self.package.__name__, {
+            'Card': 'cardgame.card',
+            'Deck': 'cardgame.deck',
+        })
+
+    def test_exports_resolve_on_first_use(self):
+        from cardgame.card import Card
+        self.assertNotIn('Card', vars(self.package))
+        self.assertIs(self.package.Card, Card)
+        # Cached on the module, so __getattr__ is not called again
+        self.assertIs(vars(self.package)['Card'], Card)
+
+    def test_unknown_names_raise_attribute_error(self):
+        with self.assertRaises(AttributeError):
+            self.package.Hand
+        self.assertFalse(hasattr(self.package, 'Hand'))
+
+    def test_dir_lists_exports(self):
+        self.assertIn('Deck', dir(self.package))
+        self.assertIn('GameState', dir(cardgame))
+
+    def test_package_exports(self):
+        from cardgame import (
+            Card,
+            Deck,
+            GameState,
+        )
+        from cardgame.card import Card as card_module_card
+        self.assertIs(Card, card_module_card)
+        self.assertTrue(issubclass(Deck, set))
+        self.assertEqual(GameState.__name__, 'GameState')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+
+from cardgame.card import Rank, Suit
+from deuces import DeucesCard, bitmask
+
+
+class BitmaskTest(unittest.TestCase):
+    def test_ordinals_round_trip(self):
+        mask = bitmask.to_mask([0, 5, 51])
+        self.assertEqual(bitmask.ordinals(mask), [0, 5, 51])
+        self.assertEqual(bitmask.popcount(mask), 3)
+        self.assertEqual(bitmask.highest(mask), 51)
+        self.assertEqual(bitmask.lowest(mask), 0)
+
+    def test_rank_and_suit_masks_partition_the_deck(self):
+        self.assertEqual(sum(bitmask.RANK_MASKS), bitmask.FULL_DECK_MASK)
+        self.assertEqual(sum(bitmask.SUIT_MASKS), bitmask.FULL_DECK_MASK)
+
+    def test_rank_counts(self):
+        mask = bitmask.to_mask([0, 1, 2, 50])
+        counts = bitmask.rank_counts(mask)
+        self.assertEqual(counts[0], 3)
+        self.assertEqual(counts[12], 1)
+        self.assertEqual(bitmask.rank_set(mask), 1 | (1 << 12))
+
+
+class DeucesCardTest(unittest.TestCase):
+    def test_value_matches_rank_and_suit_order(self):
+        for value, card in enumerate(DeucesCard.CARDS):
+            self.assertEqual(card.value, value)
+            self.assertEqual(DeucesCard(card.rank, card.suit), card)
+
+    def test_ordering_and_hashing(self):
+        three_of_spades = DeucesCard(Rank.THREE, Suit.SPADES)
+        four_of_diamonds = DeucesCard(Rank.FOUR, Suit.DIAMONDS)
+        self.assertLess(three_of_spades, four_of_diamonds)
+        self.assertEqual(len({three_of_spades, DeucesCard.from_value(3)}), 1)
+
+    def test_mask_round_trip(self):
+        cards = (DeucesCard.CARDS[4], DeucesCard.CARDS[9], DeucesCard.CARDS[50])
+        self.assertEqual(DeucesCard.from_mask(DeucesCard.to_mask(cards)), cards)
+
+
+if __name__ == '__main__':
+    unittest.main()
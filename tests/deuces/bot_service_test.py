@@ -0,0 +1,141 @@
+import asyncio
+import json
+import random
+import unittest
+
+from deuces import bitmask
+from deuces.bot_service import (
+    BotService,
+    MoveChooser,
+    ServiceOverloaded,
+    handle_connection,
+    state_from_request,
+)
+from deuces.game_state import (
+    OPENING_CARD_MASK,
+    PASS,
+    DeucesGameState,
+)
+from deuces.hand_moves import moves_from_hand
+from deuces.move_index import MoveIndex
+from deuces.validation import LogicalValidator
+from tests.deuces.game_state_test import random_deal
+
+
+def random_states(rng, count):
+    """Mid-game states, half of them with a move to beat on the table."""
+    states = []
+    for _ in range(count):
+        state = DeucesGameState.deal(random_deal(rng))
+        for _ in range(rng.randrange(12)):
+            if state.is_over:
+                break
+            state.apply_move(rng.choice(list(state.legal_moves())))
+        if not state.is_over:
+            states.append(state)
+    return states
+
+
+class BotServiceTest(unittest.IsolatedAsyncioTestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.index = MoveIndex.load()
+
+    async def test_decides_batches_of_states(self):
+        states = random_states(random.Random(0), 100)
+        async with BotService(self.index, max_batch_size=16, max_latency=0.05) as service:
+            moves = await asyncio.gather(*(service.decide(s) for s in states))
+        self.assertEqual(service.stats.requests, len(states))
+        self.assertLess(service.stats.batches, len(states) // 4)
+        for state, move in zip(states, moves):
+            self.assertTrue(state.is_legal_move(move))
+            if state.table == PASS:
+                continue
+            replies = list(moves_from_hand(state.hands[state.turn], state.table))
+            if not replies:
+                self.assertEqual(move, PASS)
+            else:
+                weakest = min(LogicalValidator.move_strength(m) for m in replies)
+                self.assertEqual(LogicalValidator.move_strength(move), weakest)
+
+    async def test_opening_lead_holds_the_three_of_diamonds(self):
+        state = DeucesGameState.deal(random_deal(random.Random(1)))
+        async with BotService(self.index) as service:
+            move = await service.decide(state)
+        self.assertTrue(move & OPENING_CARD_MASK)
+        self.assertTrue(state.is_legal_move(move))
+
+    async def test_rejects_invalid_tables(self):
+        state = DeucesGameState(random_deal(random.Random(2)), table=bitmask.to_mask([0, 5]), turn=1)
+        async with BotService(self.index) as service:
+            with self.assertRaises(ValueError):
+                await service.decide(state)
+
+    async def test_rejects_an_opening_lead_without_the_three_of_diamonds(self):
+        deal = random_deal(random.Random(5))
+        seat = next(p for p, h in enumerate(deal) if not h & OPENING_CARD_MASK)
+        state = state_from_request({'hands': deal, 'turn': seat})
+        self.assertTrue(state.is_opening)
+        async with BotService(self.index) as service:
+            with self.assertRaises(ValueError):
+                await service.decide(state)
+
+    def test_chooser_flags_states_without_a_legal_lead(self):
+        chooser = MoveChooser(self.index)
+        deal = random_deal(random.Random(6))
+        without_three = next(h for h in deal if not h & OPENING_CARD_MASK)
+        moves, invalid = chooser.choose([without_three, 0, without_three], [PASS, PASS, PASS], [True, False, False])
+        self.assertEqual(invalid.tolist(), [True, True, False])
+        self.assertEqual(moves[:2].tolist(), [PASS, PASS])
+        self.assertEqual(int(moves[2]) & without_three, int(moves[2]))
+
+    async def test_pushes_back_when_the_queue_is_full(self):
+        states = random_states(random.Random(3), 10)
+        async with BotService(self.index, max_queue=2) as service:
+            results = await asyncio.gather(
+                *(service.decide(s, block=False) for s in states), return_exceptions=True)
+            self.assertEqual(sum(isinstance(r, ServiceOverloaded) for r in results), len(states) - 2)
+            self.assertEqual(service.stats.rejected, len(states) - 2)
+            # Waiting for room instead decides all of them
+            moves = await asyncio.gather(*(service.decide(s) for s in states))
+        self.assertTrue(all(s.is_legal_move(m) for s, m in zip(states, moves)))
+
+    async def test_serves_json_lines(self):
+        states = random_states(random.Random(4), 5)
+        async with BotService(self.index) as service:
+            server = await asyncio.start_server(lambda r, w: handle_connection(service, r, w), '127.0.0.1', 0)
+            async with server:
+                reader, writer = await asyncio.open_connection(*server.sockets[0].getsockname())
+                for i, state in enumerate(states):
+                    hands, table, leader, passes, turn = state.hands, state.table, state.leader, state.passes, state.turn
+                    request = {'id': i, 'hands': hands, 'table': table, 'leader': leader, 'passes': passes, 'turn': turn}
+                    writer.write(json.dumps(request).encode() + b'\n')
+                writer.write(b'{"id": "bad"}\n')
+                writer.write_eof()
+                responses = [json.loads(line) async for line in reader]
+                writer.close()
+        by_id = dict((r['id'], r) for r in responses)
+        self.assertEqual(len(by_id), len(states) + 1)
+        self.assertIn('error', by_id['bad'])
+        for i, state in enumerate(states):
+            self.assertTrue(state.is_legal_move(by_id[i]['move']))
+
+    async def test_answers_requests_after_a_non_object_line(self):
+        state = random_states(random.Random(5), 1)[0]
+        request = {'id': 'good', 'hands': state.hands, 'table': state.table, 'leader': state.leader,
+                   'passes': state.passes, 'turn': state.turn}
+        async with BotService(self.index) as service:
+            server = await asyncio.start_server(lambda r, w: handle_connection(service, r, w), '127.0.0.1', 0)
+            async with server:
+                reader, writer = await asyncio.open_connection(*server.sockets[0].getsockname())
+                writer.write(b'[1, 2]\nnull\n' + json.dumps(request).encode() + b'\n')
+                writer.write_eof()
+                responses = [json.loads(line) async for line in reader]
+                writer.close()
+        self.assertEqual(sorted(r['id'] or '' for r in responses), ['', '', 'good'])
+        self.assertTrue(all('error' in r for r in responses if r['id'] is None))
+        self.assertTrue(state.is_legal_move(next(r['move'] for r in responses if r['id'] == 'good')))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import unittest
+
+import numpy as np
+
+from cardgame import Deck
+from deuces import (
+    DeucesCard,
+    bitmask,
+)
+from deuces.dealer import (
+    Dealer,
+    deck_ordinals,
+    masks_to_ordinals,
+)
+
+
+class DealerTest(unittest.TestCase):
+    def test_deals_partition_the_deck(self):
+        masks = Dealer(0).deal_masks(50)
+        self.assertEqual(masks.shape, (50, 4))
+        self.assertEqual(masks.dtype, np.uint64)
+        for hands in masks.tolist():
+            self.assertEqual([bitmask.popcount(h) for h in hands], [13] * 4)
+            self.assertEqual(hands[0] | hands[1] | hands[2] | hands[3], bitmask.FULL_DECK_MASK)
+
+    def test_deals_from_a_partial_deck(self):
+        dealer = Dealer(0, Deck(DeucesCard.CARDS[:16]))
+        for hands in dealer.deal_masks(10).tolist():
+            self.assertEqual(hands[0] | hands[1] | hands[2] | hands[3], (1 << 16) - 1)
+        self.assertEqual(dealer.deal_ordinals(10).shape, (10, 4, 4))
+        with self.assertRaises(ValueError):
+            deck_ordinals(Deck(DeucesCard.CARDS[:15]))
+
+    def test_deals_depend_only_on_the_seed(self):
+        whole = Dealer(7).deal_masks(30)
+        dealer = Dealer(7)
+        split = np.concatenate([dealer.deal_masks(10), dealer.deal_masks(20)])
+        np.testing.assert_array_equal(whole, split)
+        self.assertFalse((Dealer(8).deal_masks(30) == whole).all())
+
+    def test_deals_are_uniform(self):
+        masks = Dealer(1).deal_masks(4000)
+        # How often each seat holds each card should be near 1/4
+        held = np.array([[(masks[:, p] >> np.uint64(o)) & np.uint64(1) for o in range(52)] for p in range(4)])
+        frequencies = held.mean(axis=2)
+        self.assertLess(np.abs(frequencies - 0.25).max(), 0.04)
+
+    def test_known_cards_stay_put(self):
+        known = (bitmask.to_mask([0, 5]), 0, bitmask.to_mask([51]), 0)
+        masks = Dealer(2).deal_masks(100, known)
+        for hands in masks.tolist():
+            self.assertEqual([bitmask.popcount(h) for h in hands], [13] * 4)
+            self.assertEqual(hands[0] | hands[1] | hands[2] | hands[3], bitmask.FULL_DECK_MASK)
+            for hand, fixed in zip(hands, known):
+                self.assertEqual(hand & fixed, fixed)
+
+    def test_deals_hands_of_given_sizes(self):
+        known = (bitmask.to_mask(range(10)), 0, 0, 0)
+        masks = Dealer(3).deal_masks(20, known, hand_sizes=(10, 4, 5, 6))
+        for hands in masks.tolist():
+            self.assertEqual(hands[0], known[0])
+            self.assertEqual([bitmask.popcount(h) for h in hands], [10, 4, 5, 6])
+            self.assertEqual(hands[1] & hands[2] | hands[1] & hands[3] | hands[2] & hands[3], 0)
+
+    def test_never_deals_excluded_cards(self):
+        played = bitmask.to_mask(range(0, 52, 3))
+        known = (bitmask.to_mask([1, 2]), 0, 0, 0)
+        masks = Dealer(5).deal_masks(50, known, hand_sizes=(5, 5, 7, 6), excluded=played)
+        for hands in masks.tolist():
+            self.assertEqual([bitmask.popcount(h) for h in hands], [5, 5, 7, 6])
+            self.assertFalse((hands[0] | hands[1] | hands[2] | hands[3]) & played)
+        with self.assertRaises(ValueError):
+            Dealer(5).deal_masks(1, known, excluded=known[0])
+
+    def test_rejects_impossible_deals(self):
+        dealer = Dealer(0)
+        with self.assertRaises(ValueError):
+            dealer.deal_masks(1, (1, 1, 0, 0))
+        with self.assertRaises(ValueError):
+            dealer.deal_masks(1, (bitmask.to_mask(range(14)), 0, 0, 0))
+        with self.assertRaises(ValueError):
+            dealer.deal_masks(1, hand_sizes=(13, 13, 13, 14))
+        with self.assertRaises(ValueError):
+            Dealer(0, Deck(DeucesCard.CARDS[:16])).deal_masks(1, (1 << 40, 0, 0, 0))
+
+    def test_ordinals_match_masks(self):
+        masks = Dealer(4).deal_masks(25)
+        ordinals = masks_to_ordinals(masks, 13)
+        self.assertEqual(ordinals.shape, (25, 4, 13))
+        for hands, hand_ordinals in zip(masks.tolist(), ordinals.tolist()):
+            self.assertEqual([bitmask.ordinals(h) for h in hands], hand_ordinals)
+        with self.assertRaises(ValueError):
+            masks_to_ordinals(masks, 12)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import random
+import unittest
+
+import numpy as np
+
+from deuces import bitmask
+from deuces.dealer import Dealer
+from deuces.determinization import (
+    DeterminizationSampler,
+    Observation,
+    can_beat,
+)
+from deuces.game_state import (
+    PASS,
+    DeucesGameState,
+)
+from deuces.hand_moves import moves_from_hand
+from deuces.simulator import random_policy
+
+
+def game_in_progress(seed, num_moves):
+    rng = random.Random(seed)
+    state = DeucesGameState.deal(Dealer(seed).deal_masks(1).tolist()[0])
+    for _ in range(num_moves):
+        state.apply_move(random_policy(state, list(state.legal_moves()), rng))
+    return state
+
+
+def could_beat(hand, table):
+    return next(moves_from_hand(hand, table), None) is not None
+
+
+class CanBeatTest(unittest.TestCase):
+    def test_matches_a_move_search(self):
+        rng = random.Random(0)
+        hands = [bitmask.to_mask(rng.sample(range(52), rng.randint(0, 13))) for _ in range(300)]
+        tables = rng.sample(list(moves_from_hand(bitmask.FULL_DECK_MASK)), 100)
+        tables += [1 << rng.randrange(52) for _ in range(20)]
+        for table in tables:
+            expected = [could_beat(h, table) for h in hands]
+            self.assertEqual(can_beat(np.array(hands, dtype=np.uint64), table).tolist(), expected)
+
+
+class DeterminizationSamplerTest(unittest.TestCase):
+    def test_deals_are_consistent_with_the_observation(self):
+        state = game_in_progress(0, 25)
+        observation = Observation.from_state(state)
+        deals = DeterminizationSampler(observation, seed=0).sample(200)
+        self.assertEqual(deals.hands.shape, (200, 4))
+        self.assertTrue((deals.weights == 1).all())
+        for hands in deals.hands.tolist():
+            self.assertEqual(hands[observation.seat], state.hands[observation.seat])
+            self.assertEqual([bitmask.popcount(h) for h in hands], list(observation.card_counts))
+            self.assertEqual(hands[0] | hands[1] | hands[2] | hands[3], bitmask.FULL_DECK_MASK & ~observation.out_of_play)
+        true_hands = [h for p, h in enumerate(state.hands) if p != observation.seat]
+        self.assertFalse(all(
+            [h for p, h in enumerate(hands) if p != observation.seat] == true_hands for hands in deals.hands.tolist()))
+
+    def test_weights_passes_the_hand_could_have_beaten(self):
+        state = game_in_progress(1, 40)
+        observation = Observation.from_state(state, seat=0)
+        sampler = DeterminizationSampler(observation, seed=1, pass_weight=0.5)
+        deals = sampler.sample(100)
+        passes = [(p, t, i) for i, (p, m, t) in enumerate(observation.moves_made) if m == PASS and p != 0]
+        self.assertTrue(passes)
+        for hands, weight in zip(deals.hands.tolist(), deals.weights.tolist()):
+            beaten = 0
+            for player, table, i in passes:
+                played_since = 0
+                for later_player, move, _ in observation.moves_made[i:]:
+                    if later_player == player:
+                        played_since |= move
+                beaten += could_beat(hands[player] | played_since, table)
+            self.assertEqual(weight, 0.5 ** beaten)
+        self.assertLess(deals.weights.min(), 1)
+
+    def test_rejects_inconsistent_observations(self):
+        observation = Observation.from_state(game_in_progress(2, 10))
+        with self.assertRaises(ValueError):
+            DeterminizationSampler(observation, pass_weight=0)
+        observation.card_counts = tuple(n + 1 for n in observation.card_counts)
+        with self.assertRaises(ValueError):
+            DeterminizationSampler(observation)
+
+
+if __name__ == '__main__':
+    unittest.main()
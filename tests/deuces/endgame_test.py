@@ -0,0 +1,85 @@
+import os
+import sys
+import tempfile
+import unittest
+
+from deuces.endgame import (
+    EndgameSolver,
+    EndgameTable,
+)
+from tests.deuces.explorer_test import small_game
+
+
+def plain_max_n(state, order):
+    """Max-n without a table or pruning, searching moves in ``order``."""
+    if state.is_over:
+        return state.winner
+    outcomes = []
+    for move in order(state):
+        state.apply_move(move)
+        outcomes.append(plain_max_n(state, order))
+        state.undo_move()
+    return state.turn if state.turn in outcomes else outcomes[0]
+
+
+class EndgameSolverTest(unittest.TestCase):
+    def test_matches_an_exhaustive_search(self):
+        for seed in range(8):
+            state = small_game(seed, num_cards=8)
+            solver = EndgameSolver()
+            self.assertEqual(solver.solve(state), plain_max_n(state, EndgameSolver._ordered_moves))
+
+    def test_best_move_keeps_a_won_game_won(self):
+        checked = 0
+        for seed in range(20):
+            state = small_game(seed, num_cards=12)
+            solver = EndgameSolver()
+            while not state.is_over:
+                mover = state.turn
+                move = solver.best_move(state)
+                self.assertTrue(state.is_legal_move(move))
+                mover_wins = solver.solve(state) == mover
+                state.apply_move(move)
+                if mover_wins:
+                    checked += 1
+                    self.assertEqual(solver.solve(state), mover)
+        self.assertGreater(checked, 0)
+
+    def test_searches_deeper_than_the_recursion_limit(self):
+        limit = sys.getrecursionlimit()
+        self.addCleanup(sys.setrecursionlimit, limit)
+        state = small_game(4, num_cards=12)
+        expected = EndgameSolver().solve(state)
+        # Low enough that a recursive search of this game would overflow
+        sys.setrecursionlimit(60)
+        self.assertEqual(EndgameSolver().solve(state), expected)
+        self.assertEqual(sys.getrecursionlimit(), 60)
+
+    def test_rejects_states_with_too_many_cards(self):
+        with self.assertRaises(ValueError):
+            EndgameSolver(max_cards=8).solve(small_game(0, num_cards=12))
+
+    def test_table_round_trips_through_a_file(self):
+        states = [small_game(seed, num_cards=12) for seed in range(5)]
+        solver = EndgameSolver()
+        winners = [solver.solve(s) for s in states]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'endgame.bin')
+            solver.table.save(path)
+            self.assertEqual(os.path.getsize(path), 16 + len(solver.table) * 37)
+            with EndgameTable.load(path) as table:
+                self.assertEqual(len(table), len(solver.table))
+                loaded = EndgameSolver(table=table)
+                self.assertEqual([loaded.solve(s) for s in states], winners)
+                self.assertEqual(loaded.stats.nodes, 0)
+                # New solves add to the loaded entries
+                extra = small_game(10, num_cards=12)
+                loaded.solve(extra)
+                table.save(path)
+            with EndgameTable.load(path) as table:
+                self.assertEqual(EndgameSolver(table=table).solve(extra), loaded.solve(extra))
+                self.assertGreater(len(table), len(solver.table))
+
+
+if __name__ == '__main__':
+    unittest.main()
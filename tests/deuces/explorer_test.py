@@ -0,0 +1,86 @@
+import os
+import random
+import tempfile
+import unittest
+
+from deuces import bitmask
+from deuces.explorer import (
+    BREADTH_FIRST,
+    DEPTH_FIRST,
+    Explorer,
+    state_level,
+)
+from deuces.game_state import (
+    STATE_BYTES,
+    DeucesGameState,
+)
+
+
+def small_game(seed, num_cards=12):
+    cards = random.Random(seed).sample(range(bitmask.NUM_CARDS), num_cards)
+    return DeucesGameState([bitmask.to_mask(cards[i::4]) for i in range(4)])
+
+
+def reachable_states(root):
+    seen = set()
+    stack = [root.key()]
+    while stack:
+        key = stack.pop()
+        if key in seen:
+            continue
+        seen.add(key)
+        state = DeucesGameState.from_key(key)
+        for move in list(state.legal_moves()):
+            state.apply_move(move)
+            assert state_level(state) < state_level(DeucesGameState.from_key(key))
+            stack.append(state.key())
+            state.undo_move()
+    return seen
+
+
+class ExplorerTest(unittest.TestCase):
+    def test_expands_every_reachable_state_once(self):
+        root = small_game(0, num_cards=8)
+        expected = reachable_states(root)
+        for order in (BREADTH_FIRST, DEPTH_FIRST):
+            seen = []
+            Explorer(order=order, on_state=lambda s: seen.append(s.key())).explore([root])
+            self.assertEqual(sorted(seen), sorted(expected))
+
+    def test_spilling_keeps_breadth_first_exact(self):
+        root = small_game(1)
+        unbounded = Explorer().explore([root])
+        with tempfile.TemporaryDirectory() as directory:
+            spilled = Explorer(
+                memory_budget=STATE_BYTES * 20, transposition_size=50, spill_directory=directory,
+            ).explore([root])
+            self.assertEqual(os.listdir(directory), [])
+        self.assertGreater(spilled.spilled_chunks, 0)
+        self.assertEqual(spilled.states, unbounded.states)
+        self.assertEqual(spilled.terminal_states, unbounded.terminal_states)
+
+    def test_resume_from_checkpoint(self):
+        root = small_game(2)
+        expected = reachable_states(root)
+        for order in (BREADTH_FIRST, DEPTH_FIRST):
+            seen = []
+            with tempfile.TemporaryDirectory() as directory:
+                checkpoint_path = os.path.join(directory, 'checkpoint.json')
+                first = Explorer(
+                    order=order, memory_budget=STATE_BYTES * 100, spill_directory=directory,
+                    checkpoint_path=checkpoint_path, checkpoint_every=500,
+                    on_state=lambda s: seen.append(s.key()),
+                ).explore([root], max_states=len(expected) // 3)
+                self.assertLess(first.states, len(expected))
+                # The resumed run starts with an empty transposition table
+                resumed = Explorer.resume(
+                    checkpoint_path, memory_budget=STATE_BYTES * 100, on_state=lambda s: seen.append(s.key()),
+                ).explore()
+            self.assertEqual(set(seen), expected)
+            self.assertEqual(resumed.states, len(seen))
+            if order == BREADTH_FIRST:
+                self.assertEqual(len(seen), len(expected))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import random
+import unittest
+
+from deuces import bitmask
+from deuces.hand_moves import moves_from_hand
+from deuces.game_state import (
+    OPENING_CARD_MASK,
+    PASS,
+    STATE_BYTES,
+    DeucesGameState,
+    TrackingDeucesGameState,
+)
+
+
+def random_deal(rng):
+    cards = list(range(bitmask.NUM_CARDS))
+    rng.shuffle(cards)
+    return [bitmask.to_mask(cards[i::4]) for i in range(4)]
+
+
+class DeucesGameStateTest(unittest.TestCase):
+    def test_holder_of_the_three_of_diamonds_opens_with_it(self):
+        state = DeucesGameState.deal(random_deal(random.Random(0)))
+        self.assertTrue(state.hands[state.turn] & OPENING_CARD_MASK)
+        moves = list(state.legal_moves())
+        self.assertTrue(moves)
+        self.assertTrue(all(m & OPENING_CARD_MASK for m in moves))
+        self.assertNotIn(PASS, moves)
+
+    def test_table_clears_after_everyone_else_passes(self):
+        state = DeucesGameState([0b1 | 1 << 50, 0b10, 0b100, 0b1000 | 1 << 51], turn=0)
+        state.apply_move(0b1)
+        for _ in range(3):
+            self.assertIn(PASS, list(state.legal_moves()))
+            state.apply_move(PASS)
+        self.assertEqual((state.table, state.turn, state.passes), (PASS, 0, 0))
+        self.assertEqual(state.moves_made, [(0, 0b1, PASS), (1, PASS, 0b1), (2, PASS, 0b1), (3, PASS, 0b1)])
+
+    def test_random_playouts_undo_to_the_start(self):
+        rng = random.Random(1)
+        for _ in range(5):
+            state = DeucesGameState.deal(random_deal(rng))
+            start = state.key()
+            keys = []
+            while not state.is_over:
+                moves = list(state.legal_moves())
+                move = rng.choice(moves)
+                self.assertTrue(state.is_legal_move(move))
+                keys.append(state.key())
+                state.apply_move(move)
+            self.assertIsNotNone(state.winner)
+            while keys:
+                state.undo_move()
+                self.assertEqual(state.key(), keys.pop())
+            self.assertEqual(state.key(), start)
+
+    def test_encodings_round_trip(self):
+        state = DeucesGameState(random_deal(random.Random(2)), table=0b11, leader=2, passes=1, turn=3)
+        data = state.to_bytes()
+        self.assertEqual(len(data), STATE_BYTES)
+        self.assertEqual(DeucesGameState.from_bytes(data).key(), state.key())
+        self.assertEqual(DeucesGameState.from_key(state.key()).key(), state.key())
+
+    def test_tracking_state_matches_recomputed_moves(self):
+        rng = random.Random(3)
+        for _ in range(5):
+            state = TrackingDeucesGameState.deal(random_deal(rng))
+            depth = steps = 0
+            while not state.is_over:
+                moves = list(state.legal_moves())
+                self.assertEqual(sorted(moves), sorted(DeucesGameState.from_key(state.key()).legal_moves()))
+                state.apply_move(rng.choice(moves))
+                depth += 1
+                steps += 1
+                # Back up now and then so the move sets are restored mid-game
+                if steps % 7 == 0:
+                    state.undo_move()
+                    state.undo_move()
+                    depth -= 2
+            for _ in range(depth):
+                state.undo_move()
+            for hand, move_set in zip(state.hands, state.move_sets):
+                self.assertEqual(sorted(move_set), sorted(moves_from_hand(hand)))
+
+
+if __name__ == '__main__':
+    unittest.main()
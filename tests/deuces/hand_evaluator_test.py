@@ -0,0 +1,91 @@
+import random
+import unittest
+
+import numpy as np
+
+from deuces import (
+    DeucesCard,
+    bitmask,
+)
+from deuces.dealer import Dealer
+from deuces.game_state import PASS
+from deuces.hand_evaluator import (
+    FEATURES,
+    HandEvaluator,
+    HandWeights,
+    hand_features,
+    rank_counts,
+    suit_counts,
+)
+from deuces.simulator import (
+    low_card_policy,
+    simulate,
+)
+from deuces.validation.combos import VALID_STRAIGHTS_BY_RANK_IXS
+
+
+def cards(s):
+    by_str = dict((str(c), c) for c in DeucesCard.CARDS)
+    return DeucesCard.to_mask(by_str[c] for c in s.split())
+
+
+def scalar_features(hand):
+    ranks = bitmask.rank_counts(hand)
+    straights = [s for s in VALID_STRAIGHTS_BY_RANK_IXS if all(ranks[r] for r in s)]
+    in_straight = set(r for s in straights for r in s)
+    loose = [r for r in range(12) if ranks[r] == 1 and r not in in_straight]
+    return {
+        'cards': bitmask.popcount(hand),
+        'twos': ranks[12],
+        'aces': ranks[11],
+        'pairs': ranks.count(2),
+        'triples': ranks.count(3),
+        'quads': ranks.count(4) if bitmask.popcount(hand) >= 5 else 0,
+        'straights': len(straights),
+        'flushes': sum(bitmask.popcount(hand & m) >= 5 for m in bitmask.SUIT_MASKS),
+        'full_houses': int(any(n >= 3 for n in ranks) and sum(n >= 2 for n in ranks) >= 2),
+        'loose_singles': len(loose),
+        'loose_single_lowness': sum(12 - r for r in loose),
+    }
+
+
+class HandEvaluatorTest(unittest.TestCase):
+    def test_histograms(self):
+        hand = cards('3♢ 3♠ 9♡ 2♡ 2♠')
+        self.assertEqual(rank_counts(np.array([hand], dtype=np.uint64))[0].tolist(), bitmask.rank_counts(hand))
+        self.assertEqual(suit_counts(np.array([hand], dtype=np.uint64))[0].tolist(), [1, 0, 2, 2])
+
+    def test_features_match_a_scalar_reference(self):
+        rng = random.Random(0)
+        hands = [bitmask.to_mask(rng.sample(range(52), rng.randint(0, 13))) for _ in range(300)]
+        hands += Dealer(0).deal_masks(50).ravel().tolist()
+        features = hand_features(np.array(hands, dtype=np.uint64))
+        self.assertEqual(features.shape, (len(hands), len(FEATURES)))
+        for hand, row in zip(hands, features.tolist()):
+            self.assertEqual(dict(zip(FEATURES, row)), scalar_features(hand))
+
+    def test_combos_and_controls_score_higher(self):
+        evaluator = HandEvaluator()
+        self.assertGreater(
+            evaluator.score_hand(cards('3♢ 4♣ 5♢ 6♢ 7♠')), evaluator.score_hand(cards('3♢ 4♣ 5♢ 6♢ 9♠')))
+        self.assertGreater(evaluator.score_hand(cards('3♢ 2♠')), evaluator.score_hand(cards('3♢ K♠')))
+        self.assertGreater(evaluator.score_hand(cards('9♢ 9♠')), evaluator.score_hand(cards('9♢ T♠')))
+
+    def test_scores_the_hands_moves_leave(self):
+        evaluator = HandEvaluator(HandWeights(), pass_penalty=1.5)
+        hand = Dealer(1).deal_masks(1)[0, 0]
+        moves = [PASS] + [1 << o for o in bitmask.ordinals(int(hand))]
+        scores = evaluator.score_moves(int(hand), moves)
+        self.assertAlmostEqual(scores[0], evaluator.score_hand(int(hand)) - 1.5)
+        for move, score in zip(moves[1:], scores[1:]):
+            self.assertAlmostEqual(score, evaluator.score_hand(int(hand) & ~move))
+        self.assertEqual(evaluator.best_move(int(hand), moves), moves[int(np.argmax(scores))])
+
+    def test_policy_beats_low_card_play(self):
+        evaluator = HandEvaluator()
+        stats = simulate(400, [evaluator.policy] + [low_card_policy] * 3, seed=2, processes=1)
+        self.assertGreater(stats.win_rates[0], max(stats.win_rates[1:]))
+
+
+if __name__ == '__main__':
+    unittest.main()
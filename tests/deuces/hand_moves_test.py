@@ -0,0 +1,75 @@
+import random
+import unittest
+
+from deuces import bitmask
+from deuces.hand_moves import (
+    HandMoveSet,
+    moves_from_hand,
+)
+from deuces.move_index import MoveIndex
+from deuces.validation import LogicalValidator
+
+
+class MovesFromHandTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.index = MoveIndex.load()
+        cls.all_moves = [int(m) for s in range(1, 6) for m in cls.index.moves(s)]
+
+    def assert_matches_index(self, hand, against=None):
+        moves = list(moves_from_hand(hand, against))
+        self.assertEqual(len(moves), len(set(moves)))
+        self.assertEqual(set(moves), set(int(m) for m in self.index.legal_replies(hand, against)))
+
+    def test_leads_match_move_index(self):
+        rng = random.Random(0)
+        for _ in range(20):
+            self.assert_matches_index(bitmask.to_mask(rng.sample(range(bitmask.NUM_CARDS), 13)))
+
+    def test_replies_match_move_index(self):
+        rng = random.Random(1)
+        for _ in range(200):
+            hand = bitmask.to_mask(rng.sample(range(bitmask.NUM_CARDS), rng.randint(5, 13)))
+            self.assert_matches_index(hand, rng.choice(self.all_moves))
+
+    def test_dense_hands(self):
+        # One suit and a block of ranks, so flushes, straight flushes and quads all show up
+        self.assert_matches_index(bitmask.SUIT_MASKS[2] | bitmask.RANK_MASKS[0] | bitmask.RANK_MASKS[5])
+        for against in self.all_moves[-40:]:
+            self.assert_matches_index(bitmask.SUIT_MASKS[1] | bitmask.RANK_MASKS[11], against)
+
+
+class HandMoveSetTest(unittest.TestCase):
+    def assert_matches_hand(self, move_set, against_moves):
+        self.assertEqual(sorted(move_set), sorted(moves_from_hand(move_set.hand)))
+        for against in against_moves:
+            replies = list(move_set.replies(against))
+            self.assertEqual(sorted(replies), sorted(moves_from_hand(move_set.hand, against)))
+
+    def test_follows_removes_and_restores(self):
+        rng = random.Random(2)
+        against_moves = [m for m in moves_from_hand(bitmask.FULL_DECK_MASK & ~bitmask.RANK_MASKS[12]) if rng.random() < 0.002]
+        for _ in range(10):
+            hand = bitmask.to_mask(rng.sample(range(bitmask.NUM_CARDS), 13))
+            move_set = HandMoveSet(hand)
+            hands = [hand]
+            while move_set.hand:
+                move_set.remove(rng.choice(list(move_set)))
+                hands.append(move_set.hand)
+                self.assert_matches_hand(move_set, against_moves)
+            while len(hands) > 1:
+                move_set.restore()
+                hands.pop()
+                self.assertEqual(move_set.hand, hands[-1])
+                self.assert_matches_hand(move_set, against_moves)
+
+    def test_replies_are_weakest_first(self):
+        move_set = HandMoveSet(bitmask.SUIT_MASKS[1] | bitmask.RANK_MASKS[4])
+        five_cards = list(move_set.replies(bitmask.to_mask([0, 4, 8, 12, 17])))
+        strengths = [LogicalValidator.move_strength(m) for m in five_cards]
+        self.assertTrue(five_cards)
+        self.assertEqual(strengths, sorted(strengths))
+
+
+if __name__ == '__main__':
+    unittest.main()
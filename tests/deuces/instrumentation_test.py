@@ -0,0 +1,91 @@
+import json
+import os
+import random
+import tempfile
+import unittest
+
+from deuces import instrumentation
+from deuces.instrumentation import (
+    BUCKET_BOUNDS_NS,
+    Histogram,
+    JsonLinesSink,
+    MemorySink,
+    PrometheusSink,
+    Sink,
+)
+from deuces.scripts.move_generator import write_move_class
+from deuces.simulator import (
+    play_game,
+    random_policy,
+)
+from deuces.validation import LogicalValidator
+from deuces.validation.combos import FiveCard
+from tests.deuces.game_state_test import random_deal
+from tests.deuces.validation.logical_validator_test import hand
+
+
+class InstrumentationTest(unittest.TestCase):
+    def tearDown(self):
+        instrumentation.disable()
+        instrumentation.reset()
+
+    def test_records_nothing_while_disabled(self):
+        LogicalValidator.is_valid_mask(0b11)
+        FiveCard.from_hand(hand('3♢ 4♣ 5♢ 6♢ 7♠'))
+        self.assertEqual(instrumentation.snapshot()['counters'], {})
+
+    def test_counts_every_call_and_samples_latencies(self):
+        instrumentation.enable(sample_every=4)
+        for _ in range(10):
+            LogicalValidator.is_valid_move(hand('5♣ 5♠'), hand('5♢ 5♡'))
+            FiveCard.from_hand(hand('3♢ 4♣ 5♢ 6♢ 7♠'))
+        write_move_class('4s', None)
+        play_game(random_deal(random.Random(0)), [random_policy] * 4, random.Random(0))
+        snapshot = instrumentation.snapshot()
+        counters, histograms = snapshot['counters'], snapshot['histograms']
+        self.assertGreaterEqual(counters['logical_validator.is_valid_mask'], 10)
+        self.assertEqual(counters['five_card.from_hand'], 10)
+        self.assertEqual(histograms['five_card.from_hand']['count'], 2)
+        self.assertEqual(counters['move_generator.4s'], 13)
+        self.assertEqual(histograms['move_generator.4s']['count'], 1)
+        self.assertEqual(counters['game_state.apply_move'], counters['simulator.decision'])
+        self.assertIsNotNone(histograms['simulator.decision']['p99_ns'])
+
+    def test_histogram_quantiles(self):
+        histogram = Histogram()
+        for ns in [100] * 98 + [5000, 10 ** 12]:
+            histogram.observe(ns)
+        self.assertEqual(histogram.quantile(0.5), BUCKET_BOUNDS_NS[0])
+        self.assertEqual(histogram.quantile(0.99), 8192)
+        self.assertIsNone(histogram.quantile(1.0))
+
+    def test_sinks_must_emit(self):
+        class IncompleteSink(Sink):
+            pass
+
+        with self.assertRaises(TypeError):
+            IncompleteSink()
+
+    def test_sinks(self):
+        with tempfile.TemporaryDirectory() as directory:
+            jsonl_path = os.path.join(directory, 'metrics.jsonl')
+            prometheus_path = os.path.join(directory, 'metrics.prom')
+            memory = MemorySink()
+            instrumentation.enable(sample_every=1, sinks=[memory, JsonLinesSink(jsonl_path), PrometheusSink(prometheus_path)])
+            LogicalValidator.is_valid_mask(0b11)
+            instrumentation.flush()
+            LogicalValidator.is_valid_mask(0b11)
+            instrumentation.flush()
+
+            self.assertEqual([s['counters']['logical_validator.is_valid_mask'] for s in memory.snapshots], [1, 2])
+            with open(jsonl_path) as f:
+                self.assertEqual([json.loads(line) for line in f], memory.snapshots)
+            with open(prometheus_path) as f:
+                lines = f.read().splitlines()
+            self.assertIn('deuces_calls_total{operation="logical_validator.is_valid_mask"} 2', lines)
+            self.assertIn('deuces_latency_seconds_count{operation="logical_validator.is_valid_mask"} 2', lines)
+            self.assertIn('deuces_latency_seconds_bucket{operation="logical_validator.is_valid_mask",le="+Inf"} 2', lines)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import os
+import struct
+import tempfile
+import unittest
+
+import numpy as np
+
+from deuces.move_db import (
+    MOVE_DB_FILENAME,
+    MoveDB,
+    write_move_db,
+)
+from deuces.move_index import MoveIndex
+from deuces.moves import (
+    MOVES_DIRECTORY,
+    load_moves,
+    to_masks,
+)
+from deuces.validation import BatchValidator
+
+
+class MoveDBTest(unittest.TestCase):
+    def test_round_trip(self):
+        moves_by_class = dict((c, load_moves(c)) for c in ('1s', '2s', 'fh'))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, MOVE_DB_FILENAME)
+            write_move_db(path, moves_by_class)
+            with MoveDB.open(path) as db:
+                self.assertEqual(db.move_classes, ['1s', '2s', 'fh'])
+                for move_class, moves in moves_by_class.items():
+                    np.testing.assert_array_equal(db.moves(move_class), moves)
+                    np.testing.assert_array_equal(db.masks(move_class), to_masks(moves))
+                    np.testing.assert_array_equal(db.strengths(move_class), BatchValidator.move_strengths(moves))
+
+    def test_shipped_database_matches_csvs(self):
+        with MoveDB.open(os.path.join(MOVES_DIRECTORY, MOVE_DB_FILENAME)) as db:
+            for move_class in ('1s', '2s', '3s', '4s', '5s', 'st', 'fl', 'fh', 'fk', 'sf'):
+                np.testing.assert_array_equal(db.moves(move_class), load_moves(move_class))
+
+    def test_rejects_other_versions(self):
+        with open(os.path.join(MOVES_DIRECTORY, MOVE_DB_FILENAME), 'rb') as f:
+            data = bytearray(f.read())
+        struct.pack_into('<H', data, 4, 99)
+        with self.assertRaises(ValueError):
+            MoveDB(bytes(data))
+
+    def test_move_index_from_database_matches_csvs(self):
+        from_db = MoveIndex.load()
+        from_csvs = MoveIndex.from_moves(dict((s, load_moves(f'{s}s')) for s in range(1, 6)))
+        for move_size in range(1, 6):
+            np.testing.assert_array_equal(from_db.moves(move_size), from_csvs.moves(move_size))
+
+
+if __name__ == '__main__':
+    unittest.main()
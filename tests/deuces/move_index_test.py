@@ -0,0 +1,46 @@
+import random
+import unittest
+
+import numpy as np
+
+from deuces import bitmask
+from deuces.move_index import MoveIndex
+from deuces.validation import LogicalValidator
+
+
+class MoveIndexTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.index = MoveIndex.load()
+        cls.all_moves = [int(m) for s in range(1, 6) for m in cls.index.moves(s)]
+
+    def test_loads_every_move(self):
+        self.assertEqual(len(self.index), 52 + 78 + 52 + 13 + 19716)
+
+    def test_moves_beating_matches_logical_validator(self):
+        rng = random.Random(0)
+        for against in rng.sample(self.all_moves, 40):
+            expected = set(m for m in self.all_moves if LogicalValidator.is_valid_mask(m, against))
+            self.assertEqual(set(int(m) for m in self.index.moves_beating(against)), expected)
+
+    def test_legal_replies_are_limited_to_the_hand(self):
+        rng = random.Random(1)
+        for _ in range(10):
+            hand = bitmask.to_mask(rng.sample(range(bitmask.NUM_CARDS), 13))
+            against = rng.choice(self.all_moves)
+            expected = set(
+                m for m in self.all_moves
+                if m & hand == m and LogicalValidator.is_valid_mask(m, against))
+            self.assertEqual(set(int(m) for m in self.index.legal_replies(hand, against)), expected)
+            leads = self.index.legal_replies(hand)
+            self.assertTrue(np.all(leads & np.uint64(~hand & bitmask.FULL_DECK_MASK) == 0))
+
+    def test_move_strength_agrees_with_batch_scores(self):
+        for move_size in range(1, 6):
+            strengths = [LogicalValidator.move_strength(int(m)) for m in self.index.moves(move_size)]
+            self.assertEqual(strengths, sorted(strengths))
+            self.assertNotIn(0, strengths)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,242 @@
+import asyncio
+import os
+import random
+import tempfile
+import unittest
+
+from unittest import mock
+
+import numpy as np
+
+from cardgame.card import (
+    Card,
+    Rank,
+    Suit,
+)
+from deuces import (
+    DeucesCard,
+    bitmask,
+    rules as rules_module,
+)
+from deuces.bot_service import BotService
+from deuces.dealer import Dealer
+from deuces.endgame import EndgameSolver
+from deuces.game_state import (
+    PASS,
+    DeucesGameState,
+    TrackingDeucesGameState,
+)
+from deuces.move_db import (
+    MOVE_DB_FILENAME,
+    MoveDB,
+)
+from deuces.move_index import MoveIndex
+from deuces.moves import from_masks
+from deuces.rules import (
+    DEFAULT_RULES,
+    DEFAULT_STRAIGHTS,
+    SUIT_BY_LETTER,
+    Rules,
+    cache_filename,
+    compile_rules,
+)
+from deuces.scripts.move_generator import write_rules_move_db
+from deuces.simulator import (
+    random_policy,
+    simulate,
+)
+from deuces.validation.combos.five_card_table import strength_table
+from tests.deuces.game_state_test import random_deal
+
+TWO_ENDS_STRAIGHTS = Rules(straights=DEFAULT_STRAIGHTS + ('J Q K A 2',))
+NO_FOUR_OF_A_KIND = Rules(combo_order=('Straight', 'Flush', 'FullHouse', 'StraightFlush'))
+FLUSH_BY_RANK = Rules(flush_compare='rank')
+CLUBS_LOWEST = Rules(suit_order='C D H S')
+
+
+def cards(compiled, s: str) -> int:
+    return compiled.to_mask(Card(Rank(c[0]), SUIT_BY_LETTER[c[1]]) for c in s.split())
+
+
+class RulesTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        # Each test compiles afresh rather than reusing another test's tables
+        self.addCleanup(rules_module._COMPILED.clear)
+        rules_module._COMPILED.clear()
+
+    def test_default_rules_match_the_engine(self):
+        compiled = compile_rules(DEFAULT_RULES, None)
+        np.testing.assert_array_equal(compiled.strength_table, np.frombuffer(strength_table(), dtype=np.uint16))
+        index = MoveIndex.load()
+        for move_size in range(1, 6):
+            self.assertEqual(set(compiled.moves(move_size).tolist()), set(index.moves(move_size).tolist()))
+        self.assertEqual(compiled.rank_order, tuple(DeucesCard.RANK_ORDER))
+        self.assertEqual(compiled.suit_order, tuple(DeucesCard.SUIT_ORDER))
+        self.assertEqual(compiled.ordinal_of(DeucesCard(Rank.TWO, Suit.SPADES)), bitmask.NUM_CARDS - 1)
+
+    def test_validates_and_generates_from_the_tables(self):
+        compiled = compile_rules(TWO_ENDS_STRAIGHTS, None)
+        all_moves = [int(m) for s in range(1, 6) for m in compiled.moves(s)]
+        rng = random.Random(0)
+        for _ in range(10):
+            hand = bitmask.to_mask(rng.sample(range(bitmask.NUM_CARDS), 13))
+            against = rng.choice(all_moves)
+            expected = set(m for m in all_moves if m & hand == m and compiled.is_valid_mask(m, against))
+            self.assertEqual(set(compiled.legal_replies(hand, against).tolist()), expected)
+        moves = rng.sample(all_moves, 200)
+        rows = from_masks(np.array(moves, dtype=np.uint64))
+        self.assertEqual(compiled.move_strengths(rows).tolist(), [compiled.move_strength(m) for m in moves])
+        against = moves[0]
+        self.assertEqual(
+            compiled.are_valid_moves(rows, against).tolist(), [compiled.is_valid_mask(m, against) for m in moves])
+
+    def test_twos_can_end_straights(self):
+        ace_high = 'TD JD QC KC AH'
+        two_high = 'JD QD KC AC 2H'
+        standard = compile_rules(DEFAULT_RULES, None)
+        self.assertFalse(standard.is_valid_mask(cards(standard, two_high)))
+        compiled = compile_rules(TWO_ENDS_STRAIGHTS, None)
+        self.assertTrue(compiled.is_valid_mask(cards(compiled, two_high), cards(compiled, ace_high)))
+        self.assertEqual(len(compiled.moves(5)), 19716 + 1020)
+
+    def test_banned_combos_are_invalid(self):
+        compiled = compile_rules(NO_FOUR_OF_A_KIND, None)
+        quads = cards(compiled, '7D 7C 7H 7S 3D')
+        self.assertFalse(compiled.is_valid_mask(quads))
+        self.assertFalse(compiled.are_valid_moves(from_masks(np.array([quads], dtype=np.uint64)))[0])
+        straight_flush = cards(compiled, '3D 4D 5D 6D 7D')
+        self.assertTrue(compiled.is_valid_mask(straight_flush, cards(compiled, 'KD KC KH 8S 8D')))
+
+    def test_flush_compare(self):
+        low_spades = '3S 4S 5S 6S 8S'
+        king_hearts = '3H 4H 5H 6H KH'
+        standard = compile_rules(DEFAULT_RULES, None)
+        self.assertTrue(standard.is_valid_mask(cards(standard, low_spades), cards(standard, king_hearts)))
+        by_rank = compile_rules(FLUSH_BY_RANK, None)
+        self.assertFalse(by_rank.is_valid_mask(cards(by_rank, low_spades), cards(by_rank, king_hearts)))
+        self.assertTrue(by_rank.is_valid_mask(cards(by_rank, king_hearts), cards(by_rank, low_spades)))
+
+    def test_suit_order(self):
+        compiled = compile_rules(CLUBS_LOWEST, None)
+        self.assertEqual(compiled.ordinal_of(Card(Rank.THREE, Suit.CLUBS)), 0)
+        self.assertTrue(compiled.is_valid_mask(cards(compiled, '3D'), cards(compiled, '3C')))
+        self.assertEqual(
+            compiled.cards(cards(compiled, '3D 3C')),
+            (Card(Rank.THREE, Suit.CLUBS), Card(Rank.THREE, Suit.DIAMONDS)))
+
+    def test_compiles_once_per_process_and_cache(self):
+        compiled = compile_rules(TWO_ENDS_STRAIGHTS, self.directory)
+        self.assertIs(compile_rules(TWO_ENDS_STRAIGHTS, self.directory), compiled)
+        self.assertIsNot(compile_rules(DEFAULT_RULES, self.directory), compiled)
+        self.assertTrue(os.path.exists(os.path.join(self.directory, cache_filename(TWO_ENDS_STRAIGHTS))))
+        rules_module._COMPILED.clear()
+        with mock.patch.object(rules_module, '_compile_tables', side_effect=AssertionError('recompiled')):
+            loaded = compile_rules(TWO_ENDS_STRAIGHTS, self.directory)
+        np.testing.assert_array_equal(loaded.strength_table, compiled.strength_table)
+        self.assertEqual(sorted(os.listdir(self.directory)), sorted(
+            cache_filename(r) for r in (DEFAULT_RULES, TWO_ENDS_STRAIGHTS)))
+
+    def test_ignores_unreadable_cache_files(self):
+        with open(os.path.join(self.directory, cache_filename(FLUSH_BY_RANK)), 'wb') as f:
+            f.write(b'not tables')
+        compiled = compile_rules(FLUSH_BY_RANK, self.directory)
+        self.assertEqual(len(compiled.moves(5)), 19716)
+
+    def test_config_hash(self):
+        self.assertEqual(Rules().config_hash, DEFAULT_RULES.config_hash)
+        hashes = set(r.config_hash for r in (DEFAULT_RULES, TWO_ENDS_STRAIGHTS, NO_FOUR_OF_A_KIND, FLUSH_BY_RANK))
+        self.assertEqual(len(hashes), 4)
+
+    def test_rejects_bad_rules(self):
+        for kwargs in (
+                dict(rank_order='3 4 5 6 7 8 9 T J Q K A'),
+                dict(suit_order='D D H S'),
+                dict(straights=('3 4 5 6 6',)),
+                dict(straights=('3 4 5 6 7', '3 4 5 6 7')),
+                dict(combo_order=('Straight', 'Pair')),
+                dict(flush_compare='color'),
+        ):
+            with self.assertRaises(ValueError):
+                Rules(**kwargs)
+
+
+class VariantPlayTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Compiled in memory; tests that compile again point the cache at a
+        # temporary directory, so none write to the rules cache
+        cls.compiled = compile_rules(TWO_ENDS_STRAIGHTS, None)
+        cls.two_high = cards(cls.compiled, 'JD QD KC AC 2H')
+        cls.ace_high = cards(cls.compiled, 'TC JH QH KS AD')
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.cache_directory = directory.name
+
+    def state(self, rules, state_class=DeucesGameState):
+        hands = [self.two_high | cards(self.compiled, '3D'), cards(self.compiled, '4D 5D'), 1 << 20, 1 << 30]
+        return state_class(hands, self.ace_high, leader=3, turn=0, rules=rules)
+
+    def test_game_states_play_the_variant(self):
+        for state_class in (DeucesGameState, TrackingDeucesGameState):
+            standard = self.state(None, state_class)
+            self.assertEqual(list(standard.legal_moves()), [PASS])
+            self.assertFalse(standard.is_legal_move(self.two_high))
+            variant = self.state(self.compiled, state_class)
+            self.assertEqual(list(variant.legal_moves()), [self.two_high, PASS])
+            self.assertTrue(variant.is_legal_move(self.two_high))
+            self.assertIs(DeucesGameState.from_bytes(variant.to_bytes(), self.compiled).rules, self.compiled)
+
+    def test_tracked_moves_match_generated_ones(self):
+        rng = random.Random(0)
+        for _ in range(5):
+            plain = DeucesGameState.deal(random_deal(rng), self.compiled)
+            tracked = TrackingDeucesGameState.deal(plain.hands, self.compiled)
+            while not plain.is_over:
+                moves = list(plain.legal_moves())
+                self.assertEqual(sorted(tracked.legal_moves()), sorted(moves))
+                move = rng.choice(moves)
+                plain.apply_move(move)
+                tracked.apply_move(move)
+
+    def test_endgame_solver_searches_the_variant(self):
+        state = self.state(self.compiled)
+        self.assertEqual(EndgameSolver().best_move(state), self.two_high)
+        self.assertEqual(EndgameSolver().solve(self.state(None)), 3)
+
+    def test_simulates_the_variant(self):
+        stats = simulate(
+            40, random_policy, processes=1, chunk_size=20, rules=TWO_ENDS_STRAIGHTS,
+            cache_directory=self.cache_directory)
+        self.assertEqual(sum(stats.wins), 40)
+
+    def test_dealer_deals_variant_ordinals(self):
+        clubs_lowest = compile_rules(CLUBS_LOWEST, None)
+        deck = [DeucesCard(Rank.THREE, s) for s in Suit] + [DeucesCard(Rank.FOUR, s) for s in Suit]
+        dealer = Dealer(0, deck, clubs_lowest)
+        self.assertEqual(dealer.ordinals.tolist(), list(range(8)))
+        self.assertEqual(dealer.deck_mask, cards(clubs_lowest, '3D 3C 3H 3S 4D 4C 4H 4S'))
+
+    def test_bot_service_decides_for_the_variant(self):
+        async def decide():
+            async with BotService(rules=self.compiled) as service:
+                return await service.decide(self.state(self.compiled))
+
+        self.assertEqual(asyncio.run(decide()), self.two_high)
+
+    def test_writes_the_variant_move_db(self):
+        with tempfile.TemporaryDirectory() as directory:
+            write_rules_move_db(TWO_ENDS_STRAIGHTS, directory, self.cache_directory)
+            with MoveDB.open(os.path.join(directory, MOVE_DB_FILENAME)) as db:
+                self.assertEqual(len(db.masks('5s')), len(self.compiled.moves(5)))
+                self.assertEqual(
+                    dict(zip(db.masks('5s').tolist(), db.strengths('5s').tolist()))[self.two_high],
+                    self.compiled.move_strength(self.two_high))
+
+
+if __name__ == '__main__':
+    unittest.main()
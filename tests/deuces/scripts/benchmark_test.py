@@ -0,0 +1,98 @@
+import json
+import os
+import tempfile
+import unittest
+
+from deuces.scripts.benchmark import (
+    BENCHMARKS,
+    FIVE_CARD_HANDS,
+    IMPORT_MODULES,
+    cards,
+    compare,
+    import_times,
+    main,
+    run_benchmarks,
+)
+from deuces.scripts.move_generator import MOVE_GENERATORS
+from deuces.validation.combos import (
+    FIVE_CARD_COMBO_ORDER,
+    FiveCard,
+)
+
+
+def results(**best_by_name):
+    return {
+        'version': 1,
+        'benchmarks': dict((name, {'best': best}) for name, best in best_by_name.items()),
+    }
+
+
+class BenchmarkTest(unittest.TestCase):
+    def test_covers_every_combo_move_size_and_generator(self):
+        combos = set(type(FiveCard.from_hand(cards(h))) for h in FIVE_CARD_HANDS.values())
+        self.assertEqual(combos, set(FIVE_CARD_COMBO_ORDER))
+        for move_size in range(1, 6):
+            self.assertIn(f'logical_validator.is_valid_move.{move_size}', BENCHMARKS)
+        for group_type in MOVE_GENERATORS:
+            self.assertIn(f'move_generator.{group_type}', BENCHMARKS)
+
+    def test_covers_importing_each_entry_point(self):
+        for module in IMPORT_MODULES:
+            self.assertIn(f'import.{module}', BENCHMARKS)
+
+    def test_every_benchmark_runs(self):
+        names = [n for n in BENCHMARKS if not n.startswith('move_generator.') or n.endswith(('1s', 'sf'))]
+        benchmarks = run_benchmarks(names, repeat=1, scale=0.001)['benchmarks']
+        self.assertEqual(list(benchmarks), names)
+        self.assertTrue(all(b['best'] > 0 for b in benchmarks.values()))
+
+    def test_compare_flags_regressions(self):
+        comparisons = compare(results(a=1.2, b=0.5, c=1.05, d=1.0), results(a=1.0, b=1.0, c=1.0), threshold=0.1)
+        self.assertEqual(
+            [(c.name, c.status) for c in comparisons],
+            [('a', 'regressed'), ('b', 'improved'), ('c', 'unchanged'), ('d', 'new')],
+        )
+        self.assertAlmostEqual(comparisons[0].ratio, 1.2)
+
+    def test_main_writes_json_and_fails_on_regression(self):
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, 'results.json')
+            baseline = os.path.join(directory, 'baseline.json')
+            with open(baseline, 'w') as f:
+                json.dump(results(**{'card.compare': 1e-12}), f)
+            argv = ['-k', 'card.compare', '--repeat', '1', '--scale', '0.01', '--output', output]
+            self.assertEqual(main(argv + ['--baseline', baseline]), 1)
+            with open(output) as f:
+                self.assertEqual(list(json.load(f)['benchmarks']), ['card.compare'])
+
+
+def first_party(modules):
+    return set(m for m in modules if m.split('.')[0] in ('cardgame', 'deuces'))
+
+
+class ImportTimeTest(unittest.TestCase):
+    """What a fresh interpreter loads for each entry point, so startup cannot quietly grow."""
+
+    def test_importing_the_packages_loads_no_submodules(self):
+        self.assertEqual(first_party(import_times('deuces')), {'cardgame', 'cardgame.lazy', 'deuces'})
+        self.assertEqual(
+            first_party(import_times('cardgame')) | first_party(import_times('deuces.validation')),
+            {'cardgame', 'cardgame.lazy', 'deuces', 'deuces.validation'},
+        )
+
+    def test_scalar_game_play_does_not_load_numpy(self):
+        for module in ('deuces.game_state', 'deuces.endgame', 'deuces.validation.logical_validator'):
+            modules = import_times(module)
+            self.assertIn(module, modules)
+            self.assertNotIn('numpy', modules)
+            self.assertNotIn('deuces.validation.batch_validator', modules)
+            self.assertNotIn('deuces.moves', modules)
+
+    def test_times_are_cumulative(self):
+        times = import_times('deuces.game_state')
+        self.assertEqual(list(times)[-1], 'deuces.game_state')
+        self.assertGreaterEqual(times['deuces.game_state'], times['deuces.hand_moves'])
+
+
+if __name__ == '__main__':
+    unittest.main()
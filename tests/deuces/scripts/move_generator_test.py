@@ -0,0 +1,38 @@
+import filecmp
+import tempfile
+import unittest
+
+from deuces.move_db import MOVE_DB_FILENAME
+from deuces.moves import MOVES_DIRECTORY
+from deuces.scripts.move_generator import (
+    MOVE_GENERATORS,
+    write_all_possible_moves,
+)
+
+
+class MoveGeneratorTest(unittest.TestCase):
+    def test_generators_yield_tuples_of_ordinals(self):
+        for generator in MOVE_GENERATORS.values():
+            for move in generator():
+                self.assertIsInstance(move, tuple)
+                self.assertTrue(all(isinstance(o, int) for o in move))
+
+    def assert_matches_shipped_moves(self, directory):
+        filenames = [f'{t}.csv' for t in MOVE_GENERATORS] + [MOVE_DB_FILENAME]
+        _, mismatch, errors = filecmp.cmpfiles(MOVES_DIRECTORY, directory, filenames, shallow=False)
+        self.assertEqual((mismatch, errors), ([], []))
+
+    def test_output_matches_shipped_moves(self):
+        with tempfile.TemporaryDirectory() as directory:
+            stats = write_all_possible_moves(directory, formats=('csv', 'bin'))
+            self.assert_matches_shipped_moves(directory)
+        self.assertEqual(stats['5s'][0], 19716)
+
+    def test_process_pool_output_matches_shipped_moves(self):
+        with tempfile.TemporaryDirectory() as directory:
+            write_all_possible_moves(directory, formats=('csv', 'bin'), processes=2)
+            self.assert_matches_shipped_moves(directory)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import os
+import unittest
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from deuces import shared_tables
+from deuces.move_db import (
+    MOVE_DB_FILENAME,
+    MoveDB,
+)
+from deuces.moves import (
+    MOVE_CLASSES,
+    MOVES_DIRECTORY,
+)
+from deuces.shared_tables import (
+    SharedTables,
+    worker_initializer,
+)
+from deuces.validation import BatchValidator
+from deuces.validation.combos import five_card_table
+
+
+def _worker_strengths(move_class):
+    tables = shared_tables._WORKER_TABLES
+    table = BatchValidator._strength_table()
+    return (
+        table is tables.strength_table and not table.flags.writeable,
+        BatchValidator.move_strengths(tables.move_db.moves(move_class)).tolist(),
+    )
+
+
+class SharedTablesTest(unittest.TestCase):
+    def setUp(self):
+        self.tables = SharedTables.publish()
+        self.addCleanup(self.tables.close)
+
+    def test_attached_views_match_the_tables(self):
+        with SharedTables.attach(self.tables.name) as attached, \
+                MoveDB.open(os.path.join(MOVES_DIRECTORY, MOVE_DB_FILENAME)) as db:
+            np.testing.assert_array_equal(
+                attached.strength_table, np.frombuffer(five_card_table.strength_table(), dtype=np.uint16))
+            self.assertFalse(attached.strength_table.flags.writeable)
+            for move_class in MOVE_CLASSES:
+                np.testing.assert_array_equal(attached.move_db.records(move_class), db.records(move_class))
+                self.assertFalse(attached.move_db.masks(move_class).flags.writeable)
+            self.assertEqual(len(attached.move_index()), sum(len(db.masks(c)) for c in MOVE_CLASSES))
+
+    def test_workers_attach_and_install(self):
+        with ProcessPoolExecutor(2, initializer=worker_initializer, initargs=(self.tables.name,)) as pool:
+            results = list(pool.map(_worker_strengths, MOVE_CLASSES))
+        for move_class, (shared, strengths) in zip(MOVE_CLASSES, results):
+            self.assertTrue(shared)
+            self.assertEqual(strengths, self.tables.move_db.strengths(move_class).tolist())
+        # Workers exiting leaves the segment in place
+        SharedTables.attach(self.tables.name).close()
+
+    def test_owner_unlinks_on_close(self):
+        name = self.tables.name
+        self.tables.close()
+        with self.assertRaises(FileNotFoundError):
+            SharedTables.attach(name)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import random
+import unittest
+
+import numpy as np
+
+from cardgame import Deck
+from deuces import DeucesCard
+from deuces.dealer import Dealer
+from deuces.simulator import (
+    iter_simulate,
+    low_card_policy,
+    play_game,
+    random_policy,
+    simulate,
+    simulate_chunk,
+)
+
+
+def checked_random_policy(state, moves, rng):
+    assert all(state.is_legal_move(m) for m in moves)
+    return random_policy(state, moves, rng)
+
+
+class SimulatorTest(unittest.TestCase):
+    def test_games_play_to_completion(self):
+        rng = random.Random(0)
+        for hands in Dealer(1).deal_masks(20).tolist():
+            result = play_game(hands, [checked_random_policy] * 4, rng)
+            self.assertEqual(result.cards_left[result.winner], 0)
+            self.assertTrue(all(result.cards_left[p] for p in range(4) if p != result.winner))
+
+    def test_results_do_not_depend_on_the_pool(self):
+        serial = simulate(120, seed=3, processes=1, chunk_size=25)
+        pooled = simulate(120, seed=3, processes=2, chunk_size=25)
+        serial.elapsed = pooled.elapsed = 0.0
+        self.assertEqual(serial, pooled)
+        self.assertEqual(serial.games, 120)
+        self.assertEqual(sum(serial.wins), 120)
+        self.assertNotEqual(simulate(120, seed=4, processes=1, chunk_size=25).moves, serial.moves)
+
+    def test_chunks_deal_from_their_own_stream(self):
+        seed = np.random.SeedSequence(5)
+        stats = simulate_chunk([random_policy] * 4, np.random.SeedSequence(5), 20)
+        replayed = simulate_chunk([random_policy] * 4, np.random.SeedSequence(5), 20)
+        stats.elapsed = replayed.elapsed = 0.0
+        self.assertEqual(stats, replayed)
+        # Deals come from the first child of the chunk's seed, not from the seed itself
+        deal_seed, _ = seed.spawn(2)
+        dealt = Dealer(deal_seed).deal_masks(20).tolist()
+        self.assertNotEqual(dealt, Dealer(np.random.SeedSequence(5)).deal_masks(20).tolist())
+        results = [play_game(hands, [low_card_policy] * 4, random.Random(0)) for hands in dealt]
+        lows = simulate_chunk([low_card_policy] * 4, np.random.SeedSequence(5), 20)
+        self.assertEqual(lows.moves, sum(r.length for r in results))
+
+    def test_streams_running_totals(self):
+        games = [stats.games for stats in iter_simulate(50, processes=1, chunk_size=20)]
+        self.assertEqual(games, [20, 40, 50])
+
+    def test_plays_a_partial_deck(self):
+        stats = simulate(30, deck=Deck(DeucesCard.CARDS[:16]), processes=1)
+        self.assertEqual(stats.games, 30)
+        self.assertLessEqual(stats.longest_game, 60)
+        with self.assertRaises(ValueError):
+            simulate(30, deck=Deck(DeucesCard.CARDS[:15]), processes=1)
+
+    def test_policies_per_seat(self):
+        stats = simulate(200, [low_card_policy, random_policy, random_policy, random_policy], processes=1)
+        self.assertGreater(stats.win_rates[0], max(stats.win_rates[1:]))
+
+
+if __name__ == '__main__':
+    unittest.main()
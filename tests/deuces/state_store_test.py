@@ -0,0 +1,125 @@
+import os
+import random
+import tempfile
+import unittest
+
+from deuces.explorer import Explorer
+from deuces.game_state import DeucesGameState
+from deuces.state_store import (
+    Segment,
+    SegmentWriter,
+    StateStore,
+    segment_filename,
+    write_segment,
+)
+from tests.deuces.explorer_test import (
+    reachable_states,
+    small_game,
+)
+
+
+def random_records(rng, n, value_size=0):
+    keys = sorted(set(rng.randbytes(8) for _ in range(n)))
+    return [(k, rng.randbytes(value_size)) for k in keys]
+
+
+class SegmentTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'segment.dcss')
+
+    def test_round_trips_with_every_codec(self):
+        rng = random.Random(0)
+        records = random_records(rng, 1000, value_size=3)
+        for codec in ('none', 'zlib', 'lzma'):
+            write_segment(self.path, records, key_size=8, value_size=3, codec=codec, block_records=64)
+            with Segment(self.path) as segment:
+                self.assertEqual(segment.codec, codec)
+                self.assertEqual(segment.num_blocks, -(-len(records) // 64))
+                self.assertEqual(len(segment), len(records))
+                self.assertEqual(list(segment), records)
+                for key, value in rng.sample(records, 100):
+                    self.assertEqual(segment.get(key), value)
+                self.assertIsNone(segment.get(b'\x00' * 8))
+                self.assertIsNone(segment.get(b'\xff' * 8))
+
+    def test_rejects_unsorted_and_missized_records(self):
+        with self.assertRaises(ValueError):
+            write_segment(self.path, [(b'b' * 8, b''), (b'a' * 8, b'')], key_size=8)
+        self.assertFalse(os.path.exists(self.path))
+        self.assertFalse(os.path.exists(self.path + '.tmp'))
+        with SegmentWriter(self.path, key_size=8) as writer:
+            with self.assertRaises(ValueError):
+                writer.add(b'short')
+            with self.assertRaises(ValueError):
+                writer.add(b'a' * 8, b'value')
+
+    def test_empty_segment(self):
+        write_segment(self.path, [], key_size=8)
+        with Segment(self.path) as segment:
+            self.assertEqual(list(segment), [])
+            self.assertIsNone(segment.get(b'a' * 8))
+
+
+class StateStoreTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def test_stores_explored_states(self):
+        root = small_game(0, num_cards=8)
+        states = [DeucesGameState.from_key(key).to_bytes() for key in reachable_states(root)]
+        with StateStore(self.directory, buffer_records=100, block_records=16) as store:
+            Explorer(on_state=store.add_state).explore([root])
+            store.flush()
+            self.assertGreater(store.num_segments, 1)
+            self.assertEqual([key for key, _ in store], sorted(states))
+        with StateStore(self.directory) as store:
+            self.assertTrue(all(key in store for key in states))
+            self.assertNotIn(small_game(1).to_bytes(), store)
+
+    def test_newest_value_wins(self):
+        with StateStore(self.directory, key_size=8, value_size=1) as store:
+            store.add(b'a' * 8, b'1')
+            store.add(b'b' * 8, b'1')
+            store.flush()
+            store.add(b'a' * 8, b'2')
+            self.assertEqual(store.get(b'a' * 8), b'2')
+            store.flush()
+            self.assertEqual(store.get(b'a' * 8), b'2')
+            self.assertEqual(list(store), [(b'a' * 8, b'2'), (b'b' * 8, b'1')])
+
+    def test_compaction_merges_segments(self):
+        rng = random.Random(1)
+        records = dict(random_records(rng, 2000, value_size=2))
+        for background in (False, True):
+            directory = os.path.join(self.directory, str(background))
+            with StateStore(directory, key_size=8, value_size=2, buffer_records=300, block_records=32) as store:
+                for key, value in records.items():
+                    store.add(key, value)
+                store.compact(background=background)
+                # Added while compacting, so it lands in a newer segment
+                key = next(iter(records))
+                records[key] = b'zz'
+                store.add(key, b'zz')
+                store.flush()
+                self.assertEqual(store.get(key), b'zz')
+                store.wait()
+                self.assertEqual(store.num_segments, 2)
+                self.assertEqual(list(store), sorted(records.items()))
+                store.compact()
+                self.assertEqual(os.listdir(directory), [segment_filename(9)])
+            with StateStore(directory, key_size=8, value_size=2) as store:
+                self.assertEqual(dict(store), records)
+
+    def test_rejects_a_store_of_another_record_size(self):
+        with StateStore(self.directory, key_size=8) as store:
+            store.add(b'a' * 8)
+        with self.assertRaises(ValueError):
+            StateStore(self.directory, key_size=8, value_size=1)
+
+
+if __name__ == '__main__':
+    unittest.main()
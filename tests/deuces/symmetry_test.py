@@ -0,0 +1,120 @@
+import itertools
+import random
+import unittest
+
+from deuces import bitmask
+from deuces.explorer import Explorer
+from deuces.game_state import (
+    PASS,
+    DeucesGameState,
+)
+from deuces.hand_moves import moves_from_hand
+from deuces.symmetry import (
+    IDENTITY,
+    SUIT_PERMUTATIONS,
+    canonical_hand,
+    canonical_state,
+    canonical_state_bytes,
+    permute_suits,
+    valid_suit_permutations,
+)
+from deuces.validation import LogicalValidator
+from tests.deuces.explorer_test import reachable_states
+
+
+def random_state(rng):
+    """Late-game state with 2-7 cards per hand and, usually, a move on the table."""
+    cards = rng.sample(range(bitmask.NUM_CARDS), 32)
+    hands = []
+    for _ in range(4):
+        size = rng.randint(2, 7)
+        hands.append(bitmask.to_mask(cards[:size]))
+        del cards[:size]
+    table = rng.choice([PASS, *moves_from_hand(bitmask.to_mask(cards[:8]))])
+    turn = rng.randrange(4)
+    return DeucesGameState(hands, table, leader=(turn - 1) % 4, passes=0, turn=turn)
+
+
+def permute_state(state, p):
+    hands = [permute_suits(h, p) for h in state.hands]
+    return DeucesGameState(hands, permute_suits(state.table, p), state.leader, state.passes, state.turn)
+
+
+class SymmetryTest(unittest.TestCase):
+    def test_permute_suits_relabels_each_card(self):
+        for p, permutation in enumerate(SUIT_PERMUTATIONS):
+            for o in range(bitmask.NUM_CARDS):
+                expected = bitmask.ordinal_of(bitmask.rank_of(o), permutation[bitmask.suit_of(o)])
+                self.assertEqual(permute_suits(1 << o, p), 1 << expected)
+        self.assertEqual(permute_suits(bitmask.FULL_DECK_MASK, 7), bitmask.FULL_DECK_MASK)
+
+    def test_full_deck_has_no_symmetries(self):
+        self.assertEqual(valid_suit_permutations([bitmask.FULL_DECK_MASK]), [IDENTITY])
+
+    def test_valid_permutations_preserve_validator_outcomes(self):
+        rng = random.Random(0)
+        checked = 0
+        for _ in range(60):
+            state = random_state(rng)
+            moves = set(itertools.chain.from_iterable(moves_from_hand(h) for h in state.hands))
+            if state.table != PASS:
+                moves.add(state.table)
+            moves_by_size = {}
+            for move in moves:
+                moves_by_size.setdefault(bitmask.popcount(move), []).append(move)
+            for p in valid_suit_permutations([*state.hands, state.table]):
+                if p == IDENTITY:
+                    continue
+                checked += 1
+                for same_size in moves_by_size.values():
+                    for move, against in itertools.product(same_size, repeat=2):
+                        self.assertEqual(
+                            LogicalValidator.is_valid_mask(move, against),
+                            LogicalValidator.is_valid_mask(permute_suits(move, p), permute_suits(against, p)),
+                        )
+                permuted = permute_state(state, p)
+                self.assertEqual(
+                    sorted(permute_suits(m, p) for m in state.legal_moves()),
+                    sorted(permuted.legal_moves()),
+                )
+        self.assertGreater(checked, 0)
+
+    def test_flushes_in_different_hands_fix_their_suit_order(self):
+        diamonds = bitmask.to_mask(bitmask.ordinal_of(r, 0) for r in (0, 2, 4, 6, 8))
+        clubs = bitmask.to_mask(bitmask.ordinal_of(r, 1) for r in (1, 3, 5, 7, 9))
+        swap = SUIT_PERMUTATIONS.index((1, 0, 2, 3))
+        # The club flush beats the diamond flush only while clubs outrank diamonds
+        self.assertTrue(LogicalValidator.is_valid_mask(clubs, diamonds))
+        self.assertFalse(LogicalValidator.is_valid_mask(permute_suits(clubs, swap), permute_suits(diamonds, swap)))
+        self.assertIn(swap, valid_suit_permutations([diamonds]))
+        self.assertNotIn(swap, valid_suit_permutations([diamonds, clubs]))
+
+    def test_canonical_state_is_shared_by_its_class(self):
+        rng = random.Random(1)
+        for _ in range(60):
+            state = random_state(rng)
+            canonical = canonical_state(state).key()
+            for p in valid_suit_permutations([*state.hands, state.table]):
+                self.assertEqual(canonical_state(permute_state(state, p)).key(), canonical)
+
+    def test_canonical_hand(self):
+        # 3♢ 4♣: any relabeling is a symmetry, and the smallest mask puts the 4 lowest
+        self.assertEqual(canonical_hand(bitmask.to_mask([0, 5])), bitmask.to_mask([1, 4]))
+        # 3♢ 3♠: the pair keeps its suit order
+        self.assertEqual(canonical_hand(bitmask.to_mask([0, 3])), bitmask.to_mask([0, 1]))
+
+    def test_explorer_visits_one_state_per_class(self):
+        # No two cards share a rank, so every relabeling of the deal is equivalent to it
+        root = DeucesGameState([bitmask.to_mask([4 * r + r % 4, 4 * (r + 6) + r % 3]) for r in range(4)])
+        roots = [permute_state(root, p) for p in range(len(SUIT_PERMUTATIONS))]
+        states = set().union(*(reachable_states(r) for r in roots))
+        expected = set(canonical_state(DeucesGameState.from_key(k)).key() for k in states)
+        seen = []
+        stats = Explorer(canonical_key=canonical_state_bytes, on_state=lambda s: seen.append(s.key())).explore(roots)
+        self.assertEqual(sorted(seen), sorted(expected))
+        self.assertLessEqual(stats.states, len(reachable_states(root)))
+        self.assertLess(stats.states, len(states))
+
+
+if __name__ == '__main__':
+    unittest.main()
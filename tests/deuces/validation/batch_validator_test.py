@@ -0,0 +1,56 @@
+import random
+import unittest
+
+import numpy as np
+
+from deuces import DeucesCard, bitmask
+from deuces.validation import BatchValidator, LogicalValidator
+from deuces.validation.batch_validator import PAD
+from deuces.validation.combos.five_card_table import strength_by_mask
+
+
+def random_moves(rng, n):
+    moves = []
+    for _ in range(n):
+        size = rng.randint(1, 5)
+        # Bias towards same-rank cards so that pairs and triples show up
+        if size <= 4 and rng.random() < 0.5:
+            rank_ix = rng.randrange(bitmask.NUM_RANKS)
+            ordinals = rng.sample(bitmask.ordinals(bitmask.RANK_MASKS[rank_ix]), size)
+        else:
+            ordinals = rng.sample(range(bitmask.NUM_CARDS), size)
+        moves.append(tuple(DeucesCard.CARDS[o] for o in ordinals))
+    return moves
+
+
+class BatchValidatorTest(unittest.TestCase):
+    def test_matches_logical_validator_without_against(self):
+        rng = random.Random(0)
+        moves = random_moves(rng, 2000)
+        moves += [DeucesCard.from_mask(m) for m in list(strength_by_mask())[::50]]
+        result = BatchValidator.are_valid_moves(BatchValidator.from_moves(moves))
+        self.assertEqual(result.tolist(), [LogicalValidator.is_valid_move(m) for m in moves])
+
+    def test_matches_logical_validator_against_one_move(self):
+        rng = random.Random(1)
+        moves = [m for m in random_moves(rng, 3000) if LogicalValidator.is_valid_move(m)]
+        moves += [DeucesCard.from_mask(m) for m in list(strength_by_mask())[::25]]
+        array = BatchValidator.from_moves(moves)
+        for against in moves[::97]:
+            result = BatchValidator.are_valid_moves(array, against)
+            self.assertEqual(result.tolist(), [LogicalValidator.is_valid_move(m, against) for m in moves])
+
+    def test_against_per_row(self):
+        moves = BatchValidator.from_masks([0b10, 0b1, 0b11])
+        against = BatchValidator.from_masks([0b1, 0b10, 0b1100])
+        self.assertEqual(BatchValidator.are_valid_moves(moves, against).tolist(), [True, False, False])
+
+    def test_rejects_duplicates_and_bad_shapes(self):
+        moves = np.array([[0, 0, PAD, PAD, PAD], [51, 51, 51, 51, 51]])
+        self.assertFalse(BatchValidator.are_valid_moves(moves).any())
+        with self.assertRaises(ValueError):
+            BatchValidator.are_valid_moves(np.array([[0, 1]]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import random
+import unittest
+
+from deuces import bitmask
+from deuces.hand_moves import moves_from_hand
+from deuces.validation import (
+    CachingValidator,
+    LogicalValidator,
+)
+from deuces.validation.caching_validator import cache_key
+from tests.deuces.validation.logical_validator_test import (
+    hand,
+    mask,
+)
+
+
+class CachingValidatorTest(unittest.TestCase):
+    def test_matches_logical_validator(self):
+        rng = random.Random(0)
+        moves = list(moves_from_hand(bitmask.to_mask(rng.sample(range(bitmask.NUM_CARDS), 20))))
+        validator = CachingValidator(max_size=64)
+        for _ in range(2000):
+            move, against = rng.choice(moves), rng.choice(moves + [None])
+            self.assertEqual(validator.is_valid_mask(move, against), LogicalValidator.is_valid_mask(move, against))
+        self.assertTrue(validator.is_valid_move(hand('5♣ 5♠'), hand('5♢ 5♡')))
+        self.assertFalse(validator.is_valid_move(hand('5♣ 5♣')))
+
+    def test_counts_hits_misses_and_evictions(self):
+        validator = CachingValidator(max_size=2)
+        pair, higher_pair, single = mask('5♢ 5♡'), mask('5♣ 5♠'), mask('7♢')
+        validator.is_valid_mask(higher_pair, pair)
+        validator.is_valid_mask(higher_pair, pair)
+        validator.is_valid_mask(single)
+        # Touching the pairs makes the single the least recently used entry
+        validator.is_valid_mask(higher_pair, pair)
+        validator.is_valid_mask(pair, higher_pair)
+        info = validator.cache_info()
+        self.assertEqual((info.hits, info.misses, info.evictions, info.size), (2, 3, 1, 2))
+        self.assertEqual(info.hit_rate, 0.4)
+        validator.is_valid_mask(higher_pair, pair)
+        self.assertEqual(validator.cache_info().hits, 3)
+        validator.is_valid_mask(single)
+        self.assertEqual(validator.cache_info().misses, 4)
+        validator.cache_clear()
+        self.assertEqual(validator.cache_info(), (0, 0, 0, 2, 0))
+
+    def test_keys_tell_leading_from_beating(self):
+        self.assertNotEqual(cache_key(mask('7♢')), cache_key(mask('7♢'), 0))
+        self.assertNotEqual(cache_key(mask('7♢'), mask('3♢')), cache_key(mask('7♢'), mask('3♣')))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import random
+import unittest
+
+from collections import Counter
+
+from deuces import bitmask
+from deuces.validation.combos import (
+    FIVE_CARD_COMBO_ORDER,
+    FiveCard,
+    InvalidFiveCard,
+)
+from deuces.validation.combos.five_card_table import (
+    INVALID_STRENGTH,
+    NUM_FIVE_CARD_HANDS,
+    five_card_index,
+    five_card_strength,
+    strength_by_mask,
+    strength_table,
+)
+
+
+class FiveCardTableTest(unittest.TestCase):
+    def test_counts_per_combo_type(self):
+        counts = Counter(
+            FIVE_CARD_COMBO_ORDER[s >> (FiveCard.STRENGTH_FIELD_BITS * FiveCard.STRENGTH_NUM_FIELDS)].__name__
+            for s in strength_by_mask().values())
+        self.assertEqual(counts, {
+            'Straight': 10200,
+            'Flush': 5108,
+            'FullHouse': 3744,
+            'FourOfAKind': 624,
+            'StraightFlush': 40,
+        })
+
+    def test_invalid_sentinel(self):
+        self.assertEqual(InvalidFiveCard().strength, INVALID_STRENGTH)
+
+    def test_table_agrees_with_classifier(self):
+        rng = random.Random(0)
+        table = strength_table()
+        self.assertEqual(len(table), NUM_FIVE_CARD_HANDS)
+        masks = list(strength_by_mask())[::97] + [
+            bitmask.to_mask(rng.sample(range(bitmask.NUM_CARDS), 5)) for _ in range(500)]
+        for mask in masks:
+            expected = FiveCard.from_mask(mask).strength
+            self.assertEqual(five_card_strength(mask), expected)
+            self.assertEqual(table[five_card_index(bitmask.ordinals(mask))], expected)
+
+    def test_index_is_a_bijection(self):
+        self.assertEqual(five_card_index([0, 1, 2, 3, 4]), 0)
+        self.assertEqual(five_card_index([47, 48, 49, 50, 51]), NUM_FIVE_CARD_HANDS - 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import bisect
+import dataclasses
+import random
+import unittest
+
+from deuces import bitmask
+from deuces.validation.combos import (
+    STRENGTH_KEY,
+    FiveCard,
+    Flush,
+    FourOfAKind,
+    FullHouse,
+    InvalidFiveCard,
+    Straight,
+    StraightFlush,
+)
+from deuces.validation.combos.five_card_table import strength_by_mask
+
+
+class FiveCardTest(unittest.TestCase):
+    def test_same_type_comparisons(self):
+        low = Straight(end_rank_ix=4, end_rank_suit_ix=3)
+        high = Straight(end_rank_ix=5, end_rank_suit_ix=0)
+        self.assertLess(low, high)
+        self.assertLessEqual(low, high)
+        self.assertGreater(high, low)
+        self.assertGreaterEqual(high, low)
+        self.assertLess(Straight(end_rank_ix=4, end_rank_suit_ix=0), low)
+        self.assertLess(Flush(suit_ix=0, end_rank_ix=12), Flush(suit_ix=1, end_rank_ix=4))
+
+    def test_combo_type_comes_first(self):
+        ordered = [
+            InvalidFiveCard(),
+            Straight(end_rank_ix=11, end_rank_suit_ix=3),
+            Flush(suit_ix=0, end_rank_ix=5),
+            FullHouse(rank_ix=0),
+            FourOfAKind(rank_ix=0),
+            StraightFlush(end_rank_ix=2, end_rank_suit_ix=0),
+        ]
+        self.assertEqual(sorted(reversed(ordered)), ordered)
+        # A StraightFlush is a Straight subclass, but not a Straight's equal
+        self.assertNotEqual(StraightFlush(end_rank_ix=4, end_rank_suit_ix=0), Straight(end_rank_ix=4, end_rank_suit_ix=0))
+
+    def test_equal_combos_hash_alike(self):
+        self.assertEqual(FullHouse(rank_ix=3), FullHouse(rank_ix=3))
+        self.assertEqual(len({FullHouse(rank_ix=3), FullHouse(rank_ix=3), FourOfAKind(rank_ix=3)}), 2)
+        self.assertNotEqual(FullHouse(rank_ix=3), 3)
+
+    def test_combos_are_immutable(self):
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            FullHouse(rank_ix=3).rank_ix = 4
+
+    def test_sorted_by_strength_key(self):
+        rng = random.Random(0)
+        table = strength_by_mask()
+        masks = rng.sample(sorted(table), 500)
+        combos = sorted((FiveCard.from_mask(m) for m in masks), key=STRENGTH_KEY)
+        self.assertEqual([c.strength for c in combos], sorted(table[m] for m in masks))
+        self.assertEqual(sorted(combos), combos)
+
+    def test_bisect_over_strengths(self):
+        combos = sorted(
+            (FiveCard.from_mask(bitmask.to_mask(o)) for o in [
+                [0, 1, 2, 3, 4],
+                [0, 5, 10, 15, 16],
+                [0, 1, 4, 5, 6],
+                [1, 5, 9, 13, 17],
+            ]),
+            key=STRENGTH_KEY)
+        strengths = [c.strength for c in combos]
+        table = FullHouse(rank_ix=0)
+        beaten_by = combos[bisect.bisect_right(strengths, table.strength):]
+        self.assertEqual(beaten_by, [
+            FullHouse(rank_ix=1),
+            FourOfAKind(rank_ix=0),
+            StraightFlush(end_rank_ix=4, end_rank_suit_ix=1),
+        ])
+
+
+if __name__ == '__main__':
+    unittest.main()
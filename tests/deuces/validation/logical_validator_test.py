@@ -0,0 +1,74 @@
+import unittest
+
+from deuces import DeucesCard
+from deuces.validation import LogicalValidator
+from deuces.validation.combos import (
+    FiveCard,
+    Flush,
+    FourOfAKind,
+    FullHouse,
+    InvalidFiveCard,
+    Straight,
+    StraightFlush,
+)
+
+CARD_BY_STR = dict((str(c), c) for c in DeucesCard.CARDS)
+
+
+def hand(s):
+    return tuple(CARD_BY_STR[c] for c in s.split())
+
+
+def mask(s):
+    return DeucesCard.to_mask(hand(s))
+
+
+class FiveCardTest(unittest.TestCase):
+    def test_from_mask_classifies_combos(self):
+        self.assertEqual(FiveCard.from_mask(mask('3♢ 4♣ 5♢ 6♢ 7♠')), Straight(end_rank_ix=4, end_rank_suit_ix=3))
+        self.assertEqual(FiveCard.from_mask(mask('3♣ 4♣ 5♣ A♣ 2♣')), StraightFlush(end_rank_ix=2, end_rank_suit_ix=1))
+        self.assertEqual(FiveCard.from_mask(mask('3♡ 4♡ 9♡ J♡ 2♡')), Flush(suit_ix=2, end_rank_ix=12))
+        self.assertEqual(FiveCard.from_mask(mask('3♢ 3♣ 7♢ 7♣ 7♡')), FullHouse(rank_ix=4))
+        self.assertEqual(FiveCard.from_mask(mask('7♢ 7♣ 7♡ 7♠ K♣')), FourOfAKind(rank_ix=4))
+        self.assertEqual(FiveCard.from_mask(mask('J♢ Q♢ K♣ A♢ 2♢')), InvalidFiveCard())
+        self.assertEqual(FiveCard.from_mask(mask('3♢ 4♢ 5♢ 6♢')), InvalidFiveCard())
+
+    def test_from_hand_matches_from_mask(self):
+        cards = hand('T♢ J♣ Q♡ K♠ A♢')
+        self.assertEqual(FiveCard.from_hand(cards), FiveCard.from_mask(DeucesCard.to_mask(cards)))
+
+
+class LogicalValidatorTest(unittest.TestCase):
+    def test_singles(self):
+        self.assertTrue(LogicalValidator.is_valid_move(hand('3♠'), hand('3♡')))
+        self.assertFalse(LogicalValidator.is_valid_move(hand('3♡'), hand('3♠')))
+
+    def test_pairs_break_ties_on_highest_suit(self):
+        self.assertTrue(LogicalValidator.is_valid_move(hand('9♢ 9♠'), hand('9♣ 9♡')))
+        self.assertFalse(LogicalValidator.is_valid_move(hand('9♢ T♠')))
+        self.assertTrue(LogicalValidator.is_valid_mask(mask('9♢ 9♠'), mask('8♣ 8♡')))
+
+    def test_triples_and_quads(self):
+        self.assertTrue(LogicalValidator.is_valid_move(hand('2♢ 2♣ 2♡'), hand('A♢ A♣ A♡')))
+        self.assertFalse(LogicalValidator.is_valid_move(hand('4♢ 4♣ 4♡ 4♠'), hand('5♢ 5♣ 5♡ 5♠')))
+
+    def test_move_sizes_must_match(self):
+        self.assertFalse(LogicalValidator.is_valid_move(hand('2♠'), hand('3♢ 3♣')))
+        self.assertFalse(LogicalValidator.is_valid_move(hand('3♢ 3♢')))
+
+    def test_five_card_moves_beat_weaker_combo_types(self):
+        self.assertTrue(LogicalValidator.is_valid_move(hand('3♢ 3♣ 7♢ 7♣ 7♡'), hand('3♡ 4♣ 5♢ 6♢ 7♠')))
+        self.assertFalse(LogicalValidator.is_valid_move(hand('3♡ 4♣ 5♢ 6♢ 7♠'), hand('3♢ 3♣ 7♢ 7♣ 7♡')))
+
+    def test_five_card_moves_of_the_same_type(self):
+        # Straights compare the end card, then its suit
+        self.assertTrue(LogicalValidator.is_valid_move(hand('4♢ 5♣ 6♢ 7♢ 8♠'), hand('3♡ 4♣ 5♢ 6♢ 7♠')))
+        self.assertTrue(LogicalValidator.is_valid_move(hand('3♡ 4♣ 5♢ 6♢ 7♠'), hand('3♢ 4♣ 5♢ 6♢ 7♡')))
+        # Flushes compare the suit, then the highest card
+        self.assertTrue(LogicalValidator.is_valid_move(hand('3♠ 4♠ 5♠ 9♠ J♠'), hand('3♡ 4♡ 9♡ J♡ 2♡')))
+        self.assertFalse(LogicalValidator.is_valid_move(hand('3♡ 4♡ 9♡ J♡ K♡'), hand('3♡ 5♡ 9♡ J♡ A♡')))
+        self.assertFalse(LogicalValidator.is_valid_move(hand('3♢ 4♣ 5♢ 6♢ 7♠'), hand('3♢ 4♣ 5♢ 6♢ 7♠')))
+
+
+if __name__ == '__main__':
+    unittest.main()